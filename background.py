@@ -0,0 +1,102 @@
+"""Run calculations off the UI thread and hand the results back to it.
+
+BackgroundRunner submits a callable to a worker pool and returns a Job.
+Completion, failure and timeout callbacks are delivered through
+``schedule``, which in the app is Kivy's thread-safe
+``Clock.schedule_once``, so they always run on the main thread. They are
+never called for a job that was cancelled, so a late result cannot
+overwrite the display after the user has moved on.
+
+Workers are threads. Python cannot stop a running thread, so cancelling a
+job that has started only discards its result, and the thread finishes in
+the background. The runner then moves on to a fresh pool, so jobs submitted
+later do not queue behind the abandoned one. Work should therefore run on
+a copy of any state it changes (see CalculatorEngine.fork), and must not
+hold the GIL for long (see engine._power).
+"""
+import concurrent.futures
+import functools
+
+
+class Job:
+    """One submitted call; ``cancel()`` stops its callbacks from firing"""
+    __slots__ = ('future', 'cancelled', '_timeout_event', '_runner')
+
+    def __init__(self, future, runner=None):
+        self.future = future
+        self.cancelled = False
+        self._timeout_event = None
+        self._runner = runner
+
+    @property
+    def done(self):
+        return self.future.done()
+
+    def cancel(self):
+        self.cancelled = True
+        if not self.future.cancel() and not self.future.done() and self._runner is not None:
+            # Already running: leave its worker to finish on its own
+            self._runner._abandon_pool()
+        if self._timeout_event is not None:
+            self._timeout_event.cancel()
+            self._timeout_event = None
+
+
+class BackgroundRunner:
+    """A small worker pool whose results come back through ``schedule``.
+
+    ``schedule(callback, delay)`` must call ``callback(dt)`` on the main
+    thread after ``delay`` seconds and return an object with ``cancel()``.
+    """
+
+    def __init__(self, schedule, workers=1):
+        self.schedule = schedule
+        self.workers = workers
+        self._pool = self._new_pool()
+
+    def _new_pool(self):
+        return concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='calc-worker')
+
+    def _abandon_pool(self):
+        """Send later jobs to a new pool; the old one finishes what it has, then exits"""
+        pool, self._pool = self._pool, self._new_pool()
+        pool.shutdown(wait=False)
+
+    def submit(self, func, on_done, on_error=None, timeout=None, on_timeout=None):
+        """Run ``func()`` on a worker.
+
+        ``on_done(result)`` or ``on_error(exception)`` follows on the main
+        thread. If ``timeout`` seconds pass first, the job is cancelled and
+        ``on_timeout()`` is called instead.
+        """
+        job = Job(self._pool.submit(func), self)
+        if timeout is not None:
+            job._timeout_event = self.schedule(functools.partial(self._expire, job, on_timeout), timeout)
+        job.future.add_done_callback(
+            lambda future: self.schedule(functools.partial(self._finish, job, on_done, on_error), 0))
+        return job
+
+    def _finish(self, job, on_done, on_error, dt):
+        if job.cancelled or job.future.cancelled():
+            return
+        if job._timeout_event is not None:
+            job._timeout_event.cancel()
+            job._timeout_event = None
+        error = job.future.exception()
+        if error is None:
+            on_done(job.future.result())
+        elif on_error is not None:
+            on_error(error)
+
+    def _expire(self, job, on_timeout, dt):
+        if job.cancelled or job.done:
+            return
+        job._timeout_event = None
+        job.cancel()
+        if on_timeout is not None:
+            on_timeout()
+
+    def shutdown(self):
+        """Stop accepting work; running jobs are abandoned, not waited for"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,169 @@
+"""Headless batch mode: run a file of calculations through the calculator math.
+
+Each input line is either an expression in keypad syntax::
+
+    (2+3)×4
+    sin(30) + ln(7)
+
+or a unit conversion, written ``<value> <unit> -> <unit>``. Units are the
+converter's names or any unit string dimensions.py understands::
+
+    12.5 Mile -> Kilometer
+    98.6 Fahrenheit -> Celsius
+    9.81 m/s² -> ft/s²
+    3 kWh/day -> W
+
+Every line produces exactly one output line, formatted like the display
+(``format_number``) or ``Error``; blank and ``#`` comment lines produce
+blank lines. Lines are streamed in chunks through a process pool and written
+back in input order, and throughput is reported on stderr.
+
+Usage:  python batch.py [INPUT] [-o OUTPUT] [--workers N] [--chunk-size N]
+"""
+import argparse
+import collections
+import concurrent.futures
+import itertools
+import os
+import sys
+import time
+
+from dimensions import DimensionError, conversion_plan, parse_unit
+from engine import ERROR, format_number
+from expression import compile_expression
+from units import UNIT_CONVERSIONS
+
+CONVERSION_ARROW = '->'
+
+# Converter unit name -> unit string; names are unique across categories
+UNIT_SYMBOLS = {name: symbol for units in UNIT_CONVERSIONS.values() for name, symbol in units.items()}
+
+
+def _unit(text):
+    """Unit string for a converter name or a unit string"""
+    return UNIT_SYMBOLS.get(text, text)
+
+
+def _split_unit(text):
+    """Split '12.5 Nautical Mile' into ('12.5', 'Nautical Mile')"""
+    words = text.split()
+    for start in range(1, len(words)):
+        unit = ' '.join(words[start:])
+        if unit in UNIT_SYMBOLS:
+            return ' '.join(words[:start]), unit
+        try:
+            parse_unit(unit)
+        except DimensionError:
+            continue
+        return ' '.join(words[:start]), unit
+    raise ValueError(f"no unit in {text!r}")
+
+
+def evaluate_line(line):
+    """Result of one input line, as display text"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return ''
+    try:
+        if CONVERSION_ARROW in line:
+            source, to_unit = (part.strip() for part in line.split(CONVERSION_ARROW, 1))
+            value_text, from_unit = _split_unit(source)
+            scale, offset = conversion_plan(_unit(from_unit), _unit(to_unit))
+            value = compile_expression(value_text).evaluate()
+            return format_number(value * scale + offset)
+        return format_number(compile_expression(line).evaluate())
+    except (ArithmeticError, ValueError, KeyError):
+        return ERROR
+
+
+def evaluate_chunk(lines):
+    """Worker entry point: results for a list of lines"""
+    return [evaluate_line(line) for line in lines]
+
+
+def chunked(lines, size):
+    iterator = iter(lines)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(lines, workers=None, chunk_size=2000):
+    """Yield one result per input line, in order.
+
+    With ``workers`` of 1 or less everything runs in this process; otherwise
+    chunks go to a process pool with a bounded number in flight, so memory
+    stays flat however long the input is.
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    chunks = chunked(lines, chunk_size)
+    if workers is not None and workers <= 1:
+        for chunk in chunks:
+            yield from evaluate_chunk(chunk)
+        return
+
+    first = next(chunks, None)
+    if first is None:
+        return
+    second = next(chunks, None)
+    if second is None:
+        # Not worth starting a pool for a single chunk
+        yield from evaluate_chunk(first)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        for chunk in itertools.chain((first, second), chunks):
+            pending.append(pool.submit(evaluate_chunk, chunk))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Evaluate calculator expressions and conversions in bulk.')
+    parser.add_argument('input', nargs='?', help='input file (default: stdin)')
+    parser.add_argument('-o', '--output', help='output file (default: stdout)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='worker processes; 1 runs everything in-process')
+    parser.add_argument('--chunk-size', type=_positive_int, default=2000, help='lines per worker task')
+    parser.add_argument('--quiet', action='store_true', help='do not report throughput')
+    args = parser.parse_args(argv)
+
+    source = open(args.input, encoding='utf-8') if args.input else sys.stdin
+    target = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    count = 0
+    start = time.perf_counter()
+    try:
+        for result in run(source, args.workers, args.chunk_size):
+            target.write(result)
+            target.write('\n')
+            count += 1
+    finally:
+        if args.input:
+            source.close()
+        if args.output:
+            target.close()
+
+    elapsed = time.perf_counter() - start
+    if not args.quiet:
+        rate = count / elapsed if elapsed else float('inf')
+        print(f"{count} lines in {elapsed:.3f} s ({rate:,.0f} lines/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Parse + evaluate throughput of the expression compiler.
+
+Run from the repository root:  python benchmarks/bench_expression.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expression import compile_expression
+
+TERMS = ['sin(30)', '2.5', 'ANS', '(1+2)', '√16', '3²', 'ln(7)', '1.5e3', '4!', 'π']
+OPERATORS = ['+', '-', '×', '÷', '^', ' mod ']
+
+
+def make_expression(rng, terms):
+    """Random long expression with ``terms`` operands"""
+    parts = [rng.choice(TERMS)]
+    for _ in range(terms - 1):
+        op = rng.choice(OPERATORS)
+        # Keep powers small so long chains do not overflow
+        parts.append(op)
+        parts.append('2' if op == '^' else rng.choice(TERMS))
+    return '(' + ''.join(parts) + ')'
+
+
+def bench(label, func, count):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {count / elapsed:>12,.0f} /s   ({elapsed * 1000:.1f} ms)")
+
+
+def main():
+    rng = random.Random(42)
+    env = {'ANS': 3.0}
+    for terms in (10, 100, 500):
+        expressions = [make_expression(rng, terms) for _ in range(200)]
+        print(f"-- {terms} operands, {len(expressions)} expressions")
+
+        def parse_and_evaluate():
+            compile_expression.cache_clear()
+            for text in expressions:
+                try:
+                    compile_expression(text).evaluate(env)
+                except ArithmeticError:
+                    pass
+
+        def cached_evaluate():
+            for _ in range(10):
+                for text in expressions:
+                    try:
+                        compile_expression(text).evaluate(env)
+                    except ArithmeticError:
+                        pass
+
+        bench('parse + evaluate', parse_and_evaluate, len(expressions))
+        bench('cached evaluate', cached_evaluate, 10 * len(expressions))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Factorial benchmarks: memoized table + Lanczos gamma vs the old n! branch.
+
+Run from the repository root:  python benchmarks/bench_factorial.py
+"""
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from factorial import calculator_factorial
+
+
+def legacy_factorial(value):
+    """The n! branch of the old on_scientific"""
+    if value >= 0 and value == int(value) and value <= 170:
+        return math.factorial(int(value))
+    return 'Error'
+
+
+def workloads():
+    rng = random.Random(7)
+    return {
+        'repeated 170!': [170.0] * 1000,
+        'sequential 0..170': [float(n) for n in range(171)] * 6,
+        'random 0..170': [float(rng.randint(0, 170)) for _ in range(1000)],
+    }
+
+
+def bench(func, values, number=20):
+    seconds = min(timeit.repeat(lambda: [func(v) for v in values], number=number, repeat=5))
+    return len(values) * number / seconds
+
+
+def main():
+    print(f"{'workload':<22} {'legacy /s':>14} {'new /s':>14} {'speedup':>8}")
+    for label, values in workloads().items():
+        old = bench(legacy_factorial, values)
+        new = bench(calculator_factorial, values)
+        print(f"{label:<22} {old:>14,.0f} {new:>14,.0f} {new / old:>7.2f}x")
+
+    # Inputs the old code rejected with 'Error'
+    print()
+    for label, values in (('gamma 0.5..170.5', [n + 0.5 for n in range(171)]),
+                          ('log-gamma 171..10^6', [float(n) for n in range(171, 10 ** 6, 5000)])):
+        print(f"{label:<22} {'Error':>14} {bench(calculator_factorial, values):>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Number formatting benchmarks: formatting.format_number vs the old function.
+
+Checks that both give identical text over the whole corpus, then times each
+input class. Configurable readouts from make_formatter are timed alongside
+for reference.
+
+Run from the repository root:  python benchmarks/bench_format.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from formatting import _legacy_format, format_number, make_formatter
+
+
+def corpus():
+    rng = random.Random(11)
+    n = 20000
+    return {
+        'small ints': [rng.randint(-1000, 1000) for _ in range(n)],
+        'integral floats': [float(rng.randint(-10 ** 9, 10 ** 9)) for _ in range(n)],
+        'decimals (a/10^k)': [rng.randint(-10 ** 6, 10 ** 6) / 10 ** rng.randint(1, 6) for _ in range(n)],
+        'random floats 0..1': [rng.random() for _ in range(n)],
+        'wide magnitudes': [rng.uniform(-10, 10) * 10.0 ** rng.randint(-30, 30) for _ in range(n)],
+        'near-integers': [rng.randint(0, 1000) + rng.choice((1e-10, -1e-10, 3e-9)) for _ in range(n)],
+        'huge ints': [rng.randint(10 ** 20, 10 ** 40) for _ in range(n // 10)],
+    }
+
+
+def bench(func, values, number=5):
+    seconds = min(timeit.repeat(lambda: [func(v) for v in values], number=number, repeat=5))
+    return len(values) * number / seconds
+
+
+def main():
+    workloads = corpus()
+    for label, values in workloads.items():
+        for value in values:
+            if format_number(value) != _legacy_format(value):
+                sys.exit(f"mismatch in {label}: {value!r}: "
+                         f"{format_number(value)!r} != {_legacy_format(value)!r}")
+    print(f"identical output on {sum(map(len, workloads.values())):,} values\n")
+
+    print(f"{'workload':<20} {'legacy /s':>13} {'new /s':>13} {'speedup':>8}")
+    everything = [value for values in workloads.values() for value in values]
+    for label, values in list(workloads.items()) + [('all', everything)]:
+        old = bench(_legacy_format, values)
+        new = bench(format_number, values)
+        print(f"{label:<20} {old:>13,.0f} {new:>13,.0f} {new / old:>7.2f}x")
+
+    print()
+    variants = {
+        'sig_figs=4': make_formatter(sig_figs=4),
+        'eng, sig_figs=4': make_formatter(notation='eng', sig_figs=4),
+        'grouping': make_formatter(grouping=True),
+        'width=12': make_formatter(width=12),
+    }
+    for label, formatter in variants.items():
+        print(f"{label:<20} {'':>13} {bench(formatter, everything, number=1):>13,.0f}")
+
+
+if __name__ == '__main__':
+    main()
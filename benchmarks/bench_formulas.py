@@ -0,0 +1,39 @@
+"""Compiled Relativity formulas: scalar calls and whole-array sweeps.
+
+Run from the repository root:  python benchmarks/bench_formulas.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import constants
+from constants import CONSTANTS_INDEX
+
+
+def timed(label, func, count):
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    print(f"{label:<38} {count / seconds:>14,.0f} /s   ({seconds * 1000:.1f} ms)")
+
+
+def main():
+    rng = random.Random(3)
+    schwarzschild = CONSTANTS_INDEX.get('Schwarzschild Radius')
+    lorentz = CONSTANTS_INDEX.get('Lorentz Factor (γ)')
+    c = CONSTANTS_INDEX.get('Speed of Light (c)').value
+
+    masses = [rng.uniform(0.1, 100) * 1.98847e30 for _ in range(10 ** 6)]
+    velocities = [c * i / 10 ** 5 for i in range(10 ** 5)]
+    print(f"-- NumPy {'available' if constants.numpy is not None else 'not installed'}")
+
+    timed('Schwarzschild, scalar calls (10^5)', lambda: [schwarzschild(m) for m in masses[:10 ** 5]], 10 ** 5)
+    timed('Schwarzschild, one array (10^6)', lambda: schwarzschild(masses), 10 ** 6)
+    timed('Lorentz sweep 0..c, one array (10^5)', lambda: lorentz(velocities), 10 ** 5)
+
+
+if __name__ == '__main__':
+    main()
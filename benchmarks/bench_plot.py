@@ -0,0 +1,58 @@
+"""Plot sampling: adaptive + incremental PlotSampler vs uniform resampling.
+
+For each curve, a first view, a 10% pan and a 4x zoom are sampled for a
+600 px wide plot. The baseline re-evaluates 2 points per pixel from scratch
+on every view.
+
+Run from the repository root:  python benchmarks/bench_plot.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plotting import MAX_DENSITY, PlotFunction, PlotSampler
+
+PIXELS = 600
+
+CURVES = {
+    'sin(x)': (-10.0, 10.0),
+    'tan(x)': (-5.0, 5.0),
+    'b÷T': (100.0, 6000.0),
+    '1÷√(1−v²÷c²)': (0.0, 3.1e8),
+}
+
+
+def views(start, end):
+    width = end - start
+    yield 'first view', start, end
+    yield 'pan 10%', start + width * 0.1, end + width * 0.1
+    yield 'zoom 4x', start + width * 0.475, start + width * 0.725
+
+
+def uniform(function, start, end):
+    count = int(PIXELS * MAX_DENSITY)
+    return function.evaluate_many([start + (end - start) * i / (count - 1) for i in range(count)])
+
+
+def main():
+    print(f"{'curve':<16} {'view':<11} {'uniform evals':>13} {'ms':>7} {'adaptive evals':>15} {'ms':>7}")
+    for text, (start, end) in CURVES.items():
+        function = PlotFunction(text)
+        sampler = PlotSampler(function)
+        for label, x0, x1 in views(start, end):
+            begin = time.perf_counter()
+            uniform(function, x0, x1)
+            uniform_ms = (time.perf_counter() - begin) * 1000
+
+            before = sampler.evaluations
+            begin = time.perf_counter()
+            sampler.view(x0, x1, PIXELS)
+            adaptive_ms = (time.perf_counter() - begin) * 1000
+            print(f"{text:<16} {label:<11} {int(PIXELS * MAX_DENSITY):>13} {uniform_ms:>7.2f} "
+                  f"{sampler.evaluations - before:>15} {adaptive_ms:>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""RPN mode against algebraic entry for the same chained calculations.
+
+Each chain is keyed in both modes, the way a user would press the keys,
+and the final results are compared. Algebraic mode formats every
+intermediate result for the display and parses it back as the next
+operand; RPN keeps intermediates as doubles on the stack. In the app,
+algebraic '=' and scientific keys also go through the worker thread and
+come back a frame later, while RPN keys are applied directly; that hop is
+not part of these timings.
+
+Run from the repository root:  python benchmarks/bench_rpn.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import CalculatorEngine
+from rpn import RPNEngine
+
+REPEATS = 2000
+
+# name -> (algebraic keys, RPN keys); scientific keys are prefixed with '!'
+CHAINS = {
+    '(2+3)×4−5': (
+        ['2', '+', '3', '=', '×', '4', '=', '−', '5', '='],
+        ['2', 'ENTER', '3', '+', '4', '×', '5', '−'],
+    ),
+    'sin(30)²+cos(30)²': (
+        ['3', '0', '!sin', '!x²', 'MS', 'C', '3', '0', '!cos', '!x²', '+', 'MR', '='],
+        ['3', '0', '!sin', '!x²', '3', '0', '!cos', '!x²', '+'],
+    ),
+    '√(3²+4²)÷5': (
+        ['3', '!x²', '+', '4', '!x²', '=', '!√', '÷', '5', '='],
+        ['3', '!x²', '4', '!x²', '+', '!√', '5', '÷'],
+    ),
+    'running sum ×20': (
+        ['1', '.', '5'] + ['+', '1', '.', '5', '='] * 20,
+        ['1', '.', '5'] + ['ENTER', '1', '.', '5', '+'] * 20,
+    ),
+}
+
+
+def run(engine, keys):
+    text = None
+    for key in keys:
+        if key.startswith('!'):
+            text = engine.scientific(key[1:])
+        elif key.startswith('M'):
+            text = engine.memory(key)
+        else:
+            text = engine.press(key)
+    return text
+
+
+def timed(engine, keys):
+    keys = ['C'] + keys
+    begin = time.perf_counter()
+    for _ in range(REPEATS):
+        text = run(engine, keys)
+    return text, (time.perf_counter() - begin) / REPEATS
+
+
+def main():
+    print(f"{'chain':<20} {'algebraic':>12} {'RPN':>12} {'speed-up':>9}   result")
+    for name, (algebraic_keys, rpn_keys) in CHAINS.items():
+        algebraic, algebraic_seconds = timed(CalculatorEngine(), algebraic_keys)
+        rpn, rpn_seconds = timed(RPNEngine(CalculatorEngine()), rpn_keys)
+        match = 'same' if algebraic == rpn else f"differs: {algebraic} vs {rpn}"
+        print(f"{name:<20} {algebraic_seconds * 1e6:>9.1f} µs {rpn_seconds * 1e6:>9.1f} µs "
+              f"{algebraic_seconds / rpn_seconds:>8.1f}×   {rpn} ({match})")
+
+
+if __name__ == '__main__':
+    main()
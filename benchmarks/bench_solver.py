@@ -0,0 +1,87 @@
+"""Solver accuracy and throughput against known analytic answers.
+
+Roots: Brent iterations, function evaluations and error for classic test
+equations, plus a bracket scan of sin(x) over 20 periods. Integrals:
+adaptive Gauss–Kronrod error, evaluations and intervals, timed with the
+batched evaluation (``evaluate_many``) against a point-by-point baseline.
+
+Run from the repository root:  python benchmarks/bench_solver.py
+"""
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plotting import PlotFunction
+from solver import brent, find_roots, integrate
+
+REPEATS = 20
+
+# function, bracket, exact root
+ROOTS = (
+    ('cos(x)−x', 0.0, 1.0, 0.7390851332151607),
+    ('x³−2×x−5', 2.0, 3.0, 2.0945514815423265),
+    ('ln(x)−1', 1.0, 4.0, math.e),
+    ('e^x−2', 0.0, 1.0, math.log(2)),
+    ('sin(x)', 3.0, 4.0, math.pi),
+    ('x^9', -1.0, 1.5, 0.0),
+)
+
+# function, interval, exact integral
+INTEGRALS = (
+    ('sin(x)', 0.0, math.pi, 2.0),
+    ('e^x', 0.0, 1.0, math.e - 1),
+    ('ln(x)', 1.0, math.e, 1.0),
+    ('√x', 0.0, 1.0, 2 / 3),
+    ('1÷(1+x²)', 0.0, 1.0, math.pi / 4),
+    ('sin(x)²', 0.0, 100.0, 50 - math.sin(200) / 4),
+    ('e^(−x²)', -10.0, 10.0, math.sqrt(math.pi)),
+)
+
+
+class Scalar:
+    """A function without evaluate_many, so batches fall back to a loop"""
+
+    def __init__(self, function):
+        self.function = function
+
+    def __call__(self, x):
+        return self.function(x)
+
+
+def timed(func):
+    begin = time.perf_counter()
+    for _ in range(REPEATS):
+        result = func()
+    return result, (time.perf_counter() - begin) / REPEATS * 1000
+
+
+def main():
+    print(f"{'root of':<12} {'iter':>5} {'evals':>6} {'error':>10} {'ms':>8}  converged")
+    for text, a, b, exact in ROOTS:
+        function = PlotFunction(text)
+        result, ms = timed(lambda: brent(function, a, b))
+        print(f"{text:<12} {result.iterations:>5} {result.evaluations:>6} "
+              f"{abs(result.root - exact):>10.1e} {ms:>8.3f}  {result.converged}")
+
+    function = PlotFunction('sin(x)')
+    roots, ms = timed(lambda: find_roots(function, 0.5, 40 * math.pi - 0.5, samples=400))
+    worst = max(abs(r.root - math.pi * round(r.root / math.pi)) for r in roots)
+    print(f"scan sin(x): {len(roots)} roots, max error {worst:.1e}, {ms:.2f} ms")
+
+    print()
+    print(f"{'integral of':<12} {'error':>10} {'estimate':>10} {'evals':>6} {'ivals':>6} "
+          f"{'batch ms':>9} {'loop ms':>9} {'Mpts/s':>7}")
+    for text, a, b, exact in INTEGRALS:
+        function = PlotFunction(text)
+        result, batch_ms = timed(lambda: integrate(function, a, b))
+        _, loop_ms = timed(lambda: integrate(Scalar(function), a, b))
+        rate = result.evaluations / batch_ms / 1000
+        print(f"{text:<12} {abs(result.value - exact):>10.1e} {result.error:>10.1e} "
+              f"{result.evaluations:>6} {result.intervals:>6} {batch_ms:>9.3f} {loop_ms:>9.3f} {rate:>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
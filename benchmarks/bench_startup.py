@@ -0,0 +1,89 @@
+"""Headless cold-start benchmark for main.py.
+
+Launches the app repeatedly with the startup profiler enabled, Kivy's mock
+GL backend and SDL's dummy video driver, so it runs on a Linux box without a
+display. Each run exits after its first frame. Prints the median of every
+section and fails (exit status 1) when the import phase or the first frame
+exceeds its budget.
+
+Run from the repository root:  python benchmarks/bench_startup.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEADLESS_ENV = {
+    'KIVY_GL_BACKEND': 'mock',
+    'SDL_VIDEODRIVER': 'dummy',
+    'KIVY_NO_ARGS': '1',
+    'KIVY_NO_CONSOLELOG': '1',
+    'KIVY_NO_FILELOG': '1',
+    'PHYSCALC_PROFILE_EXIT': '1',
+}
+
+IMPORT_SECTIONS = ('import kivy', 'import engine (math)',
+                   'setup PHYSICS_CONSTANTS', 'setup UNIT_CONVERSIONS')
+
+
+def run_once(report_path, timeout):
+    env = dict(os.environ, **HEADLESS_ENV)
+    env['PHYSCALC_PROFILE_STARTUP'] = report_path
+    subprocess.run([sys.executable, 'main.py'], cwd=ROOT, env=env,
+                   timeout=timeout, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    with open(report_path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def summarize(reports):
+    """Median duration per section plus import and first-frame totals"""
+    durations = {}
+    for report in reports:
+        for section in report['sections']:
+            durations.setdefault(section['name'], []).append(section['duration_ms'])
+    summary = {name: statistics.median(values) for name, values in durations.items()}
+    summary['imports total'] = sum(summary.get(name, 0.0) for name in IMPORT_SECTIONS)
+    summary['first_frame'] = statistics.median(r['marks_ms']['first_frame'] for r in reports)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--import-budget-ms', type=float, default=1500.0)
+    parser.add_argument('--first-frame-budget-ms', type=float, default=4000.0)
+    parser.add_argument('--output', help='write the summary as JSON here')
+    args = parser.parse_args(argv)
+
+    reports = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in range(args.runs):
+            reports.append(run_once(os.path.join(tmp, f'run{run}.json'), args.timeout))
+
+    summary = summarize(reports)
+    for name, value in summary.items():
+        print(f"{name:<32} {value:>10.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump({'runs': args.runs, 'median_ms': summary}, handle, indent=2)
+
+    failed = False
+    if summary['imports total'] > args.import_budget_ms:
+        print(f"FAIL: imports {summary['imports total']:.1f} ms > budget {args.import_budget_ms:.0f} ms")
+        failed = True
+    if summary['first_frame'] > args.first_frame_budget_ms:
+        print(f"FAIL: first frame {summary['first_frame']:.1f} ms > budget {args.first_frame_budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""STAT mode: keypad pushes and the bulk dataset path.
+
+Times Welford pushes one value at a time, then the bulk path (parse, reduce,
+merge) for 10^6 values and 10^6 pairs given as pasted text. Results are
+checked against the statistics module's two-pass answers.
+
+Run from the repository root:  python benchmarks/bench_stats.py
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stats
+
+PUSHES = 10 ** 5
+BULK = 10 ** 6
+
+
+def timed(func):
+    begin = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - begin
+
+
+def main():
+    random.seed(2024)
+    print(f"NumPy: {'yes' if stats.numpy is not None else 'no'}")
+
+    # Offset data is where a naive sum-of-squares variance loses digits
+    values = [1e9 + random.gauss(0, 1) for _ in range(PUSHES)]
+    session = stats.StatsSession()
+    _, seconds = timed(lambda: [session.enter(value) for value in values])
+    error = abs(session.x.std / statistics.stdev(values) - 1)
+    print(f"{'push (Welford)':<22} {PUSHES:>9,} values {seconds * 1e9 / PUSHES:>9.0f} ns/value"
+          f"   stdev rel. error {error:.1e}")
+
+    values = [random.gauss(10, 2) for _ in range(BULK)]
+    text = '\n'.join(map(repr, values))
+    session = stats.StatsSession()
+    dataset, seconds = timed(lambda: stats.dataset_moments(text))
+    _, merge_seconds = timed(lambda: session.merge(dataset))
+    error = abs(session.x.std / statistics.stdev(values) - 1)
+    print(f"{'bulk values':<22} {BULK:>9,} values {seconds:>9.3f} s        "
+          f"   stdev rel. error {error:.1e}   merge {merge_seconds * 1e6:.1f} µs")
+
+    xs = [random.uniform(0, 100) for _ in range(BULK)]
+    ys = [3.0 * x - 7.0 + random.gauss(0, 1) for x in xs]
+    text = '\n'.join(f"{x!r}, {y!r}" for x, y in zip(xs, ys))
+    session = stats.StatsSession()
+    dataset, seconds = timed(lambda: stats.dataset_moments(text))
+    session.merge(dataset)
+    expected = statistics.linear_regression(xs, ys)
+    error = abs(session.fit.slope / expected.slope - 1)
+    print(f"{'bulk pairs':<22} {BULK:>9,} pairs  {seconds:>9.3f} s        "
+          f"   slope rel. error {error:.1e}")
+
+
+if __name__ == '__main__':
+    main()
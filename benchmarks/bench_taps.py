@@ -0,0 +1,102 @@
+"""Synthetic tap-storm benchmark for CalculatorButton press feedback.
+
+Simulates thousands of press/release pairs spread over a keypad's worth of
+buttons, ticking the Kivy clock between bursts, and reports per-frame time
+and memory allocated while the storm runs. --legacy measures the old
+one-Animation-per-tap behaviour for comparison.
+
+Runs headless (mock GL backend, dummy SDL video).
+Run from the repository root:  python benchmarks/bench_taps.py --taps 20000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('KIVY_GL_BACKEND', 'mock')
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kivy.config import Config
+
+# Never sleep in Clock.tick(): we want raw frame cost
+Config.set('graphics', 'maxfps', '0')
+
+from kivy.animation import Animation
+from kivy.clock import Clock
+
+from widgets import CalculatorButton
+
+
+class LegacyButton(CalculatorButton):
+    """Pre-PressFader behaviour: a fresh Animation per press and release"""
+
+    def on_press(self):
+        Animation(opacity=0.7, duration=0.05).start(self)
+
+    def on_release(self):
+        Animation(opacity=1, duration=0.05).start(self)
+
+
+def storm(button_class, taps, buttons, taps_per_frame):
+    keypad = [button_class(text=str(i)) for i in range(buttons)]
+    frame_times = []
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    for tap in range(taps):
+        button = keypad[tap % buttons]
+        button.dispatch('on_press')
+        button.dispatch('on_release')
+        if tap % taps_per_frame == taps_per_frame - 1:
+            frame_start = time.perf_counter()
+            Clock.tick()
+            frame_times.append(time.perf_counter() - frame_start)
+    # Let in-flight fades finish
+    for _ in range(10):
+        Clock.tick()
+    elapsed = time.perf_counter() - start
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    allocated = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+    allocations = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    frame_times.sort()
+    return {
+        'taps_per_s': taps / elapsed,
+        'frame_mean_ms': statistics.mean(frame_times) * 1000,
+        'frame_p99_ms': frame_times[int(len(frame_times) * 0.99) - 1] * 1000,
+        'retained_kib': allocated / 1024,
+        'retained_blocks': allocations,
+        'peak_kib': peak / 1024,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--taps', type=int, default=10000)
+    parser.add_argument('--buttons', type=int, default=25)
+    parser.add_argument('--taps-per-frame', type=int, default=4)
+    parser.add_argument('--legacy', action='store_true', help='also run the old Animation path')
+    args = parser.parse_args(argv)
+
+    variants = [('PressFader', CalculatorButton)]
+    if args.legacy:
+        variants.append(('Animation per tap', LegacyButton))
+    for label, button_class in variants:
+        result = storm(button_class, args.taps, args.buttons, args.taps_per_frame)
+        print(f"-- {label}")
+        for key, value in result.items():
+            print(f"   {key:<16} {value:>12,.3f}")
+
+
+if __name__ == '__main__':
+    main()
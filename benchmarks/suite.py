@@ -0,0 +1,289 @@
+"""Benchmark suite for the calculator's hot paths, with JSON results.
+
+Runs headless (no Kivy, no window) and covers:
+
+* format_number over the corpus of bench_format.py,
+* every unit pair of every category, through the precomputed table that
+  convert_value uses, and convert_temperature for every pair,
+* each scientific key, through CalculatorEngine.scientific as
+  on_scientific runs it (n! on the worker, the others inline),
+* calculate chains: operator, operand and '=' repeated on one engine,
+* constant selection as on_constant_change does it (and formulas as
+  APPLY applies them), plus the field list and search lookups behind the
+  pickers.
+
+A case does a fixed amount of work. Timing it is repeated, and the best
+time is reported in ns per operation, so runs on the same machine can be
+compared. Results are written as JSON. Given the JSON of an earlier run
+as a baseline, every case slower by more than the threshold is listed and
+the exit status is 1. Busy and virtual machines drift by tens of percent
+between runs, so compare runs from the same machine and keep the
+threshold above the spread seen between two runs of unchanged code.
+
+Run from the repository root:
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --baseline results.json --threshold 0.2
+
+The Benchmarks workflow compares every push and pull request with a
+baseline kept in the Actions cache. The baseline is only replaced by a
+run started by hand with 'promote', so small slowdowns cannot pile up.
+"""
+import argparse
+import collections
+import datetime
+import json
+import math
+import os
+import platform
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_format import corpus
+from constants import CONSTANTS_INDEX
+from engine import CalculatorEngine
+from formatting import format_number
+from units import UNIT_CONVERSIONS, conversion_table, convert_temperature
+
+# ``run()`` performs ``ops`` operations of the path being measured
+Case = collections.namedtuple('Case', 'name ops run')
+
+FORMAT = 1
+REPEATS = 7
+# Each timed repeat calls run() often enough to last at least this long
+MIN_SECONDS = 0.02
+DEFAULT_THRESHOLD = 0.25
+
+# The scientific grid of the app, less the mode keys and Σ+, plus the
+# hyperbolic functions 'hyp' turns the trig keys into
+SCIENTIFIC_KEYS = (
+    'sin', 'cos', 'tan', 'log', 'ln', '10^x',
+    'x²', 'x³', 'x^y', '√', '∛', 'e^x',
+    'π', 'e', 'n!', '1/x', '|x|', 'mod',
+    'sin⁻¹', 'cos⁻¹', 'tan⁻¹',
+    'sinh', 'cosh', 'tanh', 'sinh⁻¹', 'cosh⁻¹', 'tanh⁻¹',
+)
+# Operands the keys are applied to; each key gets values inside its domain
+OPERANDS = (0.125, 0.25, 0.5, 0.75)
+KEY_OPERANDS = {
+    'n!': (5.0, 20.0, 69.0, 170.0),
+    'cosh⁻¹': (1.5, 2.0, 10.0, 100.0),
+}
+# Second operand of the keys that wait for one
+PENDING_OPERAND = '3'
+
+CHAIN_KEYS = ('+', '−', '×', '÷')
+CHAIN_LENGTH = 50
+
+SEARCHES = ('planck', 'mass', 'electron', 'constant', 'x')
+
+
+# ============ Cases ============
+def format_cases():
+    cases = []
+    for label, values in corpus().items():
+        def run(values=values):
+            for value in values:
+                format_number(value)
+        cases.append(Case(f"format_number/{label}", len(values), run))
+    return cases
+
+
+def conversion_cases():
+    cases = []
+    for category in UNIT_CONVERSIONS:
+        table = conversion_table(category)
+        pairs = [(i, j) for i in range(len(table.units)) for j in range(len(table.units))]
+
+        def run(table=table, pairs=pairs):
+            for from_index, to_index in pairs:
+                table.convert(273.15, from_index, to_index)
+        cases.append(Case(f"convert_value/{category}", len(pairs), run))
+
+    units = list(UNIT_CONVERSIONS['Temperature'])
+    pairs = [(a, b) for a in units for b in units]
+
+    def run():
+        for from_unit, to_unit in pairs:
+            convert_temperature(273.15, from_unit, to_unit)
+    cases.append(Case('convert_temperature/all pairs', len(pairs), run))
+    return cases
+
+
+def scientific_cases():
+    cases = []
+    for key in SCIENTIFIC_KEYS:
+        engine = CalculatorEngine()
+        operands = [(format_number(value), value) for value in KEY_OPERANDS.get(key, OPERANDS)]
+        if key in ('x^y', 'mod'):
+            def run(engine=engine, key=key, operands=operands):
+                for text, value in operands:
+                    engine.load(text, value)
+                    engine.scientific(key)
+                    engine.press(PENDING_OPERAND)
+                    engine.press('=')
+        else:
+            def run(engine=engine, key=key, operands=operands):
+                for text, value in operands:
+                    engine.load(text, value)
+                    engine.scientific(key)
+        cases.append(Case(f"on_scientific/{key}", len(operands), run))
+    return cases
+
+
+def calculate_cases():
+    cases = []
+    for key in CHAIN_KEYS + ('mixed',):
+        keys = CHAIN_KEYS if key == 'mixed' else (key,)
+        engine = CalculatorEngine()
+
+        def run(engine=engine, keys=keys):
+            engine.press('C')
+            engine.load('1.5', 1.5)
+            for i in range(CHAIN_LENGTH):
+                engine.press(keys[i % len(keys)])
+                engine.press('7')
+                engine.press('=')
+        cases.append(Case(f"calculate/{key} chain", CHAIN_LENGTH, run))
+    return cases
+
+
+def constant_cases():
+    names = [name for field in CONSTANTS_INDEX.fields for name in CONSTANTS_INDEX.field_names[field]]
+    engine = CalculatorEngine()
+
+    def select():
+        for name in names:
+            entry = CONSTANTS_INDEX.get(name)
+            if entry.is_formula and entry.computable:
+                engine.formula(entry)
+            else:
+                engine.load(entry.text, entry.value)
+
+    def fields():
+        for field in CONSTANTS_INDEX.fields:
+            CONSTANTS_INDEX.field_names.get(field, [])
+
+    def search():
+        for text in SEARCHES:
+            CONSTANTS_INDEX.search_names(text)
+
+    return [
+        Case('constants/select every constant', len(names), select),
+        Case('constants/field lists', len(CONSTANTS_INDEX.fields), fields),
+        Case('constants/search', len(SEARCHES), search),
+    ]
+
+
+def all_cases():
+    return format_cases() + conversion_cases() + scientific_cases() + calculate_cases() + constant_cases()
+
+
+# ============ Running and comparing ============
+def calibrate(case):
+    """A Timer for the case and how many calls make up one timing"""
+    timer = timeit.Timer(case.run)
+    # Doubles as the warm-up (caches, lazily loaded constants)
+    number = 1
+    while timer.timeit(number) < MIN_SECONDS:
+        number *= 2
+    return timer, number
+
+
+def run_suite(cases, repeats):
+    """Time every case and return the report that is saved as JSON.
+
+    Each case counts its best time, in ns per operation. Repeats are
+    interleaved, one round over all cases at a time, so a slow stretch of
+    the machine affects a round rather than a few cases.
+    """
+    timers = [calibrate(case) for case in cases]
+    best = [math.inf] * len(cases)
+    for _ in range(repeats):
+        for i, (timer, number) in enumerate(timers):
+            best[i] = min(best[i], timer.timeit(number) / number)
+    results = {}
+    for case, seconds in zip(cases, best):
+        results[case.name] = {'ns_per_op': seconds * 1e9 / case.ops, 'ops': case.ops}
+        print(f"{case.name:<44} {results[case.name]['ns_per_op']:>12,.0f} ns/op")
+    return {
+        'format': FORMAT,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'repeats': repeats,
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Print the change of every case against ``baseline``; returns the regressed names"""
+    old_results = baseline['results']
+    regressed = []
+    print(f"\n{'case':<44} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name, result in report['results'].items():
+        old = old_results.get(name)
+        if old is None:
+            print(f"{name:<44} {'(new)':>12} {result['ns_per_op']:>12,.0f}")
+            continue
+        ratio = result['ns_per_op'] / old['ns_per_op']
+        flag = ''
+        if ratio > 1 + threshold:
+            regressed.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<44} {old['ns_per_op']:>12,.0f} {result['ns_per_op']:>12,.0f} "
+              f"{ratio - 1:>+8.1%}{flag}")
+    for name in old_results.keys() - report['results'].keys():
+        print(f"{name:<44} {old_results[name]['ns_per_op']:>12,.0f} {'(gone)':>12}")
+    if baseline.get('platform') != report['platform'] or baseline.get('python') != report['python']:
+        print(f"\nnote: baseline ran on {baseline.get('platform')}, Python {baseline.get('python')}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the calculator hot paths')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='fail when a case is slower than the baseline by more than this '
+                             f'fraction (default {DEFAULT_THRESHOLD})')
+    parser.add_argument('--repeats', type=int, default=REPEATS,
+                        help=f'timed runs per case; the best counts (default {REPEATS})')
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this text')
+    parser.add_argument('--list', action='store_true', help='list the cases and exit')
+    args = parser.parse_args()
+    if args.threshold < 0:
+        parser.error('--threshold must not be negative')
+
+    cases = [case for case in all_cases() if args.filter in case.name]
+    if args.list:
+        for case in cases:
+            print(f"{case.name:<44} {case.ops:>8,} ops")
+        return
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        if baseline.get('format') != FORMAT:
+            sys.exit(f"{args.baseline} is not a format {FORMAT} results file")
+
+    report = run_suite(cases, args.repeats)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+            handle.write('\n')
+        print(f"\nresults written to {args.output}")
+
+    if baseline is not None:
+        regressed = compare(report, baseline, args.threshold)
+        if regressed:
+            sys.exit(f"\n{len(regressed)} case(s) slower than the baseline by more than "
+                     f"{args.threshold:.0%}: {', '.join(regressed)}")
+        print(f"\nno case slower than the baseline by more than {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
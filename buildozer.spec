@@ -13,7 +13,10 @@ package.domain = org.example
 source.dir = .
 
 # الملفات المرفوعة
-source.include_exts = py,png,jpg,kv,atlas,txt
+source.include_exts = py,png,jpg,kv,atlas,txt,dat
+
+# المجلدات المستثناة من الحزمة (أدوات القياس لا تُشحن)
+source.exclude_dirs = benchmarks
 
 # الإصدار
 version = 0.1
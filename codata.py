@@ -0,0 +1,253 @@
+"""The CODATA recommended values, read on demand from codata.dat.
+
+codata.dat holds every constant of the NIST "complete listing" with its
+value, standard uncertainty and unit. It has three parts:
+
+    magic b'CDAT', format version (uint16), header size (uint32)
+    header: UTF-8 lines, tab separated
+        edition                      e.g. "CODATA 2022"
+        unit, unit, ...              unit strings, referenced by index
+        field, name, name, ...       one line per field, in record order
+    records: value (float64), uncertainty (float64), unit index (uint16)
+
+Opening the file reads only the header, so the field and name lists are
+available at once. The records are fixed size and the file is memory
+mapped, so a constant's numbers are unpacked only when it is asked for.
+An uncertainty of 0 means the value is exact.
+
+The data file is generated from NIST's allascii.txt
+(https://physics.nist.gov/cuu/Constants/Table/allascii.txt):
+
+    python codata.py allascii.txt codata.dat
+"""
+import math
+import mmap
+import os
+import struct
+
+MAGIC = b'CDAT'
+VERSION = 1
+PREAMBLE = struct.Struct('<4sHI')
+RECORD = struct.Struct('<ddH')
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'codata.dat')
+
+
+class CodataFile:
+    """Header of a codata.dat file, with records decoded on request"""
+
+    def __init__(self, path=DATA_FILE):
+        with open(path, 'rb') as handle:
+            self._data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_size = PREAMBLE.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} CODATA file")
+        lines = self._data[PREAMBLE.size:PREAMBLE.size + header_size].decode('utf-8').split('\n')
+        self._base = PREAMBLE.size + header_size
+        self.edition = lines[0]
+        self.units = lines[1].split('\t')
+        # Field -> constant names, in record order
+        self.fields = {}
+        for line in lines[2:]:
+            field, *names = line.split('\t')
+            self.fields[field] = names
+        self.count = sum(len(names) for names in self.fields.values())
+
+    def record(self, index):
+        """(value, uncertainty, unit) of the index-th constant"""
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        value, uncertainty, unit = RECORD.unpack_from(self._data, self._base + RECORD.size * index)
+        return value, uncertainty, self.units[unit]
+
+
+def load(path=DATA_FILE):
+    """The CodataFile at ``path``, or None if it is missing"""
+    try:
+        return CodataFile(path)
+    except FileNotFoundError:
+        return None
+
+
+# ============ Building codata.dat ============
+# First matching rule picks the field: (field, name prefixes, name substrings)
+FIELD_RULES = (
+    ('CODATA Energy Equivalents', ('electron volt',), ('relationship',)),
+    ('CODATA Atomic & Natural Units', ('atomic unit of', 'natural unit of'), ()),
+    ('CODATA Electron', ('electron',), ()),
+    ('CODATA Muon', ('muon',), ()),
+    ('CODATA Tau', ('tau',), ()),
+    ('CODATA Proton', ('proton', 'shielded proton'), ()),
+    ('CODATA Neutron', ('neutron',), ()),
+    ('CODATA Light Nuclei', ('deuteron', 'triton', 'helion', 'shielded helion', 'alpha particle'), ()),
+    ('CODATA Adopted & X-ray', (
+        'conventional value', 'copper x unit', 'molybdenum x unit', 'angstrom star', 'lattice',
+        'silicon', 'molar volume of silicon', 'standard', 'luminous efficacy',
+        'hyperfine transition', 'molar mass constant', 'molar mass of carbon-12',
+    ), ()),
+    ('CODATA Physico-Chemical', (
+        'avogadro', 'boltzmann', 'faraday', 'loschmidt', 'molar', 'stefan', 'wien',
+        'first radiation', 'second radiation', 'atomic mass', 'sackur',
+    ), ()),
+    ('CODATA Electromagnetic', (
+        'elementary charge', 'mag. flux', 'conductance', 'inverse of conductance',
+        'josephson', 'von klitzing', 'bohr magneton', 'nuclear magneton',
+        'vacuum', 'characteristic impedance',
+    ), ()),
+    ('CODATA Universal', ('speed of light', 'newtonian', 'planck', 'reduced planck'), ()),
+)
+DEFAULT_FIELD = 'CODATA Atomic & Nuclear'
+
+
+def classify(name):
+    """Field a CODATA constant is listed under"""
+    lowered = name.lower()
+    for field, prefixes, substrings in FIELD_RULES:
+        if lowered.startswith(prefixes) or any(part in lowered for part in substrings):
+            return field
+    return DEFAULT_FIELD
+
+
+def _exact_values(values):
+    """Full-precision values of the exact constants NIST prints truncated ("...")"""
+    c = values['speed of light in vacuum']
+    h = values['Planck constant']
+    e = values['elementary charge']
+    k = values['Boltzmann constant']
+    n_a = values['Avogadro constant']
+    r = n_a * k
+    hbar = h / (2 * math.pi)
+    g_0 = 2 * e ** 2 / h
+    # Roots of (x - 3)e^x + 3 = 0 and (x - 5)e^x + 5 = 0 (Wien's law)
+    alpha_w = 2.821439372122078893403
+    x_w = 4.965114231744276303699
+    # Conventional electrical units of 1990
+    v_90 = values['conventional value of Josephson constant'] / (2 * e / h)
+    ohm_90 = (h / e ** 2) / values['conventional value of von Klitzing constant']
+    a_90 = v_90 / ohm_90
+    return {
+        'atomic unit of action': hbar,
+        'Boltzmann constant in eV/K': k / e,
+        'Boltzmann constant in Hz/K': k / h,
+        'Boltzmann constant in inverse meter per kelvin': k / (h * c),
+        'conductance quantum': g_0,
+        'conventional value of ampere-90': a_90,
+        'conventional value of coulomb-90': a_90,
+        'conventional value of farad-90': 1 / ohm_90,
+        'conventional value of henry-90': ohm_90,
+        'conventional value of ohm-90': ohm_90,
+        'conventional value of volt-90': v_90,
+        'conventional value of watt-90': v_90 ** 2 / ohm_90,
+        'electron volt-hertz relationship': e / h,
+        'electron volt-inverse meter relationship': e / (h * c),
+        'electron volt-kelvin relationship': e / k,
+        'electron volt-kilogram relationship': e / c ** 2,
+        'elementary charge over h-bar': e / hbar,
+        'Faraday constant': e * n_a,
+        'first radiation constant': 2 * math.pi * h * c ** 2,
+        'first radiation constant for spectral radiance': 2 * h * c ** 2,
+        'hertz-electron volt relationship': h / e,
+        'hertz-inverse meter relationship': 1 / c,
+        'hertz-kelvin relationship': h / k,
+        'hertz-kilogram relationship': h / c ** 2,
+        'inverse meter-electron volt relationship': h * c / e,
+        'inverse meter-joule relationship': h * c,
+        'inverse meter-kelvin relationship': h * c / k,
+        'inverse meter-kilogram relationship': h / c,
+        'inverse of conductance quantum': 1 / g_0,
+        'Josephson constant': 2 * e / h,
+        'joule-electron volt relationship': 1 / e,
+        'joule-hertz relationship': 1 / h,
+        'joule-inverse meter relationship': 1 / (h * c),
+        'joule-kelvin relationship': 1 / k,
+        'joule-kilogram relationship': 1 / c ** 2,
+        'kelvin-electron volt relationship': k / e,
+        'kelvin-hertz relationship': k / h,
+        'kelvin-inverse meter relationship': k / (h * c),
+        'kelvin-kilogram relationship': k / c ** 2,
+        'kilogram-electron volt relationship': c ** 2 / e,
+        'kilogram-hertz relationship': c ** 2 / h,
+        'kilogram-inverse meter relationship': c / h,
+        'kilogram-joule relationship': c ** 2,
+        'kilogram-kelvin relationship': c ** 2 / k,
+        'Loschmidt constant (273.15 K, 100 kPa)': 100e3 / 273.15 / k,
+        'Loschmidt constant (273.15 K, 101.325 kPa)': 101.325e3 / 273.15 / k,
+        'mag. flux quantum': h / (2 * e),
+        'molar gas constant': r,
+        'molar Planck constant': h * n_a,
+        'molar volume of ideal gas (273.15 K, 100 kPa)': r * 273.15 / 100e3,
+        'molar volume of ideal gas (273.15 K, 101.325 kPa)': r * 273.15 / 101.325e3,
+        'natural unit of action': hbar,
+        'natural unit of action in eV s': hbar / e,
+        'Planck constant in eV/Hz': h / e,
+        'reduced Planck constant': hbar,
+        'reduced Planck constant in eV s': hbar / e,
+        'reduced Planck constant times c in MeV fm': hbar * c / (e * 1e6 * 1e-15),
+        'second radiation constant': h * c / k,
+        'Stefan-Boltzmann constant': 2 * math.pi ** 5 * k ** 4 / (15 * h ** 3 * c ** 2),
+        'von Klitzing constant': h / e ** 2,
+        'Wien frequency displacement law constant': alpha_w * k / h,
+        'Wien wavelength displacement law constant': h * c / (x_w * k),
+    }
+
+
+def parse_listing(text):
+    """[(name, value, uncertainty, unit)] from NIST's fixed-column listing"""
+    lines = text.splitlines()
+    for start, line in enumerate(lines):
+        if line.startswith('-----'):
+            lines = lines[start + 1:]
+            break
+    constants = []
+    truncated = set()
+    for line in lines:
+        if not line.strip():
+            continue
+        name = line[:60].rstrip()
+        value = line[60:85].replace(' ', '')
+        if '...' in value:
+            truncated.add(name)
+        uncertainty = line[85:110].replace(' ', '').replace('(exact)', '0')
+        constants.append((name, float(value.replace('...', '')), float(uncertainty), line[110:].strip()))
+
+    exact = _exact_values({name: value for name, value, _, _ in constants})
+    missing = truncated - set(exact)
+    if missing:
+        raise ValueError(f"no exact value for {', '.join(sorted(missing))}")
+    return [(name, exact.get(name, value) if name in truncated else value, uncertainty, unit)
+            for name, value, uncertainty, unit in constants]
+
+
+def build(source, target, edition):
+    """Write ``target`` from the NIST listing at ``source``"""
+    with open(source, encoding='utf-8') as handle:
+        constants = parse_listing(handle.read())
+
+    fields = {}
+    for constant in constants:
+        fields.setdefault(classify(constant[0]), []).append(constant)
+    units = sorted({unit for _, _, _, unit in constants})
+    unit_index = {unit: i for i, unit in enumerate(units)}
+
+    lines = [edition, '\t'.join(units)]
+    records = []
+    for field in sorted(fields):
+        lines.append('\t'.join([field] + [name for name, _, _, _ in fields[field]]))
+        records.extend(RECORD.pack(value, uncertainty, unit_index[unit])
+                       for _, value, uncertainty, unit in fields[field])
+    header = '\n'.join(lines).encode('utf-8')
+    with open(target, 'wb') as handle:
+        handle.write(PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        handle.write(header)
+        handle.write(b''.join(records))
+    return len(constants)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Build codata.dat from a NIST allascii.txt listing')
+    parser.add_argument('source')
+    parser.add_argument('target', nargs='?', default=DATA_FILE)
+    parser.add_argument('--edition', default='CODATA 2022')
+    args = parser.parse_args()
+    print(f"{build(args.source, args.target, args.edition)} constants written to {args.target}")
@@ -0,0 +1,351 @@
+"""Physical constants and a pre-parsed index over them.
+
+PHYSICS_CONSTANTS stays the hand-edited source table. CONSTANTS_INDEX is
+built from it once at import: every numeric value is parsed a single time,
+each field keeps its ordered entry IDs, and a word-prefix index answers
+searches such as "planck" or "mass" across all fields. Entries that are not
+numbers (the Relativity formulas) become Formula objects rather than strings
+pretending to be values.
+
+Formulas listed in FORMULA_DEFINITIONS also get an expression in keypad
+syntax and the names of their variables. G and c are taken from this same
+table (FORMULA_SYMBOLS). A formula is compiled the first time it is called,
+and it accepts either single numbers or whole arrays:
+
+    >>> CONSTANTS_INDEX.get('Schwarzschild Radius')(1.98847e30)
+    2953.339...
+
+After the hand-edited fields come the CODATA recommended values from
+codata.dat, with their uncertainties and units. Only their names are read
+at import; each record is decoded the first time its constant is looked up.
+"""
+import math
+import re
+
+import codata
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# ============ Physical Constants - FULL VERSION ============
+PHYSICS_CONSTANTS = {
+    'Quantum Mechanics': {
+        'Planck Constant (h)': '6.62607015e-34',
+        'Reduced Planck (ħ)': '1.054571817e-34',
+        'Planck Length (lP)': '1.616255e-35',
+        'Planck Time (tP)': '5.391247e-44',
+        'Electron Mass (me)': '9.1093837015e-31',
+        'Proton Mass (mp)': '1.67262192369e-27',
+        'Neutron Mass (mn)': '1.67492749804e-27',
+        'Electron Charge (e)': '1.602176634e-19',
+        'Bohr Radius (a₀)': '5.29177210903e-11',
+    },
+    'Geophysics': {
+        'Earth Mass (kg)': '5.9722e24',
+        'Earth Radius (m)': '6371000',
+        'Surface Gravity (g)': '9.80665',
+        'Rotation Period (s)': '86164',
+        'Continental Crust (m)': '35000',
+        'Oceanic Crust (m)': '7000',
+    },
+    'Astrophysics': {
+        'Speed of Light (c)': '299792458',
+        'Gravitational Constant (G)': '6.67430e-11',
+        'Hubble Constant (H₀)': '67.4',
+        'Age of Universe (years)': '13.8e9',
+        'Solar Mass (M☉)': '1.98847e30',
+        'Astronomical Unit (AU)': '1.495978707e11',
+        'Light Year (ly)': '9.4607304725808e15',
+    },
+    'Thermodynamics': {
+        'Absolute Zero (°C)': '-273.15',
+        'Avogadro Number (NA)': '6.02214076e23',
+        'Boltzmann Constant (k)': '1.380649e-23',
+        'Gas Constant (R)': '8.314462618',
+        'Triple Point Water (K)': '273.16',
+        'Stefan-Boltzmann (σ)': '5.670374419e-8',
+        'Wien Displacement (b)': '2.897771955e-3',
+    },
+    'Electromagnetism': {
+        'Magnetic Constant (μ₀)': '1.25663706212e-6',
+        'Electric Constant (ε₀)': '8.8541878128e-12',
+        'Coulomb Constant (k)': '8.9875517923e9',
+        'Elementary Charge (e)': '1.602176634e-19',
+        'Electron Volt (eV)': '1.602176634e-19',
+        'Fine Structure (α)': '7.2973525693e-3',
+    },
+    'Nuclear Physics': {
+        'Atomic Mass Unit (u)': '1.66053906660e-27',
+        'Fermi (fm)': '1e-15',
+        'Rydberg Constant (R∞)': '10973731.568160',
+        'Compton Wavelength (λc)': '2.42631023867e-12',
+        'Nuclear Magneton (μN)': '5.050783746e-27',
+        'Bohr Magneton (μB)': '9.2740100783e-24',
+    },
+    'Particle Physics': {
+        'Muon Mass (mμ)': '1.883531627e-28',
+        'Tau Mass (mτ)': '3.16754e-27',
+        'W Boson Mass (mW)': '1.433e-25',
+        'Z Boson Mass (mZ)': '1.625e-25',
+        'Higgs Mass (mH)': '2.235e-25',
+    },
+    'Relativity': {
+        'Schwarzschild Radius': '2GM/c²',
+        'Gravitational Time Dilation': '√(1-2GM/rc²)',
+        'Lorentz Factor (γ)': '1/√(1-v²/c²)',
+        'Minkowski Metric': 'ds² = -c²dt² + dx² + dy² + dz²',
+        'Einstein Field Eq': 'G_μν = 8πG T_μν',
+    }
+}
+
+# Relativity entries that can be evaluated: expression, variables in call order
+FORMULA_DEFINITIONS = {
+    'Schwarzschild Radius': ('2×G×M÷c²', ('M',)),
+    'Gravitational Time Dilation': ('√(1−2×G×M÷(r×c²))', ('M', 'r')),
+    'Lorentz Factor (γ)': ('1÷√(1−v²÷c²)', ('v',)),
+}
+
+# Symbols formulas and plots may use -> the constant supplying the value
+FORMULA_SYMBOLS = {
+    'G': 'Gravitational Constant (G)',
+    'c': 'Speed of Light (c)',
+    'h': 'Planck Constant (h)',
+    'hbar': 'Reduced Planck (ħ)',
+    'k': 'Boltzmann Constant (k)',
+    'b': 'Wien Displacement (b)',
+    'NA': 'Avogadro Number (NA)',
+    'R': 'Gas Constant (R)',
+    'me': 'Electron Mass (me)',
+    'mp': 'Proton Mass (mp)',
+    'qe': 'Elementary Charge (e)',
+    'g': 'Surface Gravity (g)',
+}
+
+_WORD_RE = re.compile(r'\w+')
+
+
+class Constant:
+    """A named numeric constant; CODATA entries also carry uncertainty and unit"""
+    __slots__ = ('id', 'name', 'field', 'text', 'value', 'uncertainty', 'unit')
+    is_formula = False
+
+    def __init__(self, id, name, field, text, value, uncertainty=None, unit=''):
+        self.id = id
+        self.name = name
+        self.field = field
+        self.text = text
+        self.value = value
+        # Standard uncertainty, 0.0 for exact values, None if unknown
+        self.uncertainty = uncertainty
+        self.unit = unit
+
+    def __repr__(self):
+        return f"Constant({self.name!r}, {self.value!r})"
+
+
+class Formula:
+    """A symbolic entry such as '2GM/c²' that has no single value.
+
+    ``expression`` and ``variables`` are set for formulas that can be
+    evaluated. Call the formula with one value per variable, positionally
+    or by name. Array-like arguments give an array (a list without NumPy),
+    with nan wherever the formula is undefined.
+    """
+    __slots__ = ('id', 'name', 'field', 'text', 'expression', 'variables', 'symbols',
+                 '_scalar', '_vector')
+    is_formula = True
+    value = None
+
+    def __init__(self, id, name, field, text, expression=None, variables=(), symbols=None):
+        self.id = id
+        self.name = name
+        self.field = field
+        self.text = text
+        self.expression = expression
+        self.variables = tuple(variables)
+        self.symbols = {} if symbols is None else symbols
+        self._scalar = None
+        self._vector = None
+
+    @property
+    def computable(self):
+        return self.expression is not None
+
+    def _compiled(self, vectorized):
+        from expression import compile_formula
+        if vectorized:
+            if self._vector is None:
+                self._vector = compile_formula(self.expression, self.symbols, vectorized=True)
+            return self._vector
+        if self._scalar is None:
+            self._scalar = compile_formula(self.expression, self.symbols)
+        return self._scalar
+
+    def _bind(self, args, kwargs):
+        if len(args) > len(self.variables):
+            raise TypeError(f"{self.name} takes {len(self.variables)} values")
+        env = dict(zip(self.variables, args))
+        env.update(kwargs)
+        missing = [name for name in self.variables if name not in env]
+        if missing:
+            raise TypeError(f"{self.name} is missing {', '.join(missing)}")
+        return env
+
+    def __call__(self, *args, **kwargs):
+        if not self.computable:
+            raise TypeError(f"{self.name} cannot be evaluated")
+        if not kwargs and len(args) == len(self.variables):
+            env = dict(zip(self.variables, args))
+        else:
+            env = self._bind(args, kwargs)
+        for value in env.values():
+            if not isinstance(value, (int, float)):
+                return self._evaluate_many(env)
+        return (self._scalar or self._compiled(False)).evaluate(env)
+
+    def _evaluate_many(self, env):
+        if numpy is not None:
+            arrays = {name: numpy.asarray(value, dtype=float) for name, value in env.items()}
+            with numpy.errstate(invalid='ignore', divide='ignore', over='ignore'):
+                return self._compiled(True).evaluate(arrays)
+
+        scalar = self._compiled(False)
+        columns = {name: value if hasattr(value, '__len__') else None for name, value in env.items()}
+        size = max(len(column) for column in columns.values() if column is not None)
+        results = []
+        for i in range(size):
+            point = {name: env[name] if column is None else column[i] for name, column in columns.items()}
+            try:
+                results.append(scalar.evaluate(point))
+            except (ArithmeticError, ValueError):
+                results.append(math.nan)
+        return results
+
+    def __repr__(self):
+        return f"Formula({self.name!r}, {self.text!r})"
+
+
+def _value_text(value):
+    text = repr(value)
+    return text[:-2] if text.endswith('.0') else text
+
+
+class ConstantsIndex:
+    """Lookup and search structures over a constants table.
+
+    ``dataset`` is an optional codata.CodataFile whose fields follow the
+    table's. Its entries are created on first access; until then only the
+    name and field are known.
+    """
+
+    def __init__(self, table, formulas=FORMULA_DEFINITIONS, symbols=FORMULA_SYMBOLS, dataset=None):
+        self._formulas = formulas
+        self._dataset = dataset
+        self.symbols = {}
+        # Entries by id; None for dataset records not decoded yet
+        self.entries = []
+        self._keys = []
+        self._ids = {}
+        self.field_ids = {}
+        self.field_names = {}
+        # Built by the first search
+        self._prefixes = None
+        self._haystack = None
+
+        for field, constants in table.items():
+            ids = self.field_ids[field] = []
+            for name, text in constants.items():
+                ids.append(self._add(name, field, self._make_entry(len(self.entries), name, field, text)))
+            self.field_names[field] = list(constants)
+
+        # Dataset record n has id _first_record + n
+        self._first_record = len(self.entries)
+        if dataset is not None:
+            for field, names in dataset.fields.items():
+                self.field_ids[field] = [self._add(name, field, None) for name in names]
+                self.field_names[field] = names
+        self.fields = list(self.field_ids)
+
+        # Formulas share one dict, so it can be filled once every entry exists
+        for symbol, name in symbols.items():
+            entry = self.get(name)
+            if entry is not None and not entry.is_formula:
+                self.symbols[symbol] = entry.value
+
+    def _add(self, name, field, entry):
+        id = len(self.entries)
+        self.entries.append(entry)
+        self._keys.append((name, field))
+        # The hand-edited table wins over a dataset name it repeats
+        self._ids.setdefault(name, id)
+        return id
+
+    def _entry(self, id):
+        entry = self.entries[id]
+        if entry is None:
+            name, field = self._keys[id]
+            value, uncertainty, unit = self._dataset.record(id - self._first_record)
+            entry = self.entries[id] = Constant(id, name, field, _value_text(value), value, uncertainty, unit)
+        return entry
+
+    def _make_entry(self, id, name, field, text):
+        try:
+            return Constant(id, name, field, text, float(text))
+        except ValueError:
+            expression, variables = self._formulas.get(name, (None, ()))
+            return Formula(id, name, field, text, expression, variables, self.symbols)
+
+    def _build_search(self):
+        self._prefixes = {}
+        self._haystack = []
+        for id, (name, field) in enumerate(self._keys):
+            searchable = f"{name} {field}".lower()
+            self._haystack.append(searchable)
+            for word in set(_WORD_RE.findall(searchable)):
+                for end in range(1, len(word) + 1):
+                    self._prefixes.setdefault(word[:end], []).append(id)
+
+    def get(self, name):
+        """Entry for a constant name, or None"""
+        id = self._ids.get(name)
+        return None if id is None else self._entry(id)
+
+    def constants(self, field):
+        """Entries of a field in table order"""
+        return [self._entry(i) for i in self.field_ids.get(field, ())]
+
+    def _search(self, query, limit):
+        query = query.strip().lower()
+        if not query:
+            return []
+        if self._prefixes is None:
+            self._build_search()
+
+        words = _WORD_RE.findall(query)
+        hits = None
+        for word in words:
+            ids = set(self._prefixes.get(word, ()))
+            hits = ids if hits is None else hits & ids
+        ranked = sorted(hits or ())
+
+        seen = set(ranked)
+        for id, searchable in enumerate(self._haystack):
+            if id not in seen and query in searchable:
+                ranked.append(id)
+
+        if limit is not None:
+            ranked = ranked[:limit]
+        return ranked
+
+    def search(self, query, limit=None):
+        """Entries matching ``query``: word-prefix hits first, then substrings"""
+        return [self._entry(i) for i in self._search(query, limit)]
+
+    def search_names(self, query, limit=None):
+        """Names of the entries ``search`` returns, without decoding any"""
+        return [self._keys[i][0] for i in self._search(query, limit)]
+
+
+CONSTANTS_INDEX = ConstantsIndex(PHYSICS_CONSTANTS, dataset=codata.load())
@@ -0,0 +1,342 @@
+"""Dimensional analysis for unit strings such as m/s², N·m, kWh/day or J/(mol·K).
+
+Every unit is a scale to SI plus a vector of exponents over the seven SI
+base dimensions. A compound string is parsed into one Unit by multiplying,
+dividing and raising its parts. Two units convert only if their vectors are
+equal. Scales are kept as Fractions, so products like 1000/3600 for km/h
+are exact until the final plan is rounded to floats.
+
+``conversion_plan(source, target)`` returns ``(scale, offset)`` with
+``target_value = value * scale + offset``. It is cached per (source, target)
+pair, so repeat conversions do not parse anything.
+
+Grammar: factors joined by ``*``, ``·``, ``/`` or a space, evaluated left
+to right. A factor may carry an exponent written ``^2``, ``^-1``, ``²``,
+``⁻¹`` or as trailing digits (``m2``). SI prefixes work on every unit
+marked as prefixable (``km``, ``µs``, ``kWh``, ``MeV``).
+"""
+import functools
+import re
+from fractions import Fraction
+
+BASE_DIMENSIONS = ('m', 'kg', 's', 'A', 'K', 'mol', 'cd')
+
+_DIMENSIONLESS = (0,) * len(BASE_DIMENSIONS)
+
+
+class DimensionError(ValueError):
+    """Raised for unknown units and conversions between different dimensions"""
+
+
+class Unit:
+    """A scale to SI and a dimension vector; ``offset`` is only for °C and °F"""
+    __slots__ = ('scale', 'dimension', 'offset')
+
+    def __init__(self, scale, dimension, offset=0):
+        self.scale = Fraction(scale)
+        self.dimension = tuple(dimension)
+        self.offset = Fraction(offset)
+
+    def __mul__(self, other):
+        return Unit(self.scale * other.scale,
+                    [a + b for a, b in zip(self.dimension, other.dimension)])
+
+    def __truediv__(self, other):
+        return Unit(self.scale / other.scale,
+                    [a - b for a, b in zip(self.dimension, other.dimension)])
+
+    def __pow__(self, power):
+        return Unit(self.scale ** power, [a * power for a in self.dimension])
+
+    def compatible(self, other):
+        return self.dimension == other.dimension
+
+    def __repr__(self):
+        return f"Unit({float(self.scale)!r}, {dimension_text(self.dimension)!r})"
+
+
+# ============ Unit table ============
+def _base(name):
+    dimension = [0] * len(BASE_DIMENSIONS)
+    dimension[BASE_DIMENSIONS.index(name)] = 1
+    return Unit(1, dimension)
+
+
+SI_PREFIXES = {
+    'Y': Fraction(10) ** 24, 'Z': Fraction(10) ** 21, 'E': Fraction(10) ** 18,
+    'P': Fraction(10) ** 15, 'T': Fraction(10) ** 12, 'G': Fraction(10) ** 9,
+    'M': Fraction(10) ** 6, 'k': Fraction(10) ** 3, 'h': Fraction(10) ** 2,
+    'da': Fraction(10), 'd': Fraction(10) ** -1, 'c': Fraction(10) ** -2,
+    'm': Fraction(10) ** -3, 'µ': Fraction(10) ** -6, 'μ': Fraction(10) ** -6,
+    'u': Fraction(10) ** -6, 'n': Fraction(10) ** -9, 'p': Fraction(10) ** -12,
+    'f': Fraction(10) ** -15, 'a': Fraction(10) ** -18, 'z': Fraction(10) ** -21,
+    'y': Fraction(10) ** -24,
+}
+
+# symbol -> (scale, definition); definitions may only use units listed above them
+UNIT_DEFINITIONS = {
+    # The base units are built in; the gram is defined so prefixes apply to it
+    'g': ('0.001', 'kg'),
+    # Named SI derived units
+    'Hz': (1, '1/s'),
+    'N': (1, 'kg·m/s²'),
+    'Pa': (1, 'N/m²'),
+    'J': (1, 'N·m'),
+    'W': (1, 'J/s'),
+    'C': (1, 'A·s'),
+    'V': (1, 'W/A'),
+    'F': (1, 'C/V'),
+    'Ω': (1, 'V/A'),
+    'S': (1, 'A/V'),
+    'Wb': (1, 'V·s'),
+    'T': (1, 'Wb/m²'),
+    'H': (1, 'Wb/A'),
+    'Bq': (1, '1/s'),
+    'Gy': (1, 'J/kg'),
+    'Sv': (1, 'J/kg'),
+    'kat': (1, 'mol/s'),
+    # Time
+    'min': (60, 's'),
+    'h': (3600, 's'),
+    'day': (86400, 's'),
+    'd': (86400, 's'),
+    'week': (604800, 's'),
+    'yr': ('365.25', 'day'),
+    # Speed
+    'c': (299792458, 'm/s'),
+    # Length, area, volume
+    'Å': ('1e-10', 'm'),
+    'in': ('0.0254', 'm'),
+    'ft': ('0.3048', 'm'),
+    'yd': ('0.9144', 'm'),
+    'mi': ('1609.344', 'm'),
+    'nmi': (1852, 'm'),
+    'au': (149597870700, 'm'),
+    'ly': (1, 'c·yr'),
+    'pc': ('3.0856775814913673e16', 'm'),
+    'ha': (10000, 'm²'),
+    'acre': ('4046.8564224', 'm²'),
+    'L': ('0.001', 'm³'),
+    'l': ('0.001', 'm³'),
+    'gal': ('3.785411784', 'L'),
+    'qt': (Fraction(1, 4), 'gal'),
+    # Mass
+    't': (1000, 'kg'),
+    'lb': ('0.45359237', 'kg'),
+    'oz': (Fraction(1, 16), 'lb'),
+    'st': (14, 'lb'),
+    'u': ('1.66053906660e-27', 'kg'),
+    'M☉': ('1.98847e30', 'kg'),
+    'kn': (1852, 'm/h'),
+    'mph': (1, 'mi/h'),
+    # Energy, power, force, pressure
+    'eV': ('1.602176634e-19', 'J'),
+    'cal': ('4.184', 'J'),
+    'Wh': (3600, 'J'),
+    'BTU': ('1055.05585262', 'J'),
+    'erg': ('1e-7', 'J'),
+    'hp': ('745.69987158227022', 'W'),
+    'dyn': ('1e-5', 'N'),
+    'lbf': ('4.4482216152605', 'N'),
+    'bar': (100000, 'Pa'),
+    'atm': (101325, 'Pa'),
+    'Torr': (Fraction(101325, 760), 'Pa'),
+    'mmHg': ('133.322387415', 'Pa'),
+    'psi': (1, 'lbf/in²'),
+    # Dimensionless
+    '%': ('0.01', '1'),
+    'rad': (1, '1'),
+}
+
+PREFIXABLE = frozenset([
+    'm', 'g', 's', 'A', 'K', 'mol', 'cd', 'Hz', 'N', 'Pa', 'J', 'W', 'C', 'V', 'F',
+    'Ω', 'S', 'Wb', 'T', 'H', 'Bq', 'Gy', 'Sv', 'kat', 'L', 'l', 'eV', 'cal', 'Wh',
+    'bar', 'pc', 'ly', 't', 'rad',
+])
+
+# Temperatures: kelvin = value * scale + offset
+TEMPERATURES = {
+    '°C': Unit(1, _base('K').dimension, '273.15'),
+    '°F': Unit(Fraction(5, 9), _base('K').dimension, Fraction('459.67') * 5 / 9),
+}
+
+UNIT_ALIASES = {
+    'degC': '°C',
+    'degF': '°F',
+    'ohm': 'Ω',
+    'Msun': 'M☉',
+    'sec': 's',
+    'hr': 'h',
+    'year': 'yr',
+    'AU': 'au',
+}
+
+UNITS = {name: _base(name) for name in BASE_DIMENSIONS}
+
+
+# ============ Parsing ============
+_SUPERSCRIPTS = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹⁻', '0123456789-')
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<name>°[CF]|%|[^\W\d_¹²³⁰⁴⁵⁶⁷⁸⁹]+☉?)(?P<digits>-?\d+)?
+      | (?P<super>[⁻]?[⁰¹²³⁴⁵⁶⁷⁸⁹]+)
+      | (?P<power>\^\s*[-+]?\d+)
+      | (?P<one>1)
+      | (?P<op>[*·⋅/()])
+      | (?P<space>\s)
+    )""", re.VERBOSE)
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if match is None or match.end() == pos:
+            raise DimensionError(f"unexpected {text[pos]!r} in unit {text!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == 'digits':
+            tokens.append(('name', match.group('name')))
+            tokens.append(('power', int(match.group('digits'))))
+        elif kind == 'name':
+            tokens.append(('name', match.group('name')))
+        elif kind == 'super':
+            tokens.append(('power', int(match.group('super').translate(_SUPERSCRIPTS))))
+        elif kind == 'power':
+            tokens.append(('power', int(match.group('power')[1:])))
+        elif kind == 'one':
+            tokens.append(('one', 1))
+        elif kind == 'op':
+            tokens.append(('op', match.group('op').replace('⋅', '·')))
+    return tokens
+
+
+class _Parser:
+    """Left-to-right product of factors, each with an optional power"""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def advance(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise DimensionError('empty unit')
+        unit = self.product()
+        if self.pos < len(self.tokens):
+            raise DimensionError(f"unexpected {self.peek()[1]!r} in unit {self.text!r}")
+        return unit
+
+    def product(self):
+        unit = self.factor()
+        while True:
+            kind, value = self.peek()
+            if kind == 'op' and value in '*·/':
+                self.advance()
+                right = self.factor()
+                unit = unit / right if value == '/' else unit * right
+            elif kind in ('name', 'one') or (kind, value) == ('op', '('):
+                # Juxtaposition multiplies: 'N m', 'kg m/s^2'
+                unit = unit * self.factor()
+            else:
+                return unit
+
+    def factor(self):
+        kind, value = self.advance()
+        if kind == 'name':
+            unit = lookup(value)
+        elif kind == 'one':
+            unit = Unit(1, _DIMENSIONLESS)
+        elif (kind, value) == ('op', '('):
+            unit = self.product()
+            if self.advance() != ('op', ')'):
+                raise DimensionError(f"missing ')' in unit {self.text!r}")
+        else:
+            raise DimensionError(f"expected a unit in {self.text!r}")
+        if self.peek()[0] == 'power':
+            unit = unit ** self.advance()[1]
+        return unit
+
+
+def _define(symbol, scale, definition):
+    unit = Unit(1, _DIMENSIONLESS) if definition == '1' else parse_unit(definition)
+    UNITS[symbol] = Unit(Fraction(scale) * unit.scale, unit.dimension)
+
+
+def lookup(symbol):
+    """Unit for a single symbol, trying SI prefixes when it is not listed"""
+    symbol = UNIT_ALIASES.get(symbol, symbol)
+    unit = UNITS.get(symbol) or TEMPERATURES.get(symbol)
+    if unit is not None:
+        return unit
+    for length in (2, 1):
+        prefix, rest = symbol[:length], symbol[length:]
+        if prefix in SI_PREFIXES and rest in PREFIXABLE:
+            base = UNITS[rest]
+            return Unit(SI_PREFIXES[prefix] * base.scale, base.dimension)
+    raise DimensionError(f"unknown unit {symbol!r}")
+
+
+@functools.lru_cache(maxsize=512)
+def parse_unit(text):
+    """Unit for a compound unit string such as 'kWh/day'"""
+    text = text.strip()
+    symbol = UNIT_ALIASES.get(text, text)
+    if symbol in TEMPERATURES:
+        # Only a bare temperature keeps its offset; inside a compound it is an interval
+        return TEMPERATURES[symbol]
+    return _Parser(text).parse()
+
+
+for _symbol, (_scale, _definition) in UNIT_DEFINITIONS.items():
+    _define(_symbol, _scale, _definition)
+parse_unit.cache_clear()
+
+
+# ============ Conversion ============
+_SUPERSCRIPT_DIGITS = str.maketrans('0123456789-', '⁰¹²³⁴⁵⁶⁷⁸⁹⁻')
+
+
+def dimension_text(dimension):
+    """'kg·m²·s⁻²' style text for a dimension vector"""
+    parts = []
+    for name, power in zip(BASE_DIMENSIONS, dimension):
+        if power:
+            parts.append(name if power == 1 else name + str(power).translate(_SUPERSCRIPT_DIGITS))
+    return '·'.join(parts) or '1'
+
+
+@functools.lru_cache(maxsize=1024)
+def conversion_plan(source, target):
+    """(scale, offset) converting values in ``source`` units to ``target`` units"""
+    from_unit = parse_unit(source)
+    to_unit = parse_unit(target)
+    if not from_unit.compatible(to_unit):
+        raise DimensionError(
+            f"cannot convert {source} [{dimension_text(from_unit.dimension)}] "
+            f"to {target} [{dimension_text(to_unit.dimension)}]")
+    scale = from_unit.scale / to_unit.scale
+    offset = (from_unit.offset - to_unit.offset) / to_unit.scale
+    return float(scale), float(offset)
+
+
+def convert_units(value, source, target):
+    """Convert ``value`` from ``source`` units to ``target`` units"""
+    scale, offset = conversion_plan(source, target)
+    return value * scale + offset
+
+
+def same_dimension(source, target):
+    """True when the two unit strings measure the same kind of quantity"""
+    return parse_unit(source).compatible(parse_unit(target))
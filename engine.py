@@ -0,0 +1,544 @@
+"""Headless calculation engine for the Physics Calculator.
+
+Nothing in here imports Kivy: the app only forwards button text to
+CalculatorEngine and copies the returned display string into its widget,
+so the math can be driven (and benchmarked) without opening a window.
+"""
+import math
+import operator
+import re
+
+import trig
+from factorial import ScientificResult, calculator_factorial
+from formatting import format_number
+
+ERROR = 'Error'
+
+# Integer powers with more digits than this are not computed exactly; their
+# magnitude is returned as a ScientificResult instead (like large n!)
+MAX_EXACT_POWER_DIGITS = 308
+
+
+class CalculatorError(ArithmeticError):
+    """Raised for results the calculator shows as 'Error'"""
+
+
+# ============ Binary operators ============
+def _divide(a, b):
+    if b == 0:
+        raise CalculatorError('division by zero')
+    return a / b
+
+
+def _power(a, b):
+    if isinstance(a, int) and isinstance(b, int) and b > 0 and abs(a) > 1:
+        # An exact a ** b could take seconds and holds the GIL all along
+        digits = b * math.log10(abs(a))
+        if digits > MAX_EXACT_POWER_DIGITS:
+            return ScientificResult.from_log10(digits, -1 if a < 0 and b % 2 else 1)
+    result = a ** b
+    if isinstance(result, complex):
+        raise CalculatorError('complex result')
+    return result
+
+
+BINARY_OPS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': _divide,
+    '^': _power,
+    'mod': operator.mod,
+}
+
+# Keypad labels -> operator symbols
+KEY_OPERATORS = {
+    '÷': '/',
+    '×': '*',
+    '−': '-',
+    '-': '-',
+    '+': '+',
+}
+
+
+# ============ Scientific functions ============
+def _positive(func):
+    def wrapper(value):
+        if value <= 0:
+            raise CalculatorError('domain error')
+        return func(value)
+    return wrapper
+
+
+def _cbrt(value):
+    return value ** (1 / 3) if value >= 0 else -((-value) ** (1 / 3))
+
+
+def _reciprocal(value):
+    if value == 0:
+        raise CalculatorError('division by zero')
+    return 1 / value
+
+
+UNARY_FUNCS = {
+    'sin': trig.MODE_FUNCTIONS['DEG']['sin'],
+    'cos': trig.MODE_FUNCTIONS['DEG']['cos'],
+    'tan': trig.MODE_FUNCTIONS['DEG']['tan'],
+    'log': _positive(math.log10),
+    'ln': _positive(math.log),
+    '10^x': lambda x: _power(10, x),
+    'x²': lambda x: x * x,
+    'x³': lambda x: x * x * x,
+    '√': math.sqrt,
+    '∛': _cbrt,
+    'e^x': math.exp,
+    'n!': calculator_factorial,
+    '1/x': _reciprocal,
+    '|x|': abs,
+}
+
+CONSTANT_FUNCS = {
+    'π': math.pi,
+    'e': math.e,
+}
+
+# Trigonometric keys -> trig function names; these follow the angle mode
+TRIG_KEYS = {
+    'sin': 'sin',
+    'cos': 'cos',
+    'tan': 'tan',
+    'sin⁻¹': 'asin',
+    'cos⁻¹': 'acos',
+    'tan⁻¹': 'atan',
+    'sinh': 'sinh',
+    'cosh': 'cosh',
+    'tanh': 'tanh',
+    'sinh⁻¹': 'asinh',
+    'cosh⁻¹': 'acosh',
+    'tanh⁻¹': 'atanh',
+}
+
+# What a trig key becomes after 'hyp'
+HYPERBOLIC_KEYS = {
+    'sin': 'sinh',
+    'cos': 'cosh',
+    'tan': 'tanh',
+    'sin⁻¹': 'sinh⁻¹',
+    'cos⁻¹': 'cosh⁻¹',
+    'tan⁻¹': 'tanh⁻¹',
+}
+
+# Scientific keys that start a binary operation instead of applying directly
+PENDING_FUNCS = {
+    'x^y': '^',
+    'mod': 'mod',
+}
+
+# Text a scientific key appends while a bracket is open
+EXPRESSION_KEYS = {
+    'log': 'log(',
+    'ln': 'ln(',
+    '10^x': '10^',
+    'x²': '²',
+    'x³': '³',
+    'x^y': '^',
+    '√': '√(',
+    '∛': '∛(',
+    'e^x': 'e^',
+    'π': 'π',
+    'e': 'e',
+    'n!': '!',
+    '1/x': '⁻¹',
+    '|x|': 'abs(',
+    'mod': ' mod ',
+}
+EXPRESSION_KEYS.update((key, name + '(') for key, name in TRIG_KEYS.items())
+
+# Operator symbols as shown when a calculation is written out
+OPERATOR_SYMBOLS = {
+    '/': '÷',
+    '*': '×',
+    '-': '−',
+    '+': '+',
+    '^': '^',
+    'mod': 'mod',
+}
+
+# Keys that continue the operand before them rather than starting a new one
+_INFIX_TEXT = frozenset(['²', '³', '^', '!', '⁻¹', ' mod '])
+
+# Keypad keys that only edit the entry text, however long it is
+_EDIT_KEYS = frozenset(['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', '00', '.',
+                        '⌫', 'C', 'EXP', '±', '(', ')', 'ANS'])
+
+_OPERAND_END = re.compile(r'[\d.)πe²³!¹S]$')
+_TRAILING_TOKEN = re.compile(r'(?:[A-Za-z]+\(?| mod |⁻¹)$')
+_TRAILING_NUMBER = re.compile(r'[\d.]*(?:e[-−]?\d*)?$')
+
+
+class CalculatorState:
+    """Everything the calculator remembers between key presses.
+
+    ``entry`` is the text being typed (what the display shows) and
+    ``value`` caches its numeric form; ``None`` means the entry changed and
+    has not been parsed yet.
+    """
+    __slots__ = ('entry', 'value', 'first_num', 'operation', 'memory', 'last_result',
+                 'angle_mode', 'hyperbolic')
+
+    def __init__(self):
+        self.entry = '0'
+        self.value = 0.0
+        self.first_num = None
+        self.operation = None
+        self.memory = 0
+        self.last_result = 0
+        self.angle_mode = 'DEG'
+        self.hyperbolic = False
+
+    def copy(self):
+        state = CalculatorState.__new__(CalculatorState)
+        for name in self.__slots__:
+            setattr(state, name, getattr(self, name))
+        return state
+
+
+class CalculatorEngine:
+    """Keypad, scientific and memory logic driven by button labels"""
+
+    def __init__(self, formatter=format_number):
+        self.state = CalculatorState()
+        self.format_number = formatter
+        # Called as on_result(expression, display) after each successful calculation
+        self.on_result = None
+        self._key_handlers = {
+            'C': self._clear,
+            '⌫': self._backspace,
+            '=': self._equals,
+            'ANS': self._answer,
+            'EXP': self._exponent,
+            '±': self._negate,
+            '.': self._decimal_point,
+            '(': self._open_bracket,
+            ')': self._close_bracket,
+            '00': self._double_zero,
+        }
+        for key in KEY_OPERATORS:
+            self._key_handlers[key] = self._operator
+        for digit in '0123456789':
+            self._key_handlers[digit] = self._digit
+
+    def fork(self):
+        """An engine on a copy of this state, for work done on another thread.
+
+        Results it reports are queued in ``pending_results`` instead of
+        calling on_result; adopt() applies both.
+        """
+        worker = CalculatorEngine(self.format_number)
+        worker.state = self.state.copy()
+        worker.pending_results = []
+        worker.on_result = lambda expression, display: worker.pending_results.append((expression, display))
+        return worker
+
+    def adopt(self, worker):
+        """Take over the state of a fork() and report its queued results"""
+        self.state = worker.state
+        if self.on_result is not None:
+            for expression, display in worker.pending_results:
+                self.on_result(expression, display)
+        return self.state.entry
+
+    # ============ Entry helpers ============
+    @property
+    def display(self):
+        return self.state.entry
+
+    def current_value(self):
+        """Numeric value of the entry, parsed at most once per edit"""
+        state = self.state
+        if state.value is None:
+            try:
+                state.value = float(state.entry)
+            except ValueError:
+                state.value = self._evaluate_entry()
+        return state.value
+
+    def _evaluate_entry(self):
+        # Imported here: expression.py builds on the tables in this module
+        from expression import compile_expression
+        state = self.state
+        return compile_expression(state.entry, state.angle_mode).evaluate({'ANS': state.last_result})
+
+    def in_expression(self):
+        """True while the entry has an unclosed bracket"""
+        entry = self.state.entry
+        return entry.count('(') > entry.count(')')
+
+    def is_slow(self, key):
+        """Whether a keypad or scientific key may take long enough for a worker.
+
+        Those are '=' on a pending x^y, n!, and keys that evaluate a
+        bracketed expression; every other key is a few float operations.
+        """
+        if key in _EDIT_KEYS:
+            return False
+        state = self.state
+        if state.value is None and '(' in state.entry:
+            # Inside brackets, keys other than '=' only append text
+            return key == '=' or not self.in_expression()
+        return key == 'n!' or key == '=' and state.operation == '^'
+
+    def _append_token(self, text, prefix=True):
+        entry = self.state.entry
+        if entry in ('0', ERROR, ''):
+            return self.set_entry(text.lstrip())
+        if prefix and _OPERAND_END.search(entry):
+            # Implicit multiplication: '2' then 'sin' reads as 2×sin(
+            text = '×' + text
+        return self.set_entry(entry + text)
+
+    def set_entry(self, text):
+        """Replace the entry with raw text (parsed lazily)"""
+        self.state.entry = text
+        self.state.value = None
+        return text
+
+    def load(self, text, value):
+        """Show ``text`` whose numeric value is already known (None if not numeric)"""
+        self.state.entry = text
+        self.state.value = value
+        return text
+
+    def set_value(self, value):
+        """Replace the entry with a number, skipping the text round-trip"""
+        self.state.entry = self.format_number(value)
+        self.state.value = value
+        return self.state.entry
+
+    def _error(self):
+        self.state.entry = ERROR
+        self.state.value = None
+        return ERROR
+
+    def _result(self, value, expression=None):
+        if value.__class__ is float and not math.isfinite(value):
+            # Overflow, e.g. arithmetic on a ScientificResult; only those keep a magnitude
+            return self._error()
+        self.set_value(value)
+        self.state.last_result = value
+        if expression is not None and self.on_result is not None:
+            self.on_result(expression, self.state.entry)
+        return self.state.entry
+
+    # ============ Keypad ============
+    def press(self, key):
+        """Handle a keypad button and return the new display text"""
+        handler = self._key_handlers.get(key)
+        if handler is None:
+            return self.state.entry
+        try:
+            handler(key)
+        except (ArithmeticError, ValueError):
+            self._error()
+        return self.state.entry
+
+    def _clear(self, key):
+        self.state.entry = '0'
+        self.state.value = 0.0
+        self.state.first_num = None
+        self.state.operation = None
+
+    def _backspace(self, key):
+        current = self.state.entry
+        if len(current) > 1 and current != ERROR:
+            token = _TRAILING_TOKEN.search(current) if '(' in current else None
+            cut = len(current) - len(token.group()) if token else len(current) - 1
+            self.set_entry(current[:cut] or '0')
+        else:
+            self.state.entry = '0'
+            self.state.value = 0.0
+
+    def _equals(self, key):
+        state = self.state
+        if state.first_num is None and '(' in state.entry:
+            try:
+                entry = state.entry
+                self._result(self._evaluate_entry(), entry + ')' * (entry.count('(') - entry.count(')')))
+            except (ArithmeticError, ValueError):
+                self._error()
+        else:
+            self.calculate()
+
+    def _answer(self, key):
+        if self.in_expression():
+            self._append_token('ANS')
+            return
+        last = self.state.last_result
+        self.state.entry = str(last) if last != 0 else '0'
+        self.state.value = last
+
+    def _exponent(self, key):
+        current = self.state.entry
+        number = _TRAILING_NUMBER.search(current).group() if self.in_expression() else current
+        if current != ERROR and number and 'e' not in number:
+            self.set_entry(current + 'e')
+
+    def _negate(self, key):
+        state = self.state
+        current = state.entry
+        if current not in ('0', ERROR):
+            value = state.value
+            if current.startswith('-'):
+                state.entry = current[1:]
+            else:
+                state.entry = '-' + current
+            state.value = -value if value is not None else None
+
+    def _decimal_point(self, key):
+        current = self.state.entry
+        number = _TRAILING_NUMBER.search(current).group() if self.in_expression() else current
+        if current == ERROR:
+            self.set_entry('0.')
+        elif '.' not in number:
+            self.set_entry(current + '.')
+
+    def _open_bracket(self, key):
+        self._append_token('(')
+
+    def _close_bracket(self, key):
+        if self.in_expression():
+            self.set_entry(self.state.entry + ')')
+
+    def _double_zero(self, key):
+        current = self.state.entry
+        if current != '0' and current != ERROR:
+            self.set_entry(current + '00')
+        else:
+            self.state.entry = '0'
+            self.state.value = 0.0
+
+    def _operator(self, key):
+        if self.in_expression():
+            self.set_entry(self.state.entry + key)
+        elif self.state.entry not in (ERROR, ''):
+            self._begin_operation(KEY_OPERATORS[key])
+
+    def _digit(self, key):
+        current = self.state.entry
+        if current == '0' or current == ERROR or current == '':
+            self.set_entry(key)
+        else:
+            self.set_entry(current + key)
+
+    def _begin_operation(self, op):
+        state = self.state
+        state.first_num = self.current_value()
+        state.operation = op
+        state.entry = '0'
+        state.value = 0.0
+
+    def calculate(self):
+        """Apply the pending binary operation to the entry"""
+        state = self.state
+        if state.first_num is None or not state.operation:
+            return state.entry
+        first = self.format_number(state.first_num)
+        try:
+            if callable(state.operation):
+                # A two-variable formula started by formula()
+                result = state.operation(state.first_num, self.current_value())
+                expression = f"{state.operation.name}({first}, {state.entry})"
+            else:
+                result = BINARY_OPS[state.operation](state.first_num, self.current_value())
+                expression = f"{first} {OPERATOR_SYMBOLS[state.operation]} {state.entry}"
+        except (ArithmeticError, ValueError, KeyError):
+            self._error()
+        else:
+            self._result(result, expression)
+        state.first_num = None
+        state.operation = None
+        return state.entry
+
+    # ============ Scientific ============
+    def scientific(self, func):
+        """Apply a scientific function key and return the new display text"""
+        state = self.state
+        if func in trig.ANGLE_MODES:
+            state.angle_mode = trig.next_mode(state.angle_mode)
+            return state.entry
+        if func == 'hyp':
+            state.hyperbolic = not state.hyperbolic
+            return state.entry
+        if state.hyperbolic and func in HYPERBOLIC_KEYS:
+            func = HYPERBOLIC_KEYS[func]
+        state.hyperbolic = False
+
+        if self.in_expression():
+            text = EXPRESSION_KEYS[func]
+            self._append_token(text, prefix=text not in _INFIX_TEXT)
+            return self.state.entry
+        if func in CONSTANT_FUNCS:
+            return self._result(CONSTANT_FUNCS[func])
+        try:
+            if self.state.entry in (ERROR, ''):
+                self.set_value(0.0)
+            value = self.current_value()
+            if func in PENDING_FUNCS:
+                self._begin_operation(PENDING_FUNCS[func])
+                return self.state.entry
+            if func in TRIG_KEYS:
+                result = trig.MODE_FUNCTIONS[state.angle_mode][TRIG_KEYS[func]](value)
+            else:
+                result = UNARY_FUNCS[func](value)
+            return self._result(result, self._describe(func))
+        except (ArithmeticError, ValueError, KeyError):
+            return self._error()
+
+    def _describe(self, func):
+        # Written with the expression syntax so history entries can be re-run
+        text = EXPRESSION_KEYS[func]
+        if text in _INFIX_TEXT:
+            return self.state.entry + text
+        if text.endswith('('):
+            return f"{text}{self.state.entry})"
+        return text + self.state.entry
+
+    # ============ Formulas ============
+    def formula(self, formula):
+        """Apply a formula of one variable to the entry.
+
+        A formula of two variables takes the entry as the first and waits,
+        like x^y, for the second and '='.
+        """
+        state = self.state
+        try:
+            if state.entry in (ERROR, ''):
+                self.set_value(0.0)
+            value = self.current_value()
+            if len(formula.variables) == 2:
+                self._begin_operation(formula)
+                return state.entry
+            return self._result(formula(value), f"{formula.name}({state.entry})")
+        except (ArithmeticError, ValueError, TypeError):
+            return self._error()
+
+    # ============ Memory ============
+    def memory(self, op):
+        """Memory operations"""
+        state = self.state
+        try:
+            current = self.current_value() if state.entry not in ('0', ERROR, '') else 0
+            if op == 'MC':
+                state.memory = 0
+            elif op == 'MR':
+                state.entry = str(state.memory)
+                state.value = state.memory
+            elif op == 'M+':
+                state.memory += current
+            elif op == 'M-':
+                state.memory -= current
+            elif op == 'MS':
+                state.memory = current
+        except ValueError:
+            pass
+        return state.entry
@@ -0,0 +1,331 @@
+"""Infix expression compiler for bracketed keypad input.
+
+Text is tokenized and parsed once into a tree, then compiled into nested
+closures (constant sub-trees are folded at compile time). Compiled forms are
+kept in an LRU cache keyed by the source text, so evaluating the same input
+again never re-parses it. There is no eval().
+
+``compile_formula`` compiles the same syntax with extra named constants
+bound at compile time. With ``vectorized=True`` it uses NumPy ufuncs, so
+the result accepts whole arrays.
+"""
+import functools
+import math
+import operator
+import re
+
+import trig
+from engine import BINARY_OPS, UNARY_FUNCS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ExpressionError(ValueError):
+    """Raised when the input is not a valid expression"""
+
+
+# Keypad glyphs -> canonical ASCII
+_NORMALIZE = str.maketrans({'×': '*', '÷': '/', '−': '-'})
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)
+      | (?P<name>[A-Za-z_][A-Za-z_0-9]*)
+      | (?P<op>\*\*|⁻¹|[-+*/^()!²³√∛π])
+    )""", re.VERBOSE)
+
+FUNCTIONS = {
+    'log': UNARY_FUNCS['log'],
+    'ln': UNARY_FUNCS['ln'],
+    'exp': UNARY_FUNCS['e^x'],
+    'abs': UNARY_FUNCS['|x|'],
+    'sqrt': UNARY_FUNCS['√'],
+    'cbrt': UNARY_FUNCS['∛'],
+    '√': UNARY_FUNCS['√'],
+    '∛': UNARY_FUNCS['∛'],
+}
+
+# FUNCTIONS plus the trigonometric functions bound to each angle mode
+MODE_FUNCTIONS = {mode: dict(FUNCTIONS, **trig.MODE_FUNCTIONS[mode]) for mode in trig.ANGLE_MODES}
+
+POSTFIX = {
+    '!': UNARY_FUNCS['n!'],
+    '²': UNARY_FUNCS['x²'],
+    '³': UNARY_FUNCS['x³'],
+    '⁻¹': UNARY_FUNCS['1/x'],
+}
+
+CONSTANTS = {
+    'π': math.pi,
+    'pi': math.pi,
+    'e': math.e,
+}
+
+# Element-wise counterparts for compile_formula(vectorized=True)
+VECTOR_OPS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '^': operator.pow,
+    'mod': operator.mod,
+}
+
+VECTOR_POSTFIX = {
+    '²': lambda x: x * x,
+    '³': lambda x: x * x * x,
+    '⁻¹': lambda x: 1 / x,
+}
+
+if numpy is not None:
+    VECTOR_FUNCTIONS = {
+        'log': numpy.log10,
+        'ln': numpy.log,
+        'exp': numpy.exp,
+        'abs': numpy.abs,
+        'sqrt': numpy.sqrt,
+        'cbrt': numpy.cbrt,
+        '√': numpy.sqrt,
+        '∛': numpy.cbrt,
+        'sin': numpy.sin,
+        'cos': numpy.cos,
+        'tan': numpy.tan,
+        'asin': numpy.arcsin,
+        'acos': numpy.arccos,
+        'atan': numpy.arctan,
+        'sinh': numpy.sinh,
+        'cosh': numpy.cosh,
+        'tanh': numpy.tanh,
+    }
+else:
+    VECTOR_FUNCTIONS = None
+
+_ADDITIVE = ('+', '-')
+_MULTIPLICATIVE = ('*', '/', 'mod')
+
+
+def tokenize(text):
+    """Split expression text into (kind, value) tokens"""
+    text = text.translate(_NORMALIZE).replace('**', '^')
+    tokens = []
+    pos = 0
+    end = len(text.rstrip())
+    while pos < end:
+        match = _TOKEN_RE.match(text, pos)
+        if match is None or match.end() == pos:
+            raise ExpressionError(f"unexpected character {text[pos]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'number':
+            tokens.append(('num', float(value)))
+        elif kind == 'name' and value == 'mod':
+            tokens.append(('op', 'mod'))
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing a small tuple tree"""
+
+    def __init__(self, tokens, functions, constants=CONSTANTS, postfix=POSTFIX):
+        self.tokens = tokens
+        self.functions = functions
+        self.constants = constants
+        self.postfix_funcs = postfix
+        self.pos = 0
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return (None, None)
+
+    def advance(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError('empty expression')
+        node = self.expr()
+        if self.pos < len(self.tokens):
+            raise ExpressionError(f"unexpected {self.peek()[1]!r}")
+        return node
+
+    def expr(self):
+        node = self.term()
+        while self.peek()[1] in _ADDITIVE and self.peek()[0] == 'op':
+            op = self.advance()[1]
+            node = ('bin', op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek()[1] in _MULTIPLICATIVE and self.peek()[0] == 'op':
+            op = self.advance()[1]
+            node = ('bin', op, node, self.unary())
+        return node
+
+    def unary(self):
+        kind, value = self.peek()
+        if kind == 'op' and value in _ADDITIVE:
+            self.advance()
+            operand = self.unary()
+            return ('neg', operand) if value == '-' else operand
+        return self.power()
+
+    def power(self):
+        base = self.postfix()
+        if self.peek() == ('op', '^'):
+            self.advance()
+            # Right associative, and the exponent may carry its own sign
+            return ('bin', '^', base, self.unary())
+        return base
+
+    def postfix(self):
+        node = self.primary()
+        while self.peek()[0] == 'op' and self.peek()[1] in self.postfix_funcs:
+            node = ('call', self.postfix_funcs[self.advance()[1]], node)
+        return node
+
+    def primary(self):
+        kind, value = self.advance()
+        if kind == 'num':
+            return ('num', value)
+        if kind == 'op' and value == '(':
+            node = self.expr()
+            if self.peek() == ('op', ')'):
+                self.advance()
+            elif self.pos < len(self.tokens):
+                raise ExpressionError(f"unexpected {self.peek()[1]!r}")
+            # Unclosed brackets at the end of input are closed implicitly
+            return node
+        if value in self.functions:
+            func = self.functions[value]
+            if self.peek() == ('op', '('):
+                return ('call', func, self.primary())
+            return ('call', func, self.postfix())
+        if value in self.constants:
+            return ('num', self.constants[value])
+        if kind == 'name':
+            return ('var', value)
+        if kind is None:
+            raise ExpressionError('unexpected end of expression')
+        raise ExpressionError(f"unexpected {value!r}")
+
+
+def _compile_node(node, ops=BINARY_OPS):
+    """Return (closure, constant) for a tree node; constant is None unless folded"""
+    tag = node[0]
+    if tag == 'num':
+        value = node[1]
+        return (lambda env: value), value
+    if tag == 'var':
+        name = node[1]
+
+        def load(env):
+            try:
+                return env[name]
+            except (KeyError, TypeError):
+                raise ExpressionError(f"unknown name {name!r}") from None
+        return load, None
+
+    if tag == 'neg':
+        child, const = _compile_node(node[1], ops)
+        if const is not None:
+            return _fold(lambda: -const, lambda env: -child(env))
+        return (lambda env: -child(env)), None
+    if tag == 'call':
+        func = node[1]
+        child, const = _compile_node(node[2], ops)
+        if const is not None:
+            return _fold(lambda: func(const), lambda env: func(child(env)))
+        return (lambda env: func(child(env))), None
+
+    op = ops[node[1]]
+    left, left_const = _compile_node(node[2], ops)
+    right, right_const = _compile_node(node[3], ops)
+    if left_const is not None and right_const is not None:
+        return _fold(lambda: op(left_const, right_const), lambda env: op(left(env), right(env)))
+    return (lambda env: op(left(env), right(env))), None
+
+
+def _fold(compute, fallback):
+    # Errors such as 1/0 are left for evaluation time so they surface there
+    try:
+        value = compute()
+    except (ArithmeticError, ValueError):
+        return fallback, None
+    return (lambda env: value), value
+
+
+class CompiledExpression:
+    """A parsed expression that can be evaluated any number of times"""
+    __slots__ = ('source', 'variables', '_func', 'constant')
+
+    def __init__(self, source, func, variables, constant=None):
+        self.source = source
+        self.variables = variables
+        self._func = func
+        self.constant = constant
+
+    def evaluate(self, env=None):
+        """Evaluate with variable values taken from ``env``"""
+        return self._func(env)
+
+    __call__ = evaluate
+
+    def __repr__(self):
+        return f"CompiledExpression({self.source!r})"
+
+
+def _variables(node, found):
+    tag = node[0]
+    if tag == 'var':
+        found.add(node[1])
+    elif tag in ('neg', 'call'):
+        _variables(node[-1], found)
+    elif tag == 'bin':
+        _variables(node[2], found)
+        _variables(node[3], found)
+    return found
+
+
+@functools.lru_cache(maxsize=256)
+def compile_expression(text, angle_mode='DEG'):
+    """Parse and compile ``text``; repeated calls hit the LRU cache"""
+    tree = _Parser(tokenize(text), MODE_FUNCTIONS[angle_mode]).parse()
+    func, constant = _compile_node(tree)
+    return CompiledExpression(text, func, frozenset(_variables(tree, set())), constant)
+
+
+def compile_formula(text, constants, vectorized=False):
+    """Compile ``text`` with ``constants`` (name -> value) folded in.
+
+    Trigonometric functions take radians. With ``vectorized`` the result
+    works element-wise on NumPy arrays; that needs NumPy to be installed.
+    """
+    if vectorized:
+        if VECTOR_FUNCTIONS is None:
+            raise ImportError('vectorized formulas need NumPy')
+        functions, postfix, ops = VECTOR_FUNCTIONS, VECTOR_POSTFIX, VECTOR_OPS
+    else:
+        functions, postfix, ops = MODE_FUNCTIONS['RAD'], POSTFIX, BINARY_OPS
+    tree = _Parser(tokenize(text), functions, dict(CONSTANTS, **constants), postfix).parse()
+    func, constant = _compile_node(tree, ops)
+    return CompiledExpression(text, func, frozenset(_variables(tree, set())), constant)
+
+
+def evaluate(text, env=None, angle_mode='DEG'):
+    """Compile (cached) and evaluate ``text``"""
+    return compile_expression(text, angle_mode).evaluate(env)
+
+
+def bracket_depth(text):
+    """Number of '(' still waiting for a matching ')'"""
+    return text.count('(') - text.count(')')
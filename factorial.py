@@ -0,0 +1,138 @@
+"""Factorials and the gamma function behind the n! key.
+
+* Integer factorials come from a table that grows incrementally, so asking
+  for n! after (n-1)! costs one multiplication and repeats cost a lookup.
+* Non-integers, including negative non-integers, use the Lanczos
+  approximation of gamma: x! = Γ(x + 1).
+* Results too large for a float are computed through log-gamma and
+  returned as a ScientificResult, which displays as scientific notation
+  instead of overflowing.
+"""
+import math
+
+# Exact integers are cached up to this n; larger ones fall back to math.factorial
+TABLE_LIMIT = 1000
+
+# Largest n whose factorial still fits in a float
+FLOAT_LIMIT = 170
+
+_TABLE = [1]
+
+# Lanczos approximation, g = 7, n = 9
+_LANCZOS_G = 7
+_LANCZOS_COEFFICIENTS = (
+    0.99999999999980993,
+    676.5203681218851,
+    -1259.1392167224028,
+    771.32342877765313,
+    -176.61502916214059,
+    12.507343278686905,
+    -0.13857109526572012,
+    9.9843695780195716e-6,
+    1.5056327351493116e-7,
+)
+_SQRT_TWO_PI = math.sqrt(2 * math.pi)
+_LOG_SQRT_TWO_PI = math.log(_SQRT_TWO_PI)
+_LN10 = math.log(10)
+
+
+class ScientificResult(float):
+    """A value beyond float range, kept as mantissa × 10**exponent.
+
+    As a float it is ±inf, so arithmetic still overflows the usual way, but
+    formatting it (format_number, str) shows the real magnitude.
+    """
+
+    def __new__(cls, mantissa, exponent):
+        self = super().__new__(cls, math.copysign(math.inf, mantissa))
+        self.mantissa = mantissa
+        self.exponent = exponent
+        return self
+
+    @classmethod
+    def from_log10(cls, log10, sign=1):
+        exponent = math.floor(log10)
+        mantissa = 10 ** (log10 - exponent)
+        if mantissa >= 9.9999995:
+            # Would round up to 10.000000 when shown with 6 decimals
+            mantissa /= 10
+            exponent += 1
+        return cls(math.copysign(mantissa, sign), exponent)
+
+    def __format__(self, spec):
+        digits = 6
+        if spec.startswith('.') and spec[1:-1].isdigit():
+            digits = int(spec[1:-1])
+        return f"{self.mantissa:.{digits}f}e+{self.exponent}"
+
+    def __str__(self):
+        return format(self, '.6e')
+
+    __repr__ = __str__
+
+
+def factorial(n):
+    """Exact n! for a non-negative integer, memoized"""
+    if n < 0 or n != int(n):
+        raise ValueError('factorial is only defined for non-negative integers')
+    n = int(n)
+    if n < len(_TABLE):
+        return _TABLE[n]
+    if n > TABLE_LIMIT:
+        return math.factorial(n)
+    value = _TABLE[-1]
+    for k in range(len(_TABLE), n + 1):
+        value *= k
+        _TABLE.append(value)
+    return value
+
+
+def _lanczos_series(x):
+    # x is already shifted down by one
+    series = _LANCZOS_COEFFICIENTS[0]
+    for i in range(1, len(_LANCZOS_COEFFICIENTS)):
+        series += _LANCZOS_COEFFICIENTS[i] / (x + i)
+    return series
+
+
+def gamma(x):
+    """Γ(x) by the Lanczos approximation (reflection formula below 0.5)"""
+    if x == int(x) and x <= 0:
+        raise ValueError('gamma has poles at non-positive integers')
+    if x < 0.5:
+        return math.pi / (math.sin(math.pi * x) * gamma(1 - x))
+    x -= 1
+    t = x + _LANCZOS_G + 0.5
+    # Split the power so t**(x + 0.5) does not overflow before exp(-t) shrinks it
+    half = t ** ((x + 0.5) / 2)
+    return _SQRT_TWO_PI * _lanczos_series(x) * (half * math.exp(-t)) * half
+
+
+def log_gamma(x):
+    """ln|Γ(x)|, usable far beyond the range where Γ(x) overflows"""
+    if x == int(x) and x <= 0:
+        raise ValueError('gamma has poles at non-positive integers')
+    if x < 0.5:
+        return math.log(math.pi / abs(math.sin(math.pi * x))) - log_gamma(1 - x)
+    x -= 1
+    t = x + _LANCZOS_G + 0.5
+    return _LOG_SQRT_TWO_PI + (x + 0.5) * math.log(t) - t + math.log(_lanczos_series(x))
+
+
+def gamma_sign(x):
+    """Sign of Γ(x) (it alternates between the poles on the negative axis)"""
+    if x > 0:
+        return 1
+    return -1 if math.floor(x) % 2 else 1
+
+
+def calculator_factorial(x):
+    """What the n! key shows: exact for small integers, Γ(x + 1) otherwise"""
+    if x == int(x):
+        if x < 0:
+            raise ValueError('factorial of a negative integer')
+        if x <= FLOAT_LIMIT:
+            return factorial(int(x))
+    elif x + 1 <= FLOAT_LIMIT + 1:
+        return gamma(x + 1)
+    return ScientificResult.from_log10(log_gamma(x + 1) / _LN10, gamma_sign(x + 1))
@@ -0,0 +1,200 @@
+"""Number formatting for the display, history and batch output.
+
+``format_number`` is the calculator's standard readout. It shows up to 8
+decimals, drops trailing zeros, and switches to ``1.234560e+10`` style at
+1e10 and 1e-10. The common cases are single passes specialised on the exact
+type, because it runs on every result.
+
+``make_formatter`` builds other readouts from the same pieces:
+
+* ``sig_figs``: show exactly this many significant digits, trailing zeros
+  included (``1.500`` for 1.5 at 4 figures).
+* ``notation``: ``'auto'`` (fixed inside the cutoffs, scientific outside),
+  ``'fixed'``, ``'sci'`` or ``'eng'`` (exponent a multiple of 3).
+* ``grouping``: separate thousands in the integer part with ``group_sep``.
+* ``width``: never return more than this many characters. Decimals are
+  dropped first, then the number goes to scientific with fewer digits. A
+  number that does not fit even then (``1e+300`` needs 6) shows as ``…``.
+
+    >>> make_formatter(notation='eng', sig_figs=4)(0.00047)
+    '470.0e-06'
+"""
+from decimal import Decimal
+
+NOTATIONS = ('auto', 'fixed', 'sci', 'eng')
+
+DEFAULT_DECIMALS = 8
+# Significant digits of a scientific readout when sig_figs is not given (.6e)
+DEFAULT_SCI_DIGITS = 7
+UPPER_CUTOFF = 1e10
+LOWER_CUTOFF = 1e-10
+
+_INFINITIES = (float('inf'), float('-inf'))
+
+# Shown when a number cannot be written within ``width`` characters
+TOO_WIDE = '…'
+
+
+def _legacy_format(num):
+    """The original format_number, for types the fast path does not cover"""
+    if isinstance(num, float):
+        if abs(num) >= 1e10 or (abs(num) <= 1e-10 and num != 0):
+            return f"{num:.6e}"
+        elif num.is_integer():
+            return str(int(num))
+        else:
+            rounded = round(num, 8)
+            if rounded.is_integer():
+                return str(int(rounded))
+            else:
+                s = f"{rounded:.8f}".rstrip('0').rstrip('.')
+                return s
+    return str(num)
+
+
+def format_number(num):
+    """Format number"""
+    if num.__class__ is float:
+        if -1e10 < num < 1e10:
+            if num.is_integer():
+                return str(int(num))
+            if -1e-10 <= num <= 1e-10:
+                return f"{num:.6e}"
+            # .8f rounds exactly like round(num, 8) followed by .8f
+            s = f"{num:.8f}".rstrip('0')
+            if s[-1] != '.':
+                return s
+            s = s[:-1]
+            return '0' if s == '-0' else s
+        return f"{num:.6e}"
+    if num.__class__ is int:
+        return str(num)
+    return _legacy_format(num)
+
+
+# ============ Building blocks ============
+def _parts(num, digits):
+    """(negative, digit string, exponent) with num ≈ d.ddd × 10**exponent"""
+    mantissa = getattr(num, 'mantissa', None)
+    shift = 0
+    if mantissa is not None:
+        # factorial.ScientificResult: beyond float range
+        num, shift = mantissa, num.exponent
+    elif isinstance(num, int):
+        num = Decimal(num)
+    coefficient, _, exponent = format(num, f'.{digits - 1}e').partition('e')
+    negative = coefficient[0] == '-'
+    return negative, coefficient.lstrip('-').replace('.', ''), int(exponent) + shift
+
+
+def _group(text, sep):
+    """Insert ``sep`` between thousands of the integer part of ``text``"""
+    sign = '-' if text[0] == '-' else ''
+    body = text.lstrip('-')
+    integer, point, fraction = body.partition('.')
+    head = len(integer) % 3 or 3
+    groups = [integer[:head]] + [integer[i:i + 3] for i in range(head, len(integer), 3)]
+    return sign + sep.join(groups) + point + fraction
+
+
+def _fixed_decimals(num, decimals):
+    """Fixed point with at most ``decimals`` decimals, trailing zeros dropped"""
+    if isinstance(num, int):
+        return str(num)
+    s = f"{num:.{decimals}f}"
+    if decimals:
+        s = s.rstrip('0').rstrip('.')
+    return '0' if s == '-0' else s
+
+
+def _fixed_significant(num, sig_figs):
+    """Fixed point showing exactly ``sig_figs`` significant digits"""
+    negative, digits, exponent = _parts(num, sig_figs)
+    if exponent >= sig_figs - 1:
+        text = digits + '0' * (exponent - sig_figs + 1)
+    elif exponent < 0:
+        text = '0.' + '0' * (-exponent - 1) + digits
+    else:
+        text = digits[:exponent + 1] + '.' + digits[exponent + 1:]
+    return '-' + text if negative else text
+
+
+def _scientific(num, digits, step):
+    """Mantissa and exponent; ``step`` 3 gives engineering notation"""
+    negative, digits, exponent = _parts(num, digits)
+    lead = exponent % step
+    exponent -= lead
+    point = lead + 1
+    if point >= len(digits):
+        mantissa = digits + '0' * (point - len(digits))
+    else:
+        mantissa = digits[:point] + '.' + digits[point:]
+    return f"{'-' if negative else ''}{mantissa}e{exponent:+03d}"
+
+
+# ============ Configurable formatters ============
+def make_formatter(notation='auto', decimals=DEFAULT_DECIMALS, sig_figs=None,
+                   grouping=False, group_sep=',', width=None,
+                   upper=UPPER_CUTOFF, lower=LOWER_CUTOFF):
+    """Return a function formatting one number with these options.
+
+    Called with no arguments it returns ``format_number`` itself.
+    """
+    if notation not in NOTATIONS:
+        raise ValueError(f"unknown notation {notation!r}")
+    if sig_figs is not None and sig_figs < 1:
+        raise ValueError('sig_figs must be at least 1')
+    if width is not None and width < 1:
+        raise ValueError('width must be at least 1')
+    if (notation == 'auto' and decimals == DEFAULT_DECIMALS and sig_figs is None
+            and not grouping and width is None and upper == UPPER_CUTOFF and lower == LOWER_CUTOFF):
+        return format_number
+
+    step = 3 if notation == 'eng' else 1
+    sci_digits = sig_figs or DEFAULT_SCI_DIGITS
+
+    def fixed(num, places=decimals, figures=sig_figs):
+        if figures is None:
+            text = _fixed_decimals(num, places)
+        else:
+            text = _fixed_significant(num, figures)
+        return _group(text, group_sep) if grouping else text
+
+    def fit(num):
+        if not hasattr(num, 'mantissa') and (num != num or num in _INFINITIES):
+            return TOO_WIDE
+        # Fewer decimals (or figures) first, as long as the number does not vanish
+        if notation != 'sci' and notation != 'eng' and lower < abs(num) < upper:
+            if sig_figs is None:
+                whole = fixed(num, 0)
+                candidates = [fixed(num, places) for places in range(width - len(whole) - 1, 0, -1)]
+                candidates.append(whole)
+            else:
+                candidates = [fixed(num, figures=figures) for figures in range(sig_figs - 1, 0, -1)]
+            for text in candidates:
+                if len(text) <= width and text.strip('-0.,' + group_sep):
+                    return text
+        for digits in range(min(sci_digits, width), 0, -1):
+            text = _scientific(num, digits, step)
+            if len(text) <= width:
+                return text
+        return TOO_WIDE
+
+    def formatter(num):
+        if isinstance(num, bool) or not isinstance(num, (int, float)):
+            return str(num)
+        if hasattr(num, 'mantissa'):
+            text = _scientific(num, sci_digits, step)
+        elif num != num or num in _INFINITIES:
+            text = str(num)
+        elif num == 0:
+            return '0' if sig_figs is None or notation not in ('auto', 'fixed') else fixed(0.0)
+        elif notation == 'fixed' or (notation == 'auto' and lower < abs(num) < upper):
+            text = fixed(num)
+        else:
+            text = _scientific(num, sci_digits, step)
+        if width is not None and len(text) > width:
+            text = fit(num)
+        return text
+
+    return formatter
@@ -0,0 +1,178 @@
+"""Persistent calculation history.
+
+Two append-only files live in the app's data directory:
+
+``history.log``
+    one record per calculation: a ``<HH`` header (expression and result
+    byte lengths) followed by the UTF-8 text of both.
+``history.idx``
+    the byte offset of every record as a little-endian uint64, so entry ``i``
+    is found without scanning the log.
+
+Opening a history only reads the size of the index and the last
+``recent_size`` records into a ring buffer. The full offset table is loaded
+the first time an older entry or a search needs it, and searches scan the
+memory-mapped log rather than decoding every record.
+"""
+import bisect
+import collections
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+LOG_NAME = 'history.log'
+INDEX_NAME = 'history.idx'
+
+_HEADER = struct.Struct('<HH')
+_OFFSET_SIZE = 8
+_MAX_TEXT = 0xFFFF
+
+HistoryEntry = collections.namedtuple('HistoryEntry', 'index expression result')
+
+
+def _encode(text):
+    """UTF-8 of ``text``, cut to _MAX_TEXT bytes without splitting a character"""
+    data = text.encode('utf-8')
+    if len(data) <= _MAX_TEXT:
+        return data
+    return data[:_MAX_TEXT].decode('utf-8', 'ignore').encode('utf-8')
+
+
+class History:
+    """Append-only log of (expression, result) pairs with fast recall"""
+
+    def __init__(self, directory, recent_size=100):
+        os.makedirs(directory, exist_ok=True)
+        self._log = open(os.path.join(directory, LOG_NAME), 'a+b')
+        self._index = open(os.path.join(directory, INDEX_NAME), 'a+b')
+        self._offsets = None
+        self._count = self._recover()
+        self.recent_entries = collections.deque(maxlen=recent_size)
+        for i in range(max(0, self._count - recent_size), self._count):
+            self.recent_entries.append(self._read(i, self._offset(i)))
+
+    def _recover(self):
+        """Drop a record whose write was interrupted; return the entry count"""
+        self._index.seek(0, os.SEEK_END)
+        index_size = self._index.tell()
+        count = index_size // _OFFSET_SIZE
+        self._log.seek(0, os.SEEK_END)
+        log_size = self._log.tell()
+
+        while count:
+            end = self._record_end(self._offset(count - 1), log_size)
+            if end is not None:
+                break
+            count -= 1
+        else:
+            end = 0
+
+        if index_size != count * _OFFSET_SIZE:
+            self._index.truncate(count * _OFFSET_SIZE)
+        if log_size != end:
+            self._log.truncate(end)
+        return count
+
+    def _record_end(self, offset, log_size):
+        if offset + _HEADER.size > log_size:
+            return None
+        self._log.seek(offset)
+        expr_len, result_len = _HEADER.unpack(self._log.read(_HEADER.size))
+        end = offset + _HEADER.size + expr_len + result_len
+        return end if end <= log_size else None
+
+    # ============ Offsets ============
+    def _offset(self, i):
+        if self._offsets is not None:
+            return self._offsets[i]
+        self._index.seek(i * _OFFSET_SIZE)
+        return struct.unpack('<Q', self._index.read(_OFFSET_SIZE))[0]
+
+    def _load_offsets(self):
+        if self._offsets is None:
+            offsets = array('Q')
+            self._index.seek(0)
+            offsets.frombytes(self._index.read(self._count * _OFFSET_SIZE))
+            if sys.byteorder != 'little':
+                offsets.byteswap()
+            self._offsets = offsets
+        return self._offsets
+
+    # ============ Reading ============
+    def _read(self, i, offset):
+        self._log.seek(offset)
+        expr_len, result_len = _HEADER.unpack(self._log.read(_HEADER.size))
+        data = self._log.read(expr_len + result_len)
+        # 'replace': logs written before texts were trimmed by character may end mid-character
+        return HistoryEntry(i, data[:expr_len].decode('utf-8', 'replace'),
+                            data[expr_len:].decode('utf-8', 'replace'))
+
+    def __len__(self):
+        return self._count
+
+    def get(self, i):
+        """Entry number ``i`` (negative counts from the newest)"""
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError('history index out of range')
+        oldest_recent = self._count - len(self.recent_entries)
+        if i >= oldest_recent:
+            return self.recent_entries[i - oldest_recent]
+        return self._read(i, self._load_offsets()[i])
+
+    def recent(self):
+        """Entries held in memory, newest first"""
+        return list(reversed(self.recent_entries))
+
+    def search(self, query, limit=50):
+        """Newest-first entries whose expression or result contains ``query``"""
+        needle = query.encode('utf-8')
+        if not needle or not self._count:
+            return []
+        offsets = self._load_offsets()
+        self._log.flush()
+        found = []
+        with mmap.mmap(self._log.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            end = len(data)
+            while len(found) < limit:
+                pos = data.rfind(needle, 0, end)
+                if pos < 0:
+                    break
+                i = bisect.bisect_right(offsets, pos) - 1
+                entry = self._read(i, offsets[i])
+                if query in entry.expression or query in entry.result:
+                    found.append(entry)
+                    # Continue before this record so each entry is reported once
+                    end = offsets[i]
+                else:
+                    # The match straddled header bytes; keep looking to its left
+                    end = pos + len(needle) - 1
+                if end <= 0:
+                    break
+        return found
+
+    # ============ Writing ============
+    def append(self, expression, result):
+        """Record a calculation and return its index"""
+        expression = _encode(expression)
+        result = _encode(result)
+        self._log.seek(0, os.SEEK_END)
+        offset = self._log.tell()
+        self._log.write(_HEADER.pack(len(expression), len(result)) + expression + result)
+        self._log.flush()
+        self._index.write(struct.pack('<Q', offset))
+        self._index.flush()
+
+        if self._offsets is not None:
+            self._offsets.append(offset)
+        entry = HistoryEntry(self._count, expression.decode('utf-8'), result.decode('utf-8'))
+        self.recent_entries.append(entry)
+        self._count += 1
+        return entry.index
+
+    def close(self):
+        self._log.close()
+        self._index.close()
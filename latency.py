@@ -0,0 +1,170 @@
+"""Per-handler latency instrumentation for main.py.
+
+Set PHYSCALC_LATENCY to a file path (or to 1 for latency.json) and
+main.py wraps each UI callback listed in HANDLERS. Work handed to the
+background runner is timed from submission to completion under
+``'<method> job'`` (see ``record``), since the handler that submits it
+returns at once. Every frame time is recorded too. Each series goes into
+a fixed-size ring buffer, so memory stays flat however long the app
+runs. F12 toggles an on-screen overlay with p50/p95/p99. F11 writes the
+JSON report, which is also written when the app closes.
+
+When the variable is unset nothing is wrapped and no frame callback is
+scheduled, so the handlers run exactly as before.
+"""
+import json
+import math
+import os
+import platform
+import time
+from array import array
+
+LATENCY_ENV = 'PHYSCALC_LATENCY'
+DEFAULT_REPORT = 'latency.json'
+
+# Samples kept per series; older ones are overwritten
+DEFAULT_SIZE = 1024
+
+PERCENTILES = (50, 95, 99)
+
+# App methods timed when instrumentation is on
+HANDLERS = (
+    'on_button_press',
+    'on_scientific',
+    'on_memory',
+    'on_stat_push',
+    'convert_value',
+    'on_field_change',
+    'on_constant_change',
+    'on_formula_apply',
+)
+
+FRAME = 'frame'
+
+
+class RingBuffer:
+    """The newest ``size`` samples of one series, in seconds"""
+    __slots__ = ('samples', 'size', 'count', 'total', '_next')
+
+    def __init__(self, size=DEFAULT_SIZE):
+        self.samples = array('d', bytes(8 * size))
+        self.size = size
+        # Samples ever added, including overwritten ones
+        self.total = 0
+        self.count = 0
+        self._next = 0
+
+    def add(self, value):
+        self.samples[self._next] = value
+        self._next = (self._next + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        self.total += 1
+
+    def values(self):
+        """Samples currently held (not in time order)"""
+        return self.samples[:self.count]
+
+    def summary(self):
+        """Count, percentiles and max in milliseconds"""
+        values = sorted(self.values())
+        result = {'count': self.total}
+        if not values:
+            return result
+        for p in PERCENTILES:
+            # Nearest-rank percentile
+            rank = max(0, math.ceil(p / 100 * len(values)) - 1)
+            result[f'p{p}_ms'] = round(values[rank] * 1000, 3)
+        result['max_ms'] = round(values[-1] * 1000, 3)
+        return result
+
+
+class LatencyMonitor:
+    """Ring buffers of handler and frame times"""
+
+    def __init__(self, path=None, size=DEFAULT_SIZE):
+        self.path = path
+        self.enabled = path is not None
+        self.size = size
+        self.buffers = {}
+
+    @classmethod
+    def from_environ(cls):
+        value = os.environ.get(LATENCY_ENV)
+        if not value:
+            return cls()
+        return cls(DEFAULT_REPORT if value == '1' else value)
+
+    def buffer(self, name):
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            buffer = self.buffers[name] = RingBuffer(self.size)
+        return buffer
+
+    def timed(self, func, name=None):
+        """Wrap ``func`` so each call's duration is recorded under ``name``"""
+        add = self.buffer(name or func.__name__).add
+        clock = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            begin = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add(clock() - begin)
+
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+
+    def instrument(self, obj, names=HANDLERS):
+        """Replace methods of ``obj`` with timed wrappers; no-op when disabled.
+
+        Must run before the methods are bound to widgets.
+        """
+        if not self.enabled:
+            return
+        for name in names:
+            setattr(obj, name, self.timed(getattr(obj, name), name))
+
+    def record(self, name, seconds):
+        """Add one measurement taken outside a wrapped call; no-op when disabled"""
+        if self.enabled:
+            self.buffer(name).add(seconds)
+
+    def frame(self, dt):
+        """Clock callback recording the time since the previous frame"""
+        self.buffer(FRAME).add(dt)
+
+    # ============ Report ============
+    def summary(self):
+        return {name: buffer.summary() for name, buffer in self.buffers.items()}
+
+    def summary_text(self):
+        """One line per series, for the overlay"""
+        lines = [f"{'':<19}{'n':>6}{'p50':>8}{'p95':>8}{'p99':>8}"]
+        for name, stats in self.summary().items():
+            if 'p50_ms' not in stats:
+                continue
+            lines.append(f"{name:<19}{stats['count']:>6}" + ''.join(
+                f"{stats[f'p{p}_ms']:>8.2f}" for p in PERCENTILES))
+        return '\n'.join(lines)
+
+    def report(self):
+        return {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'window': self.size,
+            'series': self.summary(),
+        }
+
+    def write(self):
+        """Write the JSON report; returns the path or None when disabled"""
+        if not self.enabled:
+            return None
+        with open(self.path, 'w', encoding='utf-8') as handle:
+            json.dump(self.report(), handle, indent=2)
+        return self.path
+
+
+LATENCY = LatencyMonitor.from_environ()
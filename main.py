@@ -1,222 +1,112 @@
-from kivy.app import App
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.button import Button
-from kivy.uix.textinput import TextInput
-from kivy.uix.spinner import Spinner
-from kivy.core.window import Window
-from kivy.config import Config
-from kivy.animation import Animation
-from kivy.metrics import dp
-from kivy.utils import get_color_from_hex
-from kivy.uix.label import Label
-from kivy.uix.togglebutton import ToggleButton
-import math
+import collections
+import functools
+import os
+import time
+
+from latency import LATENCY
+from startup_profile import PROFILER
+
+PROFILER.track_imports()
+
+with PROFILER.section('import kivy'):
+    from kivy.app import App
+    from kivy.uix.gridlayout import GridLayout
+    from kivy.uix.boxlayout import BoxLayout
+    from kivy.uix.textinput import TextInput
+    from kivy.core.window import Window
+    from kivy.config import Config
+    from kivy.clock import Clock
+    from kivy.metrics import dp
+    from kivy.utils import get_color_from_hex
+    from kivy.uix.label import Label
+    from kivy.uix.togglebutton import ToggleButton
+    from kivy.logger import Logger
+    from widgets import CalculatorButton, DisplayModel, GlyphDisplay, PerfOverlay, Picker, PlotView
+
+with PROFILER.section('import engine (math)'):
+    from background import BackgroundRunner
+    from engine import ERROR, CalculatorEngine
+    from formatting import format_number, make_formatter
+    from history import History
+
+with PROFILER.section('setup PHYSICS_CONSTANTS'):
+    from constants import CONSTANTS_INDEX
+
+with PROFILER.section('setup UNIT_CONVERSIONS'):
+    from units import UNIT_CATEGORIES, UNIT_CONVERSIONS, conversion_table, convert_temperature
 
 # Window settings
 Config.set('graphics', 'width', '700')
 Config.set('graphics', 'height', '1050')
 Config.set('graphics', 'resizable', False)
 
-# ============ Physical Constants - FULL VERSION ============
-PHYSICS_CONSTANTS = {
-    'Quantum Mechanics': {
-        'Planck Constant (h)': '6.62607015e-34',
-        'Reduced Planck (ħ)': '1.054571817e-34',
-        'Planck Length (lP)': '1.616255e-35',
-        'Planck Time (tP)': '5.391247e-44',
-        'Electron Mass (me)': '9.1093837015e-31',
-        'Proton Mass (mp)': '1.67262192369e-27',
-        'Neutron Mass (mn)': '1.67492749804e-27',
-        'Electron Charge (e)': '1.602176634e-19',
-        'Bohr Radius (a₀)': '5.29177210903e-11',
-    },
-    'Geophysics': {
-        'Earth Mass (kg)': '5.9722e24',
-        'Earth Radius (m)': '6371000',
-        'Surface Gravity (g)': '9.80665',
-        'Rotation Period (s)': '86164',
-        'Continental Crust (m)': '35000',
-        'Oceanic Crust (m)': '7000',
-    },
-    'Astrophysics': {
-        'Speed of Light (c)': '299792458',
-        'Gravitational Constant (G)': '6.67430e-11',
-        'Hubble Constant (H₀)': '67.4',
-        'Age of Universe (years)': '13.8e9',
-        'Solar Mass (M☉)': '1.98847e30',
-        'Astronomical Unit (AU)': '1.495978707e11',
-        'Light Year (ly)': '9.4607304725808e15',
-    },
-    'Thermodynamics': {
-        'Absolute Zero (°C)': '-273.15',
-        'Avogadro Number (NA)': '6.02214076e23',
-        'Boltzmann Constant (k)': '1.380649e-23',
-        'Gas Constant (R)': '8.314462618',
-        'Triple Point Water (K)': '273.16',
-        'Stefan-Boltzmann (σ)': '5.670374419e-8',
-        'Wien Displacement (b)': '2.897771955e-3',
-    },
-    'Electromagnetism': {
-        'Magnetic Constant (μ₀)': '1.25663706212e-6',
-        'Electric Constant (ε₀)': '8.8541878128e-12',
-        'Coulomb Constant (k)': '8.9875517923e9',
-        'Elementary Charge (e)': '1.602176634e-19',
-        'Electron Volt (eV)': '1.602176634e-19',
-        'Fine Structure (α)': '7.2973525693e-3',
-    },
-    'Nuclear Physics': {
-        'Atomic Mass Unit (u)': '1.66053906660e-27',
-        'Fermi (fm)': '1e-15',
-        'Rydberg Constant (R∞)': '10973731.568160',
-        'Compton Wavelength (λc)': '2.42631023867e-12',
-        'Nuclear Magneton (μN)': '5.050783746e-27',
-        'Bohr Magneton (μB)': '9.2740100783e-24',
-    },
-    'Particle Physics': {
-        'Muon Mass (mμ)': '1.883531627e-28',
-        'Tau Mass (mτ)': '3.16754e-27',
-        'W Boson Mass (mW)': '1.433e-25',
-        'Z Boson Mass (mZ)': '1.625e-25',
-        'Higgs Mass (mH)': '2.235e-25',
-    },
-    'Relativity': {
-        'Schwarzschild Radius': '2GM/c²',
-        'Gravitational Time Dilation': '√(1-2GM/rc²)',
-        'Lorentz Factor (γ)': '1/√(1-v²/c²)',
-        'Minkowski Metric': 'ds² = -c²dt² + dx² + dy² + dz²',
-        'Einstein Field Eq': 'G_μν = 8πG T_μν',
-    }
-}
+# Longest readout before results switch to fewer decimals / scientific
+DISPLAY_WIDTH = 20
+
+# Background calculations: give up after COMPUTE_TIMEOUT seconds, and only
+# show COMPUTING_TEXT if the result has not arrived after COMPUTING_DELAY
+COMPUTE_TIMEOUT = 10
+COMPUTING_DELAY = 0.15
+COMPUTING_TEXT = 'computing…'
+
+# Roots listed under the plot; the rest are dropped from the label
+PLOT_ROOTS_SHOWN = 6
 
-# ============ Unit Categories ============
-UNIT_CATEGORIES = ['Length', 'Mass', 'Time', 'Energy', 'Temperature', 'Area', 'Volume', 'Speed', 'Pressure', 'Force', 'Power']
+# Results the STAT popup can copy to the display (see StatsSession.results)
+STAT_RECALL = ('n', 'x̄', 'sx', 'σx', 'SE', 'min', 'max', 'ȳ', 'sy', 'a', 'b', 'r')
 
-UNIT_CONVERSIONS = {
-    'Length': {
-        'Meter': 1.0,
-        'Kilometer': 1000.0,
-        'Centimeter': 0.01,
-        'Millimeter': 0.001,
-        'Micrometer': 0.000001,
-        'Nanometer': 1e-9,
-        'Inch': 0.0254,
-        'Foot': 0.3048,
-        'Yard': 0.9144,
-        'Mile': 1609.344,
-        'Nautical Mile': 1852.0,
-        'Light Year': 9.461e15,
-        'Astronomical Unit': 1.496e11,
-    },
-    'Mass': {
-        'Kilogram': 1.0,
-        'Gram': 0.001,
-        'Milligram': 0.000001,
-        'Microgram': 1e-9,
-        'Ton': 1000.0,
-        'Pound': 0.45359237,
-        'Ounce': 0.0283495,
-        'Stone': 6.35029,
-        'Solar Mass': 1.98847e30,
-    },
-    'Time': {
-        'Second': 1.0,
-        'Millisecond': 0.001,
-        'Microsecond': 0.000001,
-        'Nanosecond': 1e-9,
-        'Minute': 60.0,
-        'Hour': 3600.0,
-        'Day': 86400.0,
-        'Week': 604800.0,
-        'Year': 31536000.0,
-    },
-    'Energy': {
-        'Joule': 1.0,
-        'Kilojoule': 1000.0,
-        'Calorie': 4.184,
-        'Kilocalorie': 4184.0,
-        'Electron Volt': 1.602176634e-19,
-        'Watt Hour': 3600.0,
-        'BTU': 1055.06,
-        'Erg': 1e-7,
-    },
-    'Temperature': {
-        'Kelvin': 'K',
-        'Celsius': 'C',
-        'Fahrenheit': 'F',
-    },
-    'Area': {
-        'Square Meter': 1.0,
-        'Square Kilometer': 1e6,
-        'Square Centimeter': 0.0001,
-        'Square Millimeter': 1e-6,
-        'Hectare': 10000.0,
-        'Acre': 4046.86,
-    },
-    'Volume': {
-        'Cubic Meter': 1.0,
-        'Liter': 0.001,
-        'Milliliter': 1e-6,
-        'Gallon': 0.00378541,
-        'Quart': 0.000946353,
-    },
-    'Speed': {
-        'Meter/Second': 1.0,
-        'Kilometer/Hour': 0.277778,
-        'Mile/Hour': 0.44704,
-        'Knot': 0.514444,
-        'Speed of Light': 299792458,
-    },
-    'Pressure': {
-        'Pascal': 1.0,
-        'Kilopascal': 1000.0,
-        'Bar': 100000.0,
-        'PSI': 6894.76,
-        'Atmosphere': 101325.0,
-        'Torr': 133.322,
-    },
-    'Force': {
-        'Newton': 1.0,
-        'Kilonewton': 1000.0,
-        'Dyne': 1e-5,
-        'Pound-force': 4.44822,
-    },
-    'Power': {
-        'Watt': 1.0,
-        'Kilowatt': 1000.0,
-        'Megawatt': 1e6,
-        'Horsepower': 745.7,
-    }
+# Plot presets: label -> (function, from, to)
+PLOT_PRESETS = {
+    'sin(x)': ('sin(x)', '−2×π', '2×π'),
+    'Wien λmax(T)': ('b÷T', '100', '6000'),
+    'Lorentz γ(v)': (CONSTANTS_INDEX.get('Lorentz Factor (γ)').expression, '0', '0.999×c'),
 }
 
-class CalculatorButton(Button):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.background_normal = ''
-        self.background_down = ''
-        self.border = (0, 0, 0, 0)
-        self.font_size = dp(18)
-        self.bold = True
-        
-    def on_press(self):
-        anim = Animation(opacity=0.7, duration=0.05)
-        anim.start(self)
-        
-    def on_release(self):
-        anim = Animation(opacity=1, duration=0.05)
-        anim.start(self)
+# Kivy keycodes for the latency overlay and report
+KEY_F11 = 292
+KEY_F12 = 293
 
 class PhysicsCalculatorApp(App):
     def build(self):
         self.title = "Physics Calculator"
         Window.clearcolor = get_color_from_hex('#0a0c12')
         
+        # With PHYSCALC_LATENCY set, handlers are wrapped before anything binds them
+        LATENCY.instrument(self)
+        
         # Calculator state
-        self.first_num = None
-        self.operation = None
-        self.memory = 0
-        self.last_result = 0
+        self.engine = CalculatorEngine(formatter=make_formatter(width=DISPLAY_WIDTH))
+        # RPN engine, created the first time RPN mode is switched on
+        self.rpn = None
+        self.rpn_mode = False
         self.converter_mode = False
+        self.conversion_plan = None
+        self.all_units_popup = None
+        self.history_popup = None
+        self.plot_popup = None
+        self.stats_popup = None
+        # STAT accumulators, created by the first Σ+ or STAT
+        self.stats = None
+        self.stats_job = None
+        # Formula picked in the constants list, applied by the APPLY button
+        self.selected_formula = None
+        
+        # Slow calculations run on a worker, one at a time
+        self.runner = BackgroundRunner(Clock.schedule_once)
+        self.job = None
+        # (handler, args) of input that arrived while the job ran, replayed after it
+        self.queued = collections.deque()
+        self.computing_event = None
+        # Latency series and start time of the running job
+        self.job_name = None
+        self.job_started = 0.0
+        
+        # Persistent history: only the newest entries are read at startup
+        self.history = History(os.path.join(self.user_data_dir, 'history'))
+        self.engine.on_result = self.on_result
+        
+        PROFILER.stop_tracking_imports()
+        PROFILER.start_laps()
         
         # Main layout
         main_layout = BoxLayout(
@@ -226,26 +116,36 @@ class PhysicsCalculatorApp(App):
         )
         
         # ============ DISPLAY ============
-        self.display = TextInput(
+        display_widget = GlyphDisplay(
             text='0',
             font_size=dp(48),
-            halign='right',
-            readonly=True,
-            multiline=False,
             size_hint=(1, 0.14),
             background_color=get_color_from_hex('#0f1a24'),
-            foreground_color=get_color_from_hex('#aaffdd'),
-            cursor_color=get_color_from_hex('#aaffdd'),
-            
-            padding=(dp(15), dp(20))
+            color=get_color_from_hex('#aaffdd'),
+            padding=[dp(15), dp(20)]
         )
-        main_layout.add_widget(self.display)
+        # Handlers write to the model; the widget updates once per frame
+        self.display = DisplayModel(display_widget)
+        main_layout.add_widget(display_widget)
+        
+        # RPN levels above X; takes no space until RPN mode is on
+        self.stack_label = Label(
+            size_hint=(1, 0),
+            color=get_color_from_hex('#88ccaa'),
+            font_size=dp(13),
+            halign='center'
+        )
+        main_layout.add_widget(self.stack_label)
+        
+        PROFILER.lap('build: display')
         
         # ============ CONVERT TOGGLE ============
+        toggle_frame = BoxLayout(size_hint=(1, 0.04), spacing=dp(5))
+        
         self.convert_toggle = ToggleButton(
             text='CONVERT OFF',
             font_size=dp(13),
-            size_hint=(1, 0.04),
+            size_hint=(0.25, 1),
             background_normal='',
             background_color=get_color_from_hex('#4a4a4a'),
             color=get_color_from_hex('#ffffff'),
@@ -253,7 +153,66 @@ class PhysicsCalculatorApp(App):
             state='normal'
         )
         self.convert_toggle.bind(on_press=self.toggle_converter)
-        main_layout.add_widget(self.convert_toggle)
+        toggle_frame.add_widget(self.convert_toggle)
+        
+        history_btn = CalculatorButton(
+            text='HISTORY',
+            font_size=dp(13),
+            size_hint=(0.15, 1),
+            background_color=get_color_from_hex('#4a2a5a'),
+            color=get_color_from_hex('#ffffff'),
+            bold=True
+        )
+        history_btn.bind(on_press=self.show_history)
+        toggle_frame.add_widget(history_btn)
+        
+        plot_btn = CalculatorButton(
+            text='PLOT',
+            font_size=dp(13),
+            size_hint=(0.15, 1),
+            background_color=get_color_from_hex('#2a5a4a'),
+            color=get_color_from_hex('#ffffff'),
+            bold=True
+        )
+        plot_btn.bind(on_press=self.show_plot)
+        toggle_frame.add_widget(plot_btn)
+        
+        self.stat_btn = CalculatorButton(
+            text='STAT',
+            font_size=dp(13),
+            size_hint=(0.15, 1),
+            background_color=get_color_from_hex('#5a4a2a'),
+            color=get_color_from_hex('#ffffff'),
+            bold=True
+        )
+        self.stat_btn.bind(on_press=self.show_stats)
+        toggle_frame.add_widget(self.stat_btn)
+        
+        self.rpn_toggle = CalculatorButton(
+            text='RPN',
+            font_size=dp(13),
+            size_hint=(0.1, 1),
+            background_color=get_color_from_hex('#4a4a4a'),
+            color=get_color_from_hex('#ffffff'),
+            bold=True
+        )
+        self.rpn_toggle.bind(on_press=self.toggle_rpn)
+        toggle_frame.add_widget(self.rpn_toggle)
+        
+        self.cancel_btn = CalculatorButton(
+            text='CANCEL',
+            font_size=dp(13),
+            size_hint=(0.2, 1),
+            background_color=get_color_from_hex('#8a2a2a'),
+            color=get_color_from_hex('#ffffff'),
+            bold=True,
+            disabled=True
+        )
+        self.cancel_btn.bind(on_press=self.cancel_job)
+        toggle_frame.add_widget(self.cancel_btn)
+        main_layout.add_widget(toggle_frame)
+        
+        PROFILER.lap('build: convert toggle')
         
         # ============ PHYSICAL CONSTANTS ============
         constants_label = Label(
@@ -266,14 +225,27 @@ class PhysicsCalculatorApp(App):
         )
         main_layout.add_widget(constants_label)
         
-        # Constants spinners
-        constants_frame = BoxLayout(size_hint=(1, 0.10), spacing=dp(5))
+        # Search across all fields
+        self.constant_search = TextInput(
+            hint_text='Search constants (e.g. planck, mass)',
+            font_size=dp(14),
+            multiline=False,
+            size_hint=(1, 0.04),
+            background_color=get_color_from_hex('#0f1a24'),
+            foreground_color=get_color_from_hex('#ffffff'),
+            cursor_color=get_color_from_hex('#88aaff')
+        )
+        self.constant_search.bind(text=self.on_constant_search)
+        main_layout.add_widget(self.constant_search)
+        
+        # Constant pickers (filterable, only visible rows are built)
+        constants_frame = BoxLayout(size_hint=(1, 0.075), spacing=dp(5))
         
         # Field spinner
-        self.field_spinner = Spinner(
+        self.field_spinner = Picker(
             text='Quantum Mechanics',
-            values=list(PHYSICS_CONSTANTS.keys()),
-            size_hint=(0.5, 1),
+            values=CONSTANTS_INDEX.fields,
+            size_hint=(0.43, 1),
             background_color=get_color_from_hex('#1e3a5a'),
             color=get_color_from_hex('#ffffff'),
             font_size=dp(14),
@@ -283,10 +255,10 @@ class PhysicsCalculatorApp(App):
         self.field_spinner.bind(text=self.on_field_change)
         
         # Constant spinner
-        self.constant_spinner = Spinner(
+        self.constant_spinner = Picker(
             text='Planck Constant (h)',
             values=self.get_constant_list('Quantum Mechanics'),
-            size_hint=(0.5, 1),
+            size_hint=(0.43, 1),
             background_color=get_color_from_hex('#2a4a6a'),
             color=get_color_from_hex('#ffffff'),
             font_size=dp(13),
@@ -295,87 +267,46 @@ class PhysicsCalculatorApp(App):
         )
         self.constant_spinner.bind(text=self.on_constant_change)
         
+        # Applies the selected formula to the value shown; picking one only loads it
+        self.apply_btn = CalculatorButton(
+            text='APPLY',
+            font_size=dp(13),
+            size_hint=(0.14, 1),
+            background_color=get_color_from_hex('#4a8a6a'),
+            color=get_color_from_hex('#ffffff'),
+            bold=True,
+            disabled=True
+        )
+        self.apply_btn.bind(on_press=self.on_formula_apply)
+        
         constants_frame.add_widget(self.field_spinner)
         constants_frame.add_widget(self.constant_spinner)
+        constants_frame.add_widget(self.apply_btn)
         main_layout.add_widget(constants_frame)
         
-        # ============ UNIT CONVERTER ============
-        self.converter_layout = BoxLayout(orientation='vertical', size_hint=(1, 0.18))
-        self.converter_layout.opacity = 0
-        self.converter_layout.disabled = True
-        
-        converter_label = Label(
-            text='UNIT CONVERTER',
-            size_hint=(1, 0.08),
-            color=get_color_from_hex('#aaffaa'),
-            font_size=dp(14),
-            bold=True,
-            halign='center'
-        )
-        self.converter_layout.add_widget(converter_label)
-        
-        # Category spinner
-        self.unit_category_spinner = Spinner(
-            text='Length',
-            values=UNIT_CATEGORIES,
-            size_hint=(1, 0.16),
-            background_color=get_color_from_hex('#2a5a4a'),
-            color=get_color_from_hex('#ffffff'),
+        # Uncertainty and unit of the selected CODATA constant, or the selected formula
+        self.constant_info = Label(
+            size_hint=(1, 0.025),
+            color=get_color_from_hex('#88aaff'),
             font_size=dp(12),
-            height=dp(35)
-        )
-        self.unit_category_spinner.bind(text=self.on_unit_category_change)
-        self.converter_layout.add_widget(self.unit_category_spinner)
-        
-        # From and To units frame
-        units_frame = BoxLayout(size_hint=(1, 0.30), spacing=dp(10))
-        
-        initial_units = self.get_unit_list('Length')
-        
-        # From spinner
-        self.from_unit_spinner = Spinner(
-            text='Meter',
-            values=initial_units,
-            size_hint=(0.5, 1),
-            background_color=get_color_from_hex('#3a6a5a'),
-            color=get_color_from_hex('#ffffff'),
-            font_size=dp(14),
-            height=dp(40),
-            bold=True
+            halign='center'
         )
-        self.from_unit_spinner.bind(text=self.on_conversion_change)
+        main_layout.add_widget(self.constant_info)
         
-        # To spinner
-        self.to_unit_spinner = Spinner(
-            text='Kilometer',
-            values=initial_units,
-            size_hint=(0.5, 1),
-            background_color=get_color_from_hex('#3a6a5a'),
-            color=get_color_from_hex('#ffffff'),
-            font_size=dp(14),
-            height=dp(40),
-            bold=True
-        )
-        self.to_unit_spinner.bind(text=self.on_conversion_change)
+        PROFILER.lap('build: constants')
         
-        units_frame.add_widget(self.from_unit_spinner)
-        units_frame.add_widget(self.to_unit_spinner)
-        self.converter_layout.add_widget(units_frame)
+        # ============ UNIT CONVERTER ============
+        self.converter_layout = BoxLayout(orientation='vertical', size_hint=(1, 0.18))
+        self.converter_layout.opacity = 0
+        self.converter_layout.disabled = True
         
-        # Convert Now Button
-        convert_btn = CalculatorButton(
-            text='CONVERT',
-            font_size=dp(13),
-            size_hint=(1, 0.14),
-            background_color=get_color_from_hex('#4a8a6a'),
-            color=get_color_from_hex('#ffffff'),
-            bold=True
-        )
-        convert_btn.bind(on_press=self.convert_value)
-        self.converter_layout.add_widget(convert_btn)
+        # Built on first use by build_converter()
+        self.converter_built = False
         
         main_layout.add_widget(self.converter_layout)
         
+        PROFILER.lap('build: converter placeholder')
+        
         # ============ SCIENTIFIC FUNCTIONS ============
         sci_label = Label(
             text='SCIENTIFIC FUNCTIONS',
@@ -388,12 +319,13 @@ class PhysicsCalculatorApp(App):
         main_layout.add_widget(sci_label)
         
         # Scientific buttons grid
-        sci_grid = GridLayout(cols=6, spacing=dp(1), size_hint=(1, 0.11))
+        sci_grid = GridLayout(cols=6, spacing=dp(1), size_hint=(1, 0.14))
         
         sci_buttons = [
             'sin', 'cos', 'tan', 'log', 'ln', '10^x',
             'x²', 'x³', 'x^y', '√', '∛', 'e^x',
             'π', 'e', 'n!', '1/x', '|x|', 'mod',
+            'DEG', 'hyp', 'sin⁻¹', 'cos⁻¹', 'tan⁻¹', 'Σ+',
         ]
         
         for func in sci_buttons:
@@ -403,13 +335,21 @@ class PhysicsCalculatorApp(App):
                 background_color=get_color_from_hex('#2a4a6a'),
                 color=get_color_from_hex('#ffffff')
             )
-            btn.bind(on_press=self.on_scientific)
+            btn.bind(on_press=self.on_stat_push if func == 'Σ+' else self.on_scientific)
             sci_grid.add_widget(btn)
+            if func == 'DEG':
+                self.angle_mode_btn = btn
+            elif func == 'hyp':
+                self.hyp_btn = btn
         
         main_layout.add_widget(sci_grid)
         
+        PROFILER.lap('build: scientific')
+        
         # ============ KEYPAD ============
         keypad = GridLayout(cols=5, spacing=dp(2), size_hint=(1, 0.25))
+        # Label -> button, for the keys RPN mode renames
+        self.keypad_buttons = {}
         
         keypad_buttons = [
             'C', '⌫', '÷', '×', '−',
@@ -450,9 +390,12 @@ class PhysicsCalculatorApp(App):
             )
             btn.bind(on_press=self.on_button_press)
             keypad.add_widget(btn)
+            self.keypad_buttons[btn_text] = btn
         
         main_layout.add_widget(keypad)
         
+        PROFILER.lap('build: keypad')
+        
         # ============ MEMORY BUTTONS ============
         memory_label = Label(
             text='MEMORY FUNCTIONS',
@@ -477,10 +420,147 @@ class PhysicsCalculatorApp(App):
             memory_layout.add_widget(btn)
         main_layout.add_widget(memory_layout)
         
+        PROFILER.lap('build: memory')
+        
+        Logger.info('Startup: build() done %.1f ms after launch', PROFILER.elapsed_ms())
+        Window.bind(on_flip=self.on_first_frame)
+        
         return main_layout
     
+    def on_start(self):
+        if LATENCY.enabled:
+            self.start_latency_overlay()
+    
+    def on_stop(self):
+        self.runner.shutdown()
+        self.history.close()
+        path = LATENCY.write()
+        if path:
+            Logger.info('Latency: report written to %s', path)
+    
+    def start_latency_overlay(self):
+        """Record frame times and add the (hidden) overlay above the app"""
+        Clock.schedule_interval(LATENCY.frame, 0)
+        self.latency_overlay = PerfOverlay(LATENCY)
+        Window.add_widget(self.latency_overlay)
+        Window.bind(on_key_down=self.on_latency_key)
+    
+    def on_latency_key(self, window, key, scancode, codepoint, modifiers):
+        """F12 toggles the latency overlay, F11 writes the report"""
+        if key == KEY_F12:
+            self.latency_overlay.toggle()
+            return True
+        if key == KEY_F11:
+            Logger.info('Latency: report written to %s', LATENCY.write())
+            return True
+        return False
+    
+    def on_first_frame(self, window):
+        """Report time to first frame once, then stop listening"""
+        window.unbind(on_flip=self.on_first_frame)
+        self.first_frame_ms = PROFILER.elapsed_ms()
+        Logger.info('Startup: first frame %.1f ms after launch', self.first_frame_ms)
+        
+        PROFILER.mark('first_frame')
+        path = PROFILER.write()
+        if path:
+            Logger.info('Startup: profile written to %s', path)
+            if PROFILER.exit_when_done:
+                Clock.schedule_once(lambda dt: self.stop())
+    
+    def build_converter(self):
+        """Create the unit converter widgets (deferred until first opened)"""
+        converter_label = Label(
+            text='UNIT CONVERTER',
+            size_hint=(1, 0.08),
+            color=get_color_from_hex('#aaffaa'),
+            font_size=dp(14),
+            bold=True,
+            halign='center'
+        )
+        self.converter_layout.add_widget(converter_label)
+        
+        # Category spinner
+        self.unit_category_spinner = Picker(
+            text='Length',
+            values=UNIT_CATEGORIES,
+            size_hint=(1, 0.16),
+            background_color=get_color_from_hex('#2a5a4a'),
+            color=get_color_from_hex('#ffffff'),
+            font_size=dp(12),
+            height=dp(35)
+        )
+        self.unit_category_spinner.bind(text=self.on_unit_category_change)
+        self.converter_layout.add_widget(self.unit_category_spinner)
+        
+        # From and To units frame
+        units_frame = BoxLayout(size_hint=(1, 0.30), spacing=dp(10))
+        
+        initial_units = self.get_unit_list('Length')
+        
+        # From spinner
+        self.from_unit_spinner = Picker(
+            text='Meter',
+            values=initial_units,
+            size_hint=(0.5, 1),
+            background_color=get_color_from_hex('#3a6a5a'),
+            color=get_color_from_hex('#ffffff'),
+            font_size=dp(14),
+            height=dp(40),
+            bold=True
+        )
+        self.from_unit_spinner.bind(text=self.on_conversion_change)
+        
+        # To spinner
+        self.to_unit_spinner = Picker(
+            text='Kilometer',
+            values=initial_units,
+            size_hint=(0.5, 1),
+            background_color=get_color_from_hex('#3a6a5a'),
+            color=get_color_from_hex('#ffffff'),
+            font_size=dp(14),
+            height=dp(40),
+            bold=True
+        )
+        self.to_unit_spinner.bind(text=self.on_conversion_change)
+        
+        units_frame.add_widget(self.from_unit_spinner)
+        units_frame.add_widget(self.to_unit_spinner)
+        self.converter_layout.add_widget(units_frame)
+        
+        # Convert Now / All Units Buttons
+        convert_frame = BoxLayout(size_hint=(1, 0.14), spacing=dp(10))
+        
+        convert_btn = CalculatorButton(
+            text='CONVERT',
+            font_size=dp(13),
+            size_hint=(0.5, 1),
+            background_color=get_color_from_hex('#4a8a6a'),
+            color=get_color_from_hex('#ffffff'),
+            bold=True
+        )
+        convert_btn.bind(on_press=self.convert_value)
+        
+        all_units_btn = CalculatorButton(
+            text='ALL UNITS',
+            font_size=dp(13),
+            size_hint=(0.5, 1),
+            background_color=get_color_from_hex('#3a6a5a'),
+            color=get_color_from_hex('#ffffff'),
+            bold=True
+        )
+        all_units_btn.bind(on_press=self.show_all_units)
+        
+        convert_frame.add_widget(convert_btn)
+        convert_frame.add_widget(all_units_btn)
+        self.converter_layout.add_widget(convert_frame)
+        self.on_conversion_change(None, None)
+        self.converter_built = True
+    
     def toggle_converter(self, instance):
         """Toggle unit converter on/off"""
+        if not self.converter_built:
+            self.build_converter()
         if self.converter_mode:
             self.converter_mode = False
             self.convert_toggle.text = 'CONVERT OFF'
@@ -511,294 +591,670 @@ class PhysicsCalculatorApp(App):
                 self.to_unit_spinner.text = units[1]
             else:
                 self.to_unit_spinner.text = units[0]
+        self.on_conversion_change(spinner, text)
     
     def on_conversion_change(self, spinner, text):
-        """When unit changes"""
-        pass
+        """When unit changes - look up the conversion plan once"""
+        try:
+            table = conversion_table(self.unit_category_spinner.text)
+            self.conversion_plan = (
+                table,
+                table.index[self.from_unit_spinner.text],
+                table.index[self.to_unit_spinner.text],
+            )
+        except KeyError:
+            # Mid category switch: the other spinner still holds an old unit
+            self.conversion_plan = None
     
     def convert_value(self, instance=None):
         """Convert the displayed value"""
-        if not self.converter_mode:
+        if not self.converter_mode or self.when_idle(self.convert_value, instance):
             return
         
         try:
             if self.display.text in ['Error', '']:
                 return
             
-            value = float(self.display.text)
-            category = self.unit_category_spinner.text
-            from_unit = self.from_unit_spinner.text
-            to_unit = self.to_unit_spinner.text
+            if self.conversion_plan is None:
+                return
+            
+            value = self.calculator().current_value()
+            table, from_index, to_index = self.conversion_plan
+            result = table.convert(value, from_index, to_index)
+            self.show(self.calculator().set_value(result))
             
-            if category and from_unit and to_unit and category in UNIT_CONVERSIONS:
-                if category == 'Temperature':
-                    result = self.convert_temperature(value, from_unit, to_unit)
-                else:
-                    base_value = value * UNIT_CONVERSIONS[category][from_unit]
-                    result = base_value / UNIT_CONVERSIONS[category][to_unit]
-                
-                self.display.text = self.format_number(result)
-                
         except Exception as e:
             print(f"Conversion error: {e}")
     
-    def convert_temperature(self, value, from_unit, to_unit):
-        """Convert temperature"""
-        if from_unit == 'Kelvin':
-            celsius = value - 273.15
-        elif from_unit == 'Celsius':
-            celsius = value
-        elif from_unit == 'Fahrenheit':
-            celsius = (value - 32) * 5/9
+    def show_all_units(self, instance=None):
+        """Show the displayed value in every unit of the category"""
+        if not self.converter_mode or self.conversion_plan is None:
+            return
+        
+        try:
+            value = self.calculator().current_value()
+        except (ArithmeticError, ValueError):
+            return
+        
+        table, from_index, to_index = self.conversion_plan
+        values = table.convert_all(value, from_index)
+        
+        if self.all_units_popup is None:
+            # Imported on first use to keep them off the startup path
+            from kivy.uix.popup import Popup
+            from kivy.uix.scrollview import ScrollView
+            
+            self.all_units_label = Label(
+                size_hint_y=None,
+                color=get_color_from_hex('#aaffdd'),
+                font_size=dp(16),
+                halign='left',
+                valign='top'
+            )
+            self.all_units_label.bind(
+                width=lambda label, width: setattr(label, 'text_size', (width, None)),
+                texture_size=lambda label, size: setattr(label, 'height', size[1])
+            )
+            scroll = ScrollView()
+            scroll.add_widget(self.all_units_label)
+            self.all_units_popup = Popup(
+                content=scroll,
+                size_hint=(0.9, 0.7),
+                separator_color=get_color_from_hex('#4a8a6a')
+            )
+        
+        self.all_units_popup.title = f"{self.format_number(value)} {table.units[from_index]}"
+        self.all_units_label.text = '\n'.join(
+            f"{self.format_number(converted)}  {unit}"
+            for unit, converted in zip(table.units, values)
+        )
+        self.all_units_popup.open()
+    
+    def on_result(self, expression, display):
+        """Engine callback: record every successful calculation"""
+        self.history.append(expression, display)
+    
+    def show_history(self, instance=None):
+        """Open the history list (recent entries, or search results)"""
+        if self.history_popup is None:
+            from kivy.uix.popup import Popup
+            from kivy.uix.scrollview import ScrollView
+            
+            content = BoxLayout(orientation='vertical', spacing=dp(5))
+            self.history_search = TextInput(
+                hint_text='Search history',
+                font_size=dp(14),
+                multiline=False,
+                size_hint=(1, None),
+                height=dp(40),
+                background_color=get_color_from_hex('#0f1a24'),
+                foreground_color=get_color_from_hex('#ffffff'),
+                cursor_color=get_color_from_hex('#cc99ff')
+            )
+            self.history_search.bind(text=self.on_history_search)
+            content.add_widget(self.history_search)
+            
+            self.history_list = GridLayout(cols=1, spacing=dp(2), size_hint_y=None)
+            self.history_list.bind(minimum_height=self.history_list.setter('height'))
+            scroll = ScrollView()
+            scroll.add_widget(self.history_list)
+            content.add_widget(scroll)
+            
+            self.history_popup = Popup(
+                title='HISTORY',
+                content=content,
+                size_hint=(0.95, 0.8),
+                separator_color=get_color_from_hex('#cc99ff')
+            )
+        
+        self.on_history_search(self.history_search, self.history_search.text)
+        self.history_popup.open()
+    
+    def on_history_search(self, instance, text):
+        """Refill the history list for the search text"""
+        entries = self.history.search(text) if text else self.history.recent()
+        self.history_list.clear_widgets()
+        for entry in entries:
+            row = BoxLayout(size_hint_y=None, height=dp(44), spacing=dp(2))
+            expression_btn = CalculatorButton(
+                text=entry.expression,
+                size_hint=(0.65, 1),
+                shorten=True,
+                background_color=get_color_from_hex('#2a3a4a'),
+                color=get_color_from_hex('#ffffff')
+            )
+            expression_btn.bind(on_press=lambda btn, e=entry: self.reuse_history(e.expression, None))
+            result_btn = CalculatorButton(
+                text=entry.result,
+                size_hint=(0.35, 1),
+                shorten=True,
+                background_color=get_color_from_hex('#4a2a5a'),
+                color=get_color_from_hex('#aaffdd')
+            )
+            result_btn.bind(on_press=lambda btn, e=entry: self.reuse_history(e.result, e.result))
+            row.add_widget(expression_btn)
+            row.add_widget(result_btn)
+            self.history_list.add_widget(row)
+    
+    def reuse_history(self, text, result):
+        """Put a history expression or result back into the calculator"""
+        try:
+            value = float(result) if result is not None else None
+        except ValueError:
+            value = None
+        self.show(self.calculator().load(text, value))
+        self.history_popup.dismiss()
+    
+    def show_plot(self, instance=None):
+        """Open the plot view (built on first use)"""
+        if self.plot_popup is None:
+            from kivy.uix.popup import Popup
+            
+            content = BoxLayout(orientation='vertical', spacing=dp(5))
+            inputs = BoxLayout(size_hint=(1, None), height=dp(40), spacing=dp(5))
+            self.plot_function_input = self.plot_input('f(x), e.g. sin(x), b÷T', 0.4)
+            self.plot_from_input = self.plot_input('from', 0.15)
+            self.plot_to_input = self.plot_input('to', 0.15)
+            for widget in (self.plot_function_input, self.plot_from_input, self.plot_to_input):
+                inputs.add_widget(widget)
+            for text, callback in (('PLOT', self.on_plot), ('ROOTS', self.on_solve), ('∫', self.on_solve)):
+                action_btn = CalculatorButton(
+                    text=text,
+                    font_size=dp(14),
+                    size_hint=(0.1, 1),
+                    background_color=get_color_from_hex('#2a5a4a'),
+                    color=get_color_from_hex('#ffffff')
+                )
+                action_btn.bind(on_press=callback)
+                inputs.add_widget(action_btn)
+            content.add_widget(inputs)
+            
+            presets = BoxLayout(size_hint=(1, None), height=dp(36), spacing=dp(5))
+            for label in PLOT_PRESETS:
+                preset_btn = CalculatorButton(
+                    text=label,
+                    font_size=dp(13),
+                    background_color=get_color_from_hex('#2a4a6a'),
+                    color=get_color_from_hex('#ffffff')
+                )
+                preset_btn.bind(on_press=self.on_plot_preset)
+                presets.add_widget(preset_btn)
+            content.add_widget(presets)
+            
+            self.plot_view = PlotView()
+            self.plot_range_label = Label(
+                size_hint=(1, None),
+                height=dp(24),
+                font_size=dp(12),
+                color=get_color_from_hex('#aaddff')
+            )
+            self.plot_view.bind(range_text=self.plot_range_label.setter('text'))
+            content.add_widget(self.plot_range_label)
+            content.add_widget(self.plot_view)
+            
+            self.plot_popup = Popup(
+                title='PLOT',
+                content=content,
+                size_hint=(0.95, 0.8),
+                separator_color=get_color_from_hex('#aaffdd')
+            )
+            self.on_plot_preset(None, next(iter(PLOT_PRESETS)))
+        
+        self.plot_popup.open()
+    
+    def plot_input(self, hint, width):
+        return TextInput(
+            hint_text=hint,
+            font_size=dp(14),
+            multiline=False,
+            size_hint=(width, 1),
+            background_color=get_color_from_hex('#0f1a24'),
+            foreground_color=get_color_from_hex('#ffffff'),
+            cursor_color=get_color_from_hex('#aaffdd')
+        )
+    
+    def on_plot_preset(self, instance, label=None):
+        """Fill the plot inputs from a preset and draw it"""
+        text, start, end = PLOT_PRESETS[label or instance.text]
+        self.plot_function_input.text = text
+        self.plot_from_input.text = start
+        self.plot_to_input.text = end
+        self.on_plot()
+    
+    def on_plot(self, instance=None):
+        """Compile the function and range from the inputs and draw it"""
+        from plotting import PlotFunction, PlotSampler, evaluate_bound
+        try:
+            function = PlotFunction(self.plot_function_input.text)
+            start = evaluate_bound(self.plot_from_input.text)
+            end = evaluate_bound(self.plot_to_input.text)
+            if not end > start:
+                raise ValueError('the range must run from low to high')
+        except (ArithmeticError, ValueError) as e:
+            self.plot_range_label.text = f"Error: {e}"
+            return
+        self.plot_view.plot(PlotSampler(function), start, end)
+    
+    def on_solve(self, instance):
+        """Roots or integral of the plotted function over the visible range.
+        
+        The first root or the integral also becomes the calculator entry.
+        """
+        import solver
+        view = self.plot_view
+        if view.sampler is None:
+            return
+        function = view.sampler.function
+        try:
+            if instance.text == 'ROOTS':
+                roots = solver.find_roots(function, view.x_min, view.x_max)
+                if not roots:
+                    self.plot_range_label.text = 'No roots in view'
+                    return
+                self.plot_range_label.text = 'Roots: ' + ', '.join(
+                    format_number(root.root) for root in roots[:PLOT_ROOTS_SHOWN])
+                value = roots[0].root
+            else:
+                result = solver.integrate(function, view.x_min, view.x_max)
+                self.plot_range_label.text = (
+                    f"∫ = {format_number(result.value)}  ± {result.error:.1e}"
+                    + ('' if result.converged else '  (not converged)'))
+                value = result.value
+        except (ArithmeticError, ValueError) as e:
+            self.plot_range_label.text = f"Error: {e}"
+            return
+        self.set_value(value)
+    
+    # ============ Statistics ============
+    def stats_session(self):
+        """The STAT accumulators; stats.py may import NumPy, so not at startup"""
+        if self.stats is None:
+            from stats import StatsSession
+            self.stats = StatsSession()
+        return self.stats
+    
+    def on_stat_push(self, instance):
+        """Σ+: add the entry to the statistics and clear it for the next value"""
+        if self.when_idle(self.on_stat_push, instance):
+            return
+        calculator = self.calculator()
+        try:
+            value = calculator.current_value()
+        except (ArithmeticError, ValueError):
+            self.show(calculator.load(ERROR, None))
+            return
+        self.stats_session().enter(value)
+        self.show(self.rpn.clear_x() if self.rpn_mode else self.engine.load('0', 0.0))
+        self.update_stats()
+    
+    def update_stats(self):
+        """Show the running results; reads the accumulators, never the data"""
+        stats = self.stats_session()
+        if stats.pending_x is not None:
+            self.stat_btn.text = f"Σ{stats.count} y?"
         else:
-            celsius = value
-        
-        if to_unit == 'Kelvin':
-            return celsius + 273.15
-        elif to_unit == 'Celsius':
-            return celsius
-        elif to_unit == 'Fahrenheit':
-            return celsius * 9/5 + 32
+            self.stat_btn.text = f"Σ{stats.count}" if stats.count else 'STAT'
+        if self.stats_popup is not None:
+            lines = []
+            for label, value in stats.results().items():
+                text = '—' if value is None else format_number(value)
+                lines.append(f"{label:<4} {text}")
+            self.stats_summary.text = '\n'.join(lines)
+    
+    def show_stats(self, instance=None):
+        """Open the statistics summary and dataset entry (built on first use)"""
+        if self.stats_popup is None:
+            from kivy.uix.popup import Popup
+            
+            content = BoxLayout(orientation='vertical', spacing=dp(5))
+            self.stats_summary = Label(
+                font_name='RobotoMono-Regular',
+                font_size=dp(14),
+                halign='left',
+                valign='top',
+                size_hint=(1, 0.35),
+                color=get_color_from_hex('#aaffdd')
+            )
+            self.stats_summary.bind(size=self.stats_summary.setter('text_size'))
+            content.add_widget(self.stats_summary)
+            
+            # Recall keys copy a result to the display
+            recall = GridLayout(cols=6, spacing=dp(2), size_hint=(1, 0.14))
+            for label in STAT_RECALL:
+                recall_btn = CalculatorButton(
+                    text=label,
+                    font_size=dp(14),
+                    background_color=get_color_from_hex('#5a4a2a'),
+                    color=get_color_from_hex('#ffffff')
+                )
+                recall_btn.bind(on_press=self.on_stat_recall)
+                recall.add_widget(recall_btn)
+            content.add_widget(recall)
+            
+            controls = BoxLayout(size_hint=(1, 0.08), spacing=dp(5))
+            self.stats_pairs_toggle = pairs_toggle = ToggleButton(
+                text='PAIRS (x, y)',
+                font_size=dp(13),
+                background_normal='',
+                background_color=get_color_from_hex('#4a4a4a'),
+                color=get_color_from_hex('#ffffff'),
+                state='down' if self.stats_session().pairs else 'normal'
+            )
+            pairs_toggle.bind(on_press=self.on_stat_pairs)
+            clear_btn = CalculatorButton(
+                text='CLEAR Σ',
+                font_size=dp(13),
+                background_color=get_color_from_hex('#8a2a2a'),
+                color=get_color_from_hex('#ffffff')
+            )
+            clear_btn.bind(on_press=self.on_stat_clear)
+            controls.add_widget(pairs_toggle)
+            controls.add_widget(clear_btn)
+            content.add_widget(controls)
+            
+            self.stats_input = TextInput(
+                hint_text='Paste values, or x, y pairs one per line, or a file path',
+                font_size=dp(13),
+                size_hint=(1, 0.3),
+                background_color=get_color_from_hex('#0f1a24'),
+                foreground_color=get_color_from_hex('#ffffff'),
+                cursor_color=get_color_from_hex('#ffcc88')
+            )
+            content.add_widget(self.stats_input)
+            
+            data_row = BoxLayout(size_hint=(1, 0.08), spacing=dp(5))
+            self.stats_status = Label(
+                size_hint=(0.7, 1),
+                font_size=dp(12),
+                color=get_color_from_hex('#aaddff')
+            )
+            add_btn = CalculatorButton(
+                text='ADD DATA',
+                font_size=dp(14),
+                size_hint=(0.3, 1),
+                background_color=get_color_from_hex('#2a5a4a'),
+                color=get_color_from_hex('#ffffff')
+            )
+            add_btn.bind(on_press=self.on_stat_data)
+            data_row.add_widget(self.stats_status)
+            data_row.add_widget(add_btn)
+            content.add_widget(data_row)
+            
+            self.stats_popup = Popup(
+                title='STATISTICS',
+                content=content,
+                size_hint=(0.95, 0.85),
+                separator_color=get_color_from_hex('#ffcc88')
+            )
+        
+        self.update_stats()
+        self.stats_popup.open()
+    
+    def on_stat_recall(self, instance):
+        """Copy one result to the display"""
+        value = self.stats_session().results().get(instance.text)
+        if value is None:
+            return
+        self.set_value(value)
+        self.stats_popup.dismiss()
+    
+    def on_stat_pairs(self, instance):
+        self.stats_session().set_pairs(instance.state == 'down')
+        self.update_stats()
+    
+    def on_stat_clear(self, instance):
+        self.stats_session().clear()
+        self.stats_status.text = ''
+        self.update_stats()
+    
+    def on_stat_data(self, instance):
+        """Parse and reduce the pasted dataset (or file) on a worker, then merge it"""
+        import stats
+        text = self.stats_input.text
+        if self.stats_job is not None or not text.strip():
+            return
+        path = text.strip()
+        if '\n' not in path and os.path.isfile(path):
+            work = functools.partial(stats.load_dataset, path)
         else:
-            return celsius
+            work = functools.partial(stats.dataset_moments, text)
+        self.stats_status.text = COMPUTING_TEXT
+        self.stats_job = self.runner.submit(
+            work,
+            on_done=self.on_stat_dataset,
+            on_error=self.on_stat_data_error,
+            timeout=COMPUTE_TIMEOUT,
+            on_timeout=lambda: self.on_stat_data_error(TimeoutError('took too long'))
+        )
+    
+    def on_stat_dataset(self, dataset):
+        """Merge a reduced dataset: O(1) however many points it had"""
+        self.stats_job = None
+        session = self.stats_session()
+        try:
+            session.merge(dataset)
+        except ValueError as e:
+            self.on_stat_data_error(e)
+            return
+        self.stats_pairs_toggle.state = 'down' if session.pairs else 'normal'
+        self.stats_input.text = ''
+        kind = 'values' if dataset.fit is None else 'pairs'
+        self.stats_status.text = f"Added {dataset.x.count:,} {kind}"
+        self.update_stats()
+    
+    def on_stat_data_error(self, error):
+        self.stats_job = None
+        self.stats_status.text = f"Error: {error}"
+    
+    def convert_temperature(self, value, from_unit, to_unit):
+        """Convert temperature"""
+        return convert_temperature(value, from_unit, to_unit)
     
     def get_constant_list(self, field):
         """Format constants list - عرض الأسماء الكاملة"""
-        if field in PHYSICS_CONSTANTS:
-            constants = PHYSICS_CONSTANTS[field]
-            formatted_list = []
-            for name, value in constants.items():
-                formatted_list.append(f"{name}")
-            return formatted_list
-        return []
+        return CONSTANTS_INDEX.field_names.get(field, [])
     
     def on_field_change(self, spinner, text):
         """When physics field changes"""
         constants = self.get_constant_list(text)
         self.constant_spinner.values = constants
         if constants:
-            self.constant_spinner.text = constants[0]
-            if text in PHYSICS_CONSTANTS and constants[0]:
-                for full_name, value in PHYSICS_CONSTANTS[text].items():
-                    if full_name == constants[0]:
-                        self.display.text = value
-                        break
+            if self.constant_spinner.text == constants[0]:
+                self.on_constant_change(self.constant_spinner, constants[0])
+            else:
+                # on_constant_change updates the display
+                self.constant_spinner.text = constants[0]
     
     def on_constant_change(self, spinner, text):
-        """When constant is selected"""
-        try:
-            if text:
-                field = self.field_spinner.text
-                if field in PHYSICS_CONSTANTS:
-                    for full_name, value in PHYSICS_CONSTANTS[field].items():
-                        if full_name == text:
-                            self.display.text = value
-                            break
-        except:
-            pass
+        """When constant is selected: constants are loaded, formulas wait for APPLY"""
+        entry = CONSTANTS_INDEX.get(text)
+        if entry is None:
+            return
+        self.constant_info.text = self.constant_detail(entry)
+        self.selected_formula = entry if entry.is_formula and entry.computable else None
+        self.apply_btn.disabled = self.selected_formula is None
+        if self.selected_formula is None and not self.when_idle(self.load_constant, entry):
+            self.load_constant(entry)
+    
+    def load_constant(self, entry):
+        """Show a constant's value on the display"""
+        self.show(self.calculator().load(entry.text, entry.value))
+    
+    def on_formula_apply(self, instance):
+        """Apply the selected formula to the value shown, like a function key"""
+        if self.selected_formula is not None and not self.when_idle(self.on_formula_apply, instance):
+            self.show(self.calculator().formula(self.selected_formula))
+    
+    def on_constant_search(self, instance, text):
+        """Filter the constant list by name across all fields"""
+        if not text.strip():
+            self.constant_spinner.values = self.get_constant_list(self.field_spinner.text)
+            return
+        matches = CONSTANTS_INDEX.search_names(text)
+        self.constant_spinner.values = matches
+        self.constant_spinner.text = f"{len(matches)} matches" if len(matches) != 1 else matches[0]
+    
+    def constant_detail(self, entry):
+        """'± uncertainty unit' (or 'exact') for CODATA entries, what a formula takes, '' otherwise"""
+        if entry.is_formula:
+            if not entry.computable:
+                return ''
+            first, *rest = entry.variables
+            then = f", then {', '.join(rest)} and =" if rest else ''
+            return f"{entry.text}   APPLY takes {first} from the display{then}"
+        uncertainty = getattr(entry, 'uncertainty', None)
+        if uncertainty is None:
+            return ''
+        accuracy = 'exact' if uncertainty == 0 else f"± {uncertainty:.2g}"
+        return f"{accuracy}  {entry.unit}".strip()
     
     def on_scientific(self, instance):
         """Scientific functions"""
         func = instance.text
+        if self.when_idle(self.on_scientific, instance):
+            return
+        if self.rpn_mode:
+            # Stack operations are O(1); no need for a worker
+            self.show(self.rpn.scientific(func))
+        elif self.engine.is_slow(func):
+            self.run_engine(CalculatorEngine.scientific, func)
+        else:
+            self.display.text = self.engine.scientific(func)
+        self.update_mode_buttons()
+    
+    def update_mode_buttons(self):
+        state = self.engine.state
+        self.angle_mode_btn.text = state.angle_mode
+        self.hyp_btn.background_color = get_color_from_hex('#4a8a6a' if state.hyperbolic else '#2a4a6a')
+    
+    # ============ RPN ============
+    def calculator(self):
+        """The engine keys go to: the RPN stack in RPN mode, else the algebraic engine"""
+        return self.rpn if self.rpn_mode else self.engine
+    
+    def show(self, text):
+        """Display engine output, with the stack levels above X in RPN mode"""
+        self.display.text = text
+        if self.rpn_mode:
+            self.stack_label.text = self.rpn.stack_text()
+    
+    def toggle_rpn(self, instance):
+        """Switch between algebraic entry and RPN.
+        
+        The value shown goes back to algebraic mode, and into RPN when the stack is empty.
+        """
+        if self.when_idle(self.toggle_rpn, instance):
+            return
+        from rpn import KEY_LABELS, RPNEngine
+        if self.rpn is None:
+            self.rpn = RPNEngine(self.engine)
         try:
-            if self.display.text in ['Error', '']:
-                self.display.text = '0'
-            
-            value = float(self.display.text)
-            
-            if func == 'sin':
-                result = math.sin(math.radians(value))
-            elif func == 'cos':
-                result = math.cos(math.radians(value))
-            elif func == 'tan':
-                result = math.tan(math.radians(value))
-            elif func == 'log':
-                result = math.log10(value) if value > 0 else 'Error'
-            elif func == 'ln':
-                result = math.log(value) if value > 0 else 'Error'
-            elif func == '10^x':
-                result = 10 ** value
-            elif func == 'x²':
-                result = value ** 2
-            elif func == 'x³':
-                result = value ** 3
-            elif func == 'x^y':
-                self.first_num = value
-                self.operation = '^'
-                self.display.text = '0'
-                return
-            elif func == '√':
-                result = math.sqrt(value) if value >= 0 else 'Error'
-            elif func == '∛':
-                result = value ** (1/3) if value >= 0 else -((-value) ** (1/3))
-            elif func == 'e^x':
-                result = math.exp(value)
-            elif func == 'π':
-                result = math.pi
-            elif func == 'e':
-                result = math.e
-            elif func == 'n!':
-                if value >= 0 and value == int(value) and value <= 170:
-                    result = math.factorial(int(value))
-                else:
-                    result = 'Error'
-            elif func == '1/x':
-                result = 1 / value if value != 0 else 'Error'
-            elif func == '|x|':
-                result = abs(value)
-            elif func == 'mod':
-                self.first_num = value
-                self.operation = 'mod'
-                self.display.text = '0'
-                return
-            
-            if result == 'Error':
-                self.display.text = 'Error'
-            else:
-                self.display.text = self.format_number(result)
-                self.last_result = result
-                
-        except:
-            self.display.text = 'Error'
+            value = self.calculator().current_value()
+        except (ArithmeticError, ValueError):
+            value = None
+        self.rpn_mode = not self.rpn_mode
+        for key, label in KEY_LABELS.items():
+            self.keypad_buttons[key].text = label if self.rpn_mode else key
+        self.rpn_toggle.background_color = get_color_from_hex('#4a8a6a' if self.rpn_mode else '#4a4a4a')
+        self.stack_label.size_hint_y = 0.025 if self.rpn_mode else 0
+        self.stack_label.text = ''
+        if value and (not self.rpn_mode or not self.rpn.stack.depth):
+            self.show(self.calculator().set_value(value))
+        else:
+            self.show(self.calculator().display)
     
     def on_memory(self, instance):
         """Memory operations"""
         op = instance.text
-        try:
-            current = float(self.display.text) if self.display.text not in ['0', 'Error', ''] else 0
-            
-            if op == 'MC':
-                self.memory = 0
-            elif op == 'MR':
-                self.display.text = str(self.memory)
-            elif op == 'M+':
-                self.memory += current
-            elif op == 'M-':
-                self.memory -= current
-            elif op == 'MS':
-                self.memory = current
-        except:
-            pass
+        if self.when_idle(self.on_memory, instance):
+            return
+        if not self.rpn_mode and self.engine.is_slow(op):
+            self.run_engine(CalculatorEngine.memory, op)
+        else:
+            self.show(self.calculator().memory(op))
     
     def on_button_press(self, instance):
         """Basic button operations"""
-        text = instance.text
+        key = instance.text
+        if self.job is not None and key == 'C':
+            self.cancel_job()
+        elif self.when_idle(self.on_button_press, instance):
+            return
+        elif self.rpn_mode:
+            self.show(self.rpn.press(key))
+        elif self.engine.is_slow(key):
+            self.run_engine(CalculatorEngine.press, key)
+        else:
+            self.display.text = self.engine.press(key)
+    
+    def set_value(self, value):
+        """Put a number computed elsewhere (plot, STAT) on the display"""
+        if not self.when_idle(self.set_value, value):
+            self.show(self.calculator().set_value(value))
+    
+    # ============ Background work ============
+    def when_idle(self, handler, *args):
+        """Queue a call to ``handler`` while a job runs; True if it was queued.
         
-        try:
-            if text == 'C':
-                self.display.text = '0'
-                self.first_num = None
-                self.operation = None
-            elif text == '⌫':
-                current = self.display.text
-                if len(current) > 1 and current != 'Error':
-                    self.display.text = current[:-1]
-                else:
-                    self.display.text = '0'
-            elif text == '=':
-                self.calculate()
-            elif text == 'ANS':
-                self.display.text = str(self.last_result) if self.last_result != 0 else '0'
-            elif text == 'EXP':
-                current = self.display.text
-                if current != 'Error' and 'e' not in current:
-                    self.display.text = current + 'e'
-            elif text == '±':
-                current = self.display.text
-                if current not in ['0', 'Error']:
-                    if current.startswith('-'):
-                        self.display.text = current[1:]
-                    else:
-                        self.display.text = '-' + current
-            elif text == '.':
-                current = self.display.text
-                if current == 'Error':
-                    self.display.text = '0.'
-                elif '.' not in current:
-                    self.display.text = current + '.'
-            elif text == '(':
-                self.display.text += '('
-            elif text == ')':
-                self.display.text += ')'
-            elif text == '00':
-                current = self.display.text
-                if current != '0' and current != 'Error':
-                    self.display.text = current + '00'
-                else:
-                    self.display.text = '0'
-            elif text in ['÷', '×', '−', '+']:
-                if self.display.text not in ['Error', '']:
-                    self.first_num = float(self.display.text)
-                    if text == '÷':
-                        self.operation = '/'
-                    elif text == '×':
-                        self.operation = '*'
-                    elif text == '−':
-                        self.operation = '-'
-                    else:
-                        self.operation = '+'
-                    self.display.text = '0'
-            elif text.isdigit():
-                current = self.display.text
-                if current == '0' or current == 'Error' or current == '':
-                    self.display.text = text
-                else:
-                    self.display.text = current + text
-                
-        except:
-            self.display.text = 'Error'
-    
-    def calculate(self):
-        """Calculate result"""
-        if self.first_num is not None and self.operation:
-            try:
-                second_num = float(self.display.text)
-                
-                if self.operation == '+':
-                    result = self.first_num + second_num
-                elif self.operation == '-':
-                    result = self.first_num - second_num
-                elif self.operation == '*':
-                    result = self.first_num * second_num
-                elif self.operation == '/':
-                    if second_num != 0:
-                        result = self.first_num / second_num
-                    else:
-                        result = 'Error'
-                elif self.operation == '^':
-                    result = self.first_num ** second_num
-                elif self.operation == 'mod':
-                    result = self.first_num % second_num
-                else:
-                    result = 'Error'
-                
-                if result == 'Error':
-                    self.display.text = 'Error'
-                else:
-                    self.display.text = self.format_number(result)
-                    self.last_result = result
-                
-                self.first_num = None
-                self.operation = None
-                
-            except:
-                self.display.text = 'Error'
+        Keys pressed during a slow calculation are replayed in order when it
+        ends, so typing ahead never loses input.
+        """
+        if self.job is None:
+            return False
+        self.queued.append((handler, args))
+        return True
+    
+    def replay_queued(self):
+        """Run queued input until it is used up or starts another job"""
+        while self.queued and self.job is None:
+            handler, args = self.queued.popleft()
+            handler(*args)
+    
+    def run_engine(self, method, *args):
+        """Call a slow engine method on a worker thread; the display updates when it returns"""
+        worker = self.engine.fork()
+        self.job_name = f"{method.__name__} job"
+        self.job_started = time.perf_counter()
+        self.job = self.runner.submit(
+            functools.partial(method, worker, *args),
+            on_done=lambda text: self.finish_job(worker),
+            on_error=lambda error: self.finish_job(None),
+            timeout=COMPUTE_TIMEOUT,
+            on_timeout=lambda: self.finish_job(None)
+        )
+        self.computing_event = Clock.schedule_once(self.show_computing, COMPUTING_DELAY)
+        self.cancel_btn.disabled = False
+    
+    def show_computing(self, dt):
+        self.display.text = COMPUTING_TEXT
+    
+    def end_job(self):
+        self.job = None
+        self.computing_event.cancel()
+        self.cancel_btn.disabled = True
+    
+    def finish_job(self, worker):
+        """Adopt the worker's state, or show Error if it failed or timed out"""
+        LATENCY.record(self.job_name, time.perf_counter() - self.job_started)
+        self.end_job()
+        if worker is None:
+            self.display.text = self.engine.load(ERROR, None)
+        else:
+            self.display.text = self.engine.adopt(worker)
+            self.update_mode_buttons()
+        self.replay_queued()
+    
+    def cancel_job(self, instance=None):
+        """Drop the running calculation, and the input queued behind it, and restore the display"""
+        if self.job is not None:
+            self.job.cancel()
+            self.end_job()
+            self.queued.clear()
+            self.display.text = self.engine.display
     
     def format_number(self, num):
         """Format number"""
-        if isinstance(num, float):
-            if abs(num) >= 1e10 or (abs(num) <= 1e-10 and num != 0):
-                return f"{num:.6e}"
-            elif num.is_integer():
-                return str(int(num))
-            else:
-                rounded = round(num, 8)
-                if rounded.is_integer():
-                    return str(int(rounded))
-                else:
-                    s = f"{rounded:.8f}".rstrip('0').rstrip('.')
-                    return s
-        return str(num)
+        return format_number(num)
 
 if __name__ == '__main__':
     PhysicsCalculatorApp().run()
\ No newline at end of file
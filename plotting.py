@@ -0,0 +1,178 @@
+"""Curve sampling for the plot view.
+
+A plot function is an expression in keypad syntax with one free variable
+(``sin(x)``, ``b÷T``, ``1÷√(1−v²÷c²)``). It may use the physical constant
+symbols from constants.FORMULA_SYMBOLS. Trigonometry is in radians.
+
+PlotSampler keeps the points it has already evaluated. For a new view it:
+
+1. keeps the cached points inside the range,
+2. fills gaps wider than the base spacing with an even grid, in one batch,
+3. refines in rounds: wherever a point leaves the straight line through
+   its neighbours by more than ``tolerance`` of the visible y span (or the
+   curve crosses into or out of its domain), both neighbouring segments
+   are halved, and all new midpoints go through one batch evaluation.
+
+A pan or zoom therefore only evaluates the newly exposed stretch and the
+places that need more detail. Batches go through NumPy when it is
+installed, and through a scalar loop otherwise.
+"""
+import bisect
+import math
+
+from constants import CONSTANTS_INDEX
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Base grid points per pixel of width, before refinement
+BASE_DENSITY = 0.25
+# Refinement stops at this many points per pixel
+MAX_DENSITY = 2.0
+MAX_ROUNDS = 8
+DEFAULT_TOLERANCE = 0.002
+
+
+class PlotFunction:
+    """A compiled one-variable expression, for single points or batches"""
+
+    def __init__(self, text, symbols=None):
+        from expression import ExpressionError, compile_formula
+        if symbols is None:
+            symbols = CONSTANTS_INDEX.symbols
+        self.text = text
+        self._scalar = compile_formula(text, symbols)
+        if len(self._scalar.variables) > 1:
+            names = ', '.join(sorted(self._scalar.variables))
+            raise ExpressionError(f"a plot needs one variable, not {names}")
+        self.variable = next(iter(self._scalar.variables), 'x')
+        self._vector = compile_formula(text, symbols, vectorized=True) if numpy is not None else None
+
+    def __call__(self, x):
+        """f(x), or nan where it is undefined"""
+        try:
+            return float(self._scalar.evaluate({self.variable: x}))
+        except (ArithmeticError, ValueError, TypeError):
+            return math.nan
+
+    def evaluate_many(self, xs):
+        """List of f(x) for every x, with nan where undefined"""
+        if not xs:
+            return []
+        if self._vector is not None:
+            with numpy.errstate(all='ignore'):
+                ys = self._vector.evaluate({self.variable: numpy.asarray(xs, dtype=float)})
+            ys = numpy.broadcast_to(numpy.asarray(ys, dtype=float), (len(xs),))
+            return numpy.where(numpy.isfinite(ys), ys, numpy.nan).tolist()
+        return [self(x) for x in xs]
+
+
+def evaluate_bound(text):
+    """Value of a range bound such as '0.99×c'"""
+    from expression import compile_formula
+    return float(compile_formula(text, CONSTANTS_INDEX.symbols).evaluate())
+
+
+def y_range(ys):
+    """Visible y range: finite samples with the outer 1% trimmed (poles), padded"""
+    finite = sorted(y for y in ys if y == y and abs(y) != math.inf)
+    if not finite:
+        return -1.0, 1.0
+    trim = len(finite) // 100
+    low, high = finite[trim], finite[-1 - trim]
+    if high - low < 1e-12 * max(1.0, abs(high)):
+        pad = max(1.0, abs(high)) * 0.5
+        return low - pad, high + pad
+    pad = (high - low) * 0.05
+    return low - pad, high + pad
+
+
+class PlotSampler:
+    """Adaptive, incremental sampling of a PlotFunction"""
+
+    def __init__(self, function, tolerance=DEFAULT_TOLERANCE):
+        self.function = function
+        self.tolerance = tolerance
+        self.xs = []
+        self.ys = []
+        # Points evaluated so far, for benchmarks
+        self.evaluations = 0
+
+    def _evaluate(self, xs):
+        self.evaluations += len(xs)
+        return self.function.evaluate_many(xs)
+
+    def _merge(self, new_xs):
+        if not new_xs:
+            return
+        new_ys = self._evaluate(new_xs)
+        points = sorted(zip(self.xs + new_xs, self.ys + new_ys))
+        self.xs = [x for x, y in points]
+        self.ys = [y for x, y in points]
+
+    def view(self, x0, x1, pixels):
+        """Points covering [x0, x1] for a plot ``pixels`` wide: (xs, ys)"""
+        if not x1 > x0:
+            raise ValueError('empty plot range')
+        pixels = max(int(pixels), 8)
+        span = x1 - x0
+        base_step = span / (pixels * BASE_DENSITY)
+        min_step = span / (pixels * MAX_DENSITY)
+
+        # 1. Keep what is in range; thin out after zooming far out
+        lo = bisect.bisect_left(self.xs, x0)
+        hi = bisect.bisect_right(self.xs, x1)
+        self.xs, self.ys = self.xs[lo:hi], self.ys[lo:hi]
+        if len(self.xs) > 4 * pixels * MAX_DENSITY:
+            keep = len(self.xs) // int(2 * pixels * MAX_DENSITY)
+            self.xs, self.ys = self.xs[::keep], self.ys[::keep]
+
+        # 2. Even grid wherever coverage is thinner than the base step
+        edges = [x0] + self.xs + [x1]
+        fill = [] if self.xs else [x0]
+        if self.xs and self.xs[0] > x0:
+            fill.append(x0)
+        if self.xs and self.xs[-1] < x1:
+            fill.append(x1)
+        for left, right in zip(edges, edges[1:]):
+            gap = right - left
+            if gap > base_step:
+                count = math.ceil(gap / base_step)
+                fill.extend(left + gap * i / count for i in range(1, count))
+        if not self.xs:
+            fill.append(x1)
+        self._merge(sorted(set(fill)))
+
+        # 3. Refine where the curve bends or leaves its domain
+        for _ in range(MAX_ROUNDS):
+            midpoints = self._refinement(min_step)
+            if not midpoints:
+                break
+            self._merge(midpoints)
+        return self.xs, self.ys
+
+    def _refinement(self, min_step):
+        xs, ys = self.xs, self.ys
+        low, high = y_range(ys)
+        limit = self.tolerance * (high - low)
+        split = set()
+        for i in range(1, len(xs) - 1):
+            y0, y1, y2 = ys[i - 1], ys[i], ys[i + 1]
+            defined = (y0 == y0, y1 == y1, y2 == y2)
+            if all(defined):
+                x0, x1, x2 = xs[i - 1], xs[i], xs[i + 1]
+                # Distance of the middle point from the chord, in y
+                chord = y0 + (y2 - y0) * (x1 - x0) / (x2 - x0)
+                if abs(y1 - chord) <= limit:
+                    continue
+            elif not any(defined):
+                continue
+            split.add(i - 1)
+            split.add(i)
+        midpoints = []
+        for i in sorted(split):
+            if xs[i + 1] - xs[i] > min_step:
+                midpoints.append((xs[i] + xs[i + 1]) / 2)
+        return midpoints
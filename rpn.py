@@ -0,0 +1,454 @@
+"""RPN mode: operands live on a stack instead of in a pending operation.
+
+The stack is one preallocated ``array('d')``. ENTER, x↔y, R↓ and DROP
+move doubles inside that buffer, and every keypad, scientific, formula and
+memory key reads its operands from the top slots and writes its result
+back in place, so a chain of operations never parses or formats anything.
+Typed digits are collected as text and parsed once, when ENTER or the next
+operation ends the entry. Only X, and the few levels shown above it, are
+formatted for display.
+
+Keys follow the HP conventions:
+
+* ENTER copies X into Y; the next number typed replaces the copy.
+* After any other operation, the next number typed is pushed above X.
+* x↔y swaps X and Y; R↓ rolls the stack down, moving X to the bottom.
+* ⌫ deletes a typed digit, or drops X when nothing is being typed.
+* LASTx recalls X as it was before the last operation.
+
+A result beyond the range of a double that has a known magnitude (a
+ScientificResult, such as 171!) is shown like in algebraic mode. Its slot
+holds ±inf and the stack keeps the ScientificResult beside it. Any other
+non-finite result, including arithmetic on such a value, shows 'Error'
+and leaves the stack as it was, again as in algebraic mode.
+
+Results are not sent to the history: RPN has no expression to replay.
+"""
+import math
+import operator
+from array import array
+
+import trig
+from engine import (
+    BINARY_OPS, CONSTANT_FUNCS, ERROR, HYPERBOLIC_KEYS, KEY_OPERATORS, PENDING_FUNCS,
+    TRIG_KEYS, UNARY_FUNCS, CalculatorError,
+)
+from factorial import ScientificResult
+
+# Levels the stack holds; pushing onto a full stack loses the bottom one
+DEPTH = 32
+
+# Keypad labels that change in RPN mode
+KEY_LABELS = {
+    '=': 'ENTER',
+    '(': 'x↔y',
+    ')': 'R↓',
+    'ANS': 'LASTx',
+}
+
+# Names of the levels above X, as shown next to the display
+LEVEL_NAMES = ('Y', 'Z', 'T')
+
+
+def _finite(result):
+    if not math.isfinite(result) and result.__class__ is not ScientificResult:
+        raise CalculatorError('overflow')
+    return result
+
+
+class RPNStack:
+    """A fixed-size stack of doubles; the top slot is X, the one below Y.
+
+    A ScientificResult is stored as ±inf in its slot and kept whole in
+    ``big``, keyed by slot index, which is empty in ordinary use.
+    """
+    __slots__ = ('slots', 'depth', 'big')
+
+    def __init__(self, capacity=DEPTH):
+        self.slots = array('d', bytes(8 * capacity))
+        self.depth = 0
+        self.big = {}
+
+    def __len__(self):
+        return self.depth
+
+    @property
+    def x(self):
+        self._need(1)
+        top = self.depth - 1
+        return self.big.get(top, self.slots[top]) if self.big else self.slots[top]
+
+    def level(self, n):
+        """Value n levels above X (X itself is level 0)"""
+        if not 0 <= n < self.depth:
+            raise IndexError(n)
+        index = self.depth - 1 - n
+        return self.big.get(index, self.slots[index]) if self.big else self.slots[index]
+
+    def _track(self, index, value):
+        """Keep ``big`` in step after ``value`` was written to slot ``index``"""
+        if value.__class__ is ScientificResult:
+            self.big[index] = value
+        else:
+            self.big.pop(index, None)
+
+    def _need(self, count):
+        if self.depth < count:
+            raise CalculatorError('too few operands')
+
+    def push(self, value):
+        slots = self.slots
+        if self.depth == len(slots):
+            slots[:-1] = slots[1:]
+            if self.big:
+                self.big = {index - 1: value for index, value in self.big.items() if index}
+        else:
+            self.depth += 1
+        slots[self.depth - 1] = value
+        if self.big or value.__class__ is ScientificResult:
+            self._track(self.depth - 1, value)
+
+    def replace(self, value):
+        """X = value"""
+        self._need(1)
+        self.slots[self.depth - 1] = value
+        if self.big or value.__class__ is ScientificResult:
+            self._track(self.depth - 1, value)
+
+    def drop(self):
+        if self.depth:
+            self.depth -= 1
+            if self.big:
+                self.big.pop(self.depth, None)
+
+    def clear(self):
+        self.depth = 0
+        self.big.clear()
+
+    def swap(self):
+        self._need(2)
+        slots, top = self.slots, self.depth - 1
+        slots[top], slots[top - 1] = slots[top - 1], slots[top]
+        if self.big:
+            big = self.big
+            below, above = big.pop(top - 1, None), big.pop(top, None)
+            if above is not None:
+                big[top - 1] = above
+            if below is not None:
+                big[top] = below
+
+    def roll(self):
+        """R↓: every level moves one closer to X, and X goes to the bottom"""
+        if self.depth > 1:
+            slots, top = self.slots, self.depth - 1
+            x = slots[top]
+            slots[1:top + 1] = slots[0:top]
+            slots[0] = x
+            if self.big:
+                self.big = {index + 1 if index < top else 0: value
+                            for index, value in self.big.items() if index <= top}
+
+    def apply1(self, func):
+        """X = func(X); the stack is unchanged if func raises or overflows"""
+        self._need(1)
+        top = self.depth - 1
+        result = _finite(func(self.slots[top]))
+        self.slots[top] = result
+        if self.big or result.__class__ is ScientificResult:
+            self._track(top, result)
+        return result
+
+    def apply2(self, func):
+        """Replace Y and X with func(Y, X); unchanged if func raises or overflows"""
+        self._need(2)
+        top = self.depth - 1
+        result = _finite(func(self.slots[top - 1], self.slots[top]))
+        self.slots[top - 1] = result
+        if self.big or result.__class__ is ScientificResult:
+            self._track(top - 1, result)
+            self.big.pop(top, None)
+        self.depth = top
+        return result
+
+
+class RPNEngine:
+    """Keypad, scientific, formula and memory keys applied to an RPNStack.
+
+    Mirrors the CalculatorEngine methods the app calls, and every method
+    returns the new display text. Angle mode, hyp and memory are read from
+    the algebraic ``engine``, so they carry over between the two modes.
+    """
+
+    def __init__(self, engine, depth=DEPTH):
+        self.engine = engine
+        self.stack = RPNStack(depth)
+        # Digits being typed into X, or None once X holds a number
+        self.entry = None
+        # False after ENTER (and CLx): the next number replaces X instead of pushing
+        self.lift = True
+        self.last_x = 0.0
+        self.error = False
+        # (X, its display text): X is formatted once however often it is shown
+        self._shown = (None, None)
+        self._key_handlers = {
+            'C': self._clear,
+            '⌫': self._backspace,
+            'ENTER': self._enter,
+            'x↔y': self._swap,
+            'R↓': self._roll,
+            'LASTx': self._last_x,
+            'EXP': self._exponent,
+            '±': self._negate,
+            '.': self._decimal_point,
+            '00': self._double_zero,
+        }
+        for key in KEY_OPERATORS:
+            self._key_handlers[key] = self._operator
+        for digit in '0123456789':
+            self._key_handlers[digit] = self._digit
+
+    # ============ Display ============
+    @property
+    def display(self):
+        if self.error:
+            return ERROR
+        if self.entry is not None:
+            return self.entry
+        stack = self.stack
+        if not stack.depth:
+            return '0'
+        x = stack.x
+        if x.__class__ is ScientificResult:
+            # Its slot holds inf, the same for every overflowed value
+            return self.engine.format_number(x)
+        shown, text = self._shown
+        if shown != x:
+            text = self.engine.format_number(x)
+            self._shown = (x, text)
+        return text
+
+    def stack_text(self):
+        """The levels above X, highest first: 'T: 3   Z: 2   Y: 1'"""
+        stack = self.stack
+        levels = min(len(LEVEL_NAMES), stack.depth - 1)
+        return '   '.join(f"{LEVEL_NAMES[n - 1]}: {self.engine.format_number(stack.level(n))}"
+                          for n in range(levels, 0, -1))
+
+    def _step(self, handler, *args):
+        """Run one key; an error leaves the stack as it was and shows 'Error'"""
+        self.error = False
+        try:
+            handler(*args)
+        except (ArithmeticError, ValueError, TypeError, KeyError):
+            self.error = True
+        return self.display
+
+    # ============ Entry ============
+    def _type(self, text):
+        """Start a number (pushing it above X unless ENTER was last) or extend one"""
+        if self.entry is None:
+            if self.lift or not self.stack.depth:
+                self.stack.push(0.0)
+            self.entry = text
+        else:
+            self.entry += text
+
+    def _commit(self):
+        """Parse the typed number into X; the only text-to-number step"""
+        if self.entry is not None:
+            self.stack.replace(float(self.entry.rstrip('e-')))
+            self.entry = None
+            self.lift = True
+
+    def current_value(self):
+        """X, with any typed number entered first"""
+        self._commit()
+        return self.stack.x if self.stack.depth else 0.0
+
+    def _push(self, value):
+        """Put a recalled number in X, replacing it right after ENTER"""
+        self._commit()
+        if self.lift or not self.stack.depth:
+            self.stack.push(value)
+        else:
+            self.stack.replace(value)
+        self.lift = True
+
+    def load(self, text, value):
+        """Push a value (a constant, a history result); None shows Error"""
+        if value is None:
+            self.error = True
+            return ERROR
+        return self._step(self._push, value)
+
+    def set_value(self, value):
+        """Push a number computed elsewhere (conversion, STAT, solver)"""
+        return self._step(self._push, value)
+
+    # ============ Operations ============
+    def _unary(self, func):
+        x = self.stack.x
+        self.stack.apply1(func)
+        self.last_x = x
+        self.lift = True
+
+    def _binary(self, func):
+        x = self.stack.x
+        self.stack.apply2(func)
+        self.last_x = x
+        self.lift = True
+
+    # ============ Keypad ============
+    def press(self, key):
+        """Handle a keypad button and return the new display text"""
+        handler = self._key_handlers.get(key)
+        if handler is not None:
+            self.error = False
+            try:
+                handler(key)
+            except (ArithmeticError, ValueError, TypeError, KeyError):
+                self.error = True
+        return self.display
+
+    def _digit(self, key):
+        if self.entry == '0':
+            self.entry = key
+        else:
+            self._type(key)
+
+    def _double_zero(self, key):
+        if self.entry is None:
+            self._type('0')
+        elif self.entry != '0':
+            self.entry += '00'
+
+    def _decimal_point(self, key):
+        if self.entry is None:
+            self._type('0.')
+        elif '.' not in self.entry and 'e' not in self.entry:
+            self.entry += '.'
+
+    def _exponent(self, key):
+        if self.entry is None:
+            self._type('1e')
+        elif 'e' not in self.entry:
+            self.entry += 'e'
+
+    def _negate(self, key):
+        entry = self.entry
+        if entry is None:
+            if self.stack.depth:
+                x = self.stack.x
+                if x.__class__ is ScientificResult:
+                    self.stack.replace(ScientificResult(-x.mantissa, x.exponent))
+                else:
+                    self.stack.apply1(operator.neg)
+        elif 'e' in entry:
+            # Typing an exponent: ± changes its sign
+            mantissa, exponent = entry.split('e')
+            self.entry = f"{mantissa}e{exponent[1:] if exponent.startswith('-') else '-' + exponent}"
+        elif entry != '0':
+            self.entry = entry[1:] if entry.startswith('-') else '-' + entry
+
+    def _backspace(self, key):
+        if self.entry is None:
+            self.stack.drop()
+            self.lift = True
+        else:
+            self.entry = self.entry[:-1]
+            if self.entry in ('', '-'):
+                self.entry = '0'
+
+    def _clear(self, key):
+        self.stack.clear()
+        self.entry = None
+        self.lift = True
+
+    def _enter(self, key):
+        self._commit()
+        self.stack.push(self.stack.x if self.stack.depth else 0.0)
+        self.lift = False
+
+    def _swap(self, key):
+        self._commit()
+        self.stack.swap()
+        self.lift = True
+
+    def _roll(self, key):
+        self._commit()
+        self.stack.roll()
+        self.lift = True
+
+    def _last_x(self, key):
+        self._push(self.last_x)
+
+    def _operator(self, key):
+        self._commit()
+        self._binary(BINARY_OPS[KEY_OPERATORS[key]])
+
+    def clear_x(self):
+        """CLx: X becomes 0 and the next number typed replaces it"""
+        self.entry = None
+        self.error = False
+        if self.stack.depth:
+            self.stack.replace(0.0)
+        self.lift = False
+        return self.display
+
+    # ============ Scientific ============
+    def scientific(self, func):
+        """Apply a scientific key to X (x^y and mod to Y and X)"""
+        state = self.engine.state
+        if func in trig.ANGLE_MODES:
+            state.angle_mode = trig.next_mode(state.angle_mode)
+            return self.display
+        if func == 'hyp':
+            state.hyperbolic = not state.hyperbolic
+            return self.display
+        if state.hyperbolic and func in HYPERBOLIC_KEYS:
+            func = HYPERBOLIC_KEYS[func]
+        state.hyperbolic = False
+        return self._step(self._function, func)
+
+    def _function(self, func):
+        self._commit()
+        if func in CONSTANT_FUNCS:
+            self._push(CONSTANT_FUNCS[func])
+        elif func in PENDING_FUNCS:
+            self._binary(BINARY_OPS[PENDING_FUNCS[func]])
+        elif func in TRIG_KEYS:
+            self._unary(trig.MODE_FUNCTIONS[self.engine.state.angle_mode][TRIG_KEYS[func]])
+        else:
+            self._unary(UNARY_FUNCS[func])
+
+    # ============ Formulas ============
+    def formula(self, formula):
+        """Apply a formula to X, or a two-variable formula to Y and X"""
+        return self._step(self._formula, formula)
+
+    def _formula(self, formula):
+        self._commit()
+        if len(formula.variables) == 2:
+            self._binary(formula)
+        else:
+            self._unary(formula)
+
+    # ============ Memory ============
+    def memory(self, op):
+        """Memory operations on X"""
+        return self._step(self._memory, op)
+
+    def _memory(self, op):
+        state = self.engine.state
+        if op == 'MC':
+            state.memory = 0
+        elif op == 'MR':
+            self._push(state.memory)
+        else:
+            x = self.current_value()
+            if op == 'M+':
+                state.memory += x
+            elif op == 'M-':
+                state.memory -= x
+            elif op == 'MS':
+                state.memory = x
@@ -0,0 +1,215 @@
+"""Root finding and numerical integration for one-variable functions.
+
+Functions are plotting.PlotFunction objects (keypad expressions with
+physical constants, e.g. ``cos(x)−x`` or ``b÷T``) or plain callables.
+Whenever several points are needed at once they go through
+``evaluate_many`` in one batch: NumPy ufuncs when available, otherwise a
+scalar loop.
+
+* ``brent`` finds a root inside a sign-changing bracket. It combines
+  inverse quadratic interpolation with bisection, so it never does worse
+  than bisection.
+* ``find_roots`` scans a grid in one batch and runs ``brent`` on every sign
+  change, discarding poles.
+* ``integrate`` is adaptive Gauss–Kronrod (7/15 points). Each round splits
+  every interval over its share of the error budget, and the 15 nodes of
+  all new halves are evaluated as one batch.
+"""
+import collections
+import math
+import sys
+
+RootResult = collections.namedtuple('RootResult', 'root value iterations evaluations converged')
+IntegralResult = collections.namedtuple('IntegralResult', 'value error evaluations intervals converged')
+
+_EPS = sys.float_info.epsilon
+
+# Kronrod nodes (descending, 0 last) and weights; Gauss weights for the odd nodes and 0
+_KRONROD_NODES = (
+    0.991455371120812639206854697526329,
+    0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926,
+    0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013,
+    0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245,
+    0.0,
+)
+_KRONROD_WEIGHTS = (
+    0.022935322010529224963732008058970,
+    0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518,
+    0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550,
+    0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649,
+    0.209482141084727828012999174891714,
+)
+_GAUSS_WEIGHTS = (
+    0.129484966168869693270611432679082,
+    0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975,
+    0.417959183673469387755102040816327,
+)
+
+
+def _batch(f):
+    """A function mapping a list of x to a list of f(x)"""
+    many = getattr(f, 'evaluate_many', None)
+    if many is not None:
+        return many
+    return lambda xs: [f(x) for x in xs]
+
+
+# ============ Roots ============
+def brent(f, a, b, xtol=2e-12, rtol=4 * _EPS, maxiter=100):
+    """Root of ``f`` in [a, b]; f(a) and f(b) must differ in sign"""
+    fa, fb = f(a), f(b)
+    evaluations = 2
+    if fa != fa or fb != fb:
+        raise ValueError('f is undefined at the bracket ends')
+    if fa == 0:
+        return RootResult(a, fa, 0, evaluations, True)
+    if fb == 0:
+        return RootResult(b, fb, 0, evaluations, True)
+    if (fa > 0) == (fb > 0):
+        raise ValueError('f(a) and f(b) must have opposite signs')
+
+    x_pre, x_cur, f_pre, f_cur = a, b, fa, fb
+    x_blk = f_blk = s_pre = s_cur = 0.0
+    for iteration in range(1, maxiter + 1):
+        if (f_pre > 0) != (f_cur > 0):
+            x_blk, f_blk = x_pre, f_pre
+            s_pre = s_cur = x_cur - x_pre
+        if abs(f_blk) < abs(f_cur):
+            # Keep the best estimate in x_cur
+            x_pre, x_cur, x_blk = x_cur, x_blk, x_cur
+            f_pre, f_cur, f_blk = f_cur, f_blk, f_cur
+
+        delta = (xtol + rtol * abs(x_cur)) / 2
+        s_bis = (x_blk - x_cur) / 2
+        if f_cur == 0 or abs(s_bis) < delta:
+            return RootResult(x_cur, f_cur, iteration, evaluations, True)
+
+        if abs(s_pre) > delta and abs(f_cur) < abs(f_pre):
+            try:
+                if x_pre == x_blk:
+                    # Secant
+                    s_try = -f_cur * (x_cur - x_pre) / (f_cur - f_pre)
+                else:
+                    # Inverse quadratic interpolation
+                    d_pre = (f_pre - f_cur) / (x_pre - x_cur)
+                    d_blk = (f_blk - f_cur) / (x_blk - x_cur)
+                    s_try = -f_cur * (f_blk * d_blk - f_pre * d_pre) / (d_blk * d_pre * (f_blk - f_pre))
+            except ZeroDivisionError:
+                # Slopes underflowed; bisect this step
+                s_try = math.inf
+            if 2 * abs(s_try) < min(abs(s_pre), 3 * abs(s_bis) - delta):
+                s_pre, s_cur = s_cur, s_try
+            else:
+                s_pre = s_cur = s_bis
+        else:
+            s_pre = s_cur = s_bis
+
+        x_pre, f_pre = x_cur, f_cur
+        x_cur += s_cur if abs(s_cur) > delta else math.copysign(delta, s_bis)
+        f_cur = f(x_cur)
+        evaluations += 1
+        if f_cur != f_cur:
+            raise ValueError(f"f is undefined at {x_cur!r}")
+    return RootResult(x_cur, f_cur, maxiter, evaluations, False)
+
+
+def find_roots(f, a, b, samples=200, xtol=2e-12):
+    """Every root in [a, b] that changes sign between grid points.
+
+    Sign changes at poles (where |f| grows instead of vanishing) are
+    dropped. Returns a list of RootResult.
+    """
+    xs = [a + (b - a) * i / samples for i in range(samples + 1)]
+    ys = _batch(f)(xs)
+    roots = []
+    for i in range(samples):
+        y0, y1 = ys[i], ys[i + 1]
+        if y0 != y0 or y1 != y1:
+            continue
+        if y0 == 0:
+            if not roots or roots[-1].root != xs[i]:
+                roots.append(RootResult(xs[i], 0.0, 0, 0, True))
+            continue
+        if y1 == 0 or (y0 > 0) == (y1 > 0):
+            # A zero at xs[i + 1] is picked up on the next step
+            continue
+        result = brent(f, xs[i], xs[i + 1], xtol=xtol)
+        if abs(result.value) <= 1e-6 * max(1.0, abs(y0), abs(y1)):
+            roots.append(result)
+    if ys[-1] == 0 and (not roots or roots[-1].root != xs[-1]):
+        roots.append(RootResult(xs[-1], 0.0, 0, 0, True))
+    return roots
+
+
+# ============ Integration ============
+def _nodes(a, b):
+    center = (a + b) / 2
+    half = (b - a) / 2
+    points = [center - half * node for node in _KRONROD_NODES[:-1]]
+    points.append(center)
+    points.extend(center + half * node for node in reversed(_KRONROD_NODES[:-1]))
+    return points
+
+
+def _kronrod(a, b, ys):
+    """(Kronrod estimate, |Kronrod - Gauss|) from the 15 values at _nodes(a, b)"""
+    half = (b - a) / 2
+    center = ys[7]
+    kronrod = _KRONROD_WEIGHTS[7] * center
+    gauss = _GAUSS_WEIGHTS[3] * center
+    for j in range(7):
+        pair = ys[j] + ys[14 - j]
+        kronrod += _KRONROD_WEIGHTS[j] * pair
+        if j % 2:
+            gauss += _GAUSS_WEIGHTS[j // 2] * pair
+    return kronrod * half, abs(kronrod - gauss) * half
+
+
+def integrate(f, a, b, abs_tol=1e-10, rel_tol=1e-10, max_intervals=500):
+    """∫ f(x) dx from a to b"""
+    if a == b:
+        return IntegralResult(0.0, 0.0, 0, 0, True)
+    if b < a:
+        result = integrate(f, b, a, abs_tol, rel_tol, max_intervals)
+        return result._replace(value=-result.value)
+
+    many = _batch(f)
+    evaluations = 0
+    pending = [(a, b)]
+    done = []
+    while True:
+        xs = []
+        for left, right in pending:
+            xs.extend(_nodes(left, right))
+        ys = many(xs)
+        evaluations += len(xs)
+        if any(y != y or abs(y) == math.inf for y in ys):
+            raise ValueError('the integrand is undefined or infinite on the interval')
+        intervals = done + [
+            (left, right) + _kronrod(left, right, ys[15 * i:15 * i + 15])
+            for i, (left, right) in enumerate(pending)
+        ]
+        value = math.fsum(interval[2] for interval in intervals)
+        error = math.fsum(interval[3] for interval in intervals)
+        tolerance = max(abs_tol, rel_tol * abs(value))
+        if error <= tolerance or len(intervals) >= max_intervals:
+            return IntegralResult(value, error, evaluations, len(intervals), error <= tolerance)
+
+        # Split every interval over its share of the budget, by width
+        pending, done = [], []
+        for left, right, estimate, interval_error in intervals:
+            share = tolerance * (right - left) / (b - a)
+            if interval_error > share and right - left > _EPS * max(abs(left), abs(right)):
+                middle = (left + right) / 2
+                pending.extend(((left, middle), (middle, right)))
+            else:
+                done.append((left, right, estimate, interval_error))
+        if not pending:
+            return IntegralResult(value, error, evaluations, len(intervals), False)
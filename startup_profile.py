@@ -0,0 +1,149 @@
+"""Startup instrumentation for main.py.
+
+Set PHYSCALC_PROFILE_STARTUP to a file path (or to 1 for
+startup_profile.json) and main.py records how long its imports, the
+constants/units setup, each section of build() and the first frame take,
+then writes the timings as JSON. With PHYSCALC_PROFILE_EXIT=1 the app closes
+once the report is written, which is what benchmarks/bench_startup.py uses.
+
+When the variable is unset every hook is a no-op.
+"""
+import builtins
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+
+_START = time.perf_counter()
+
+PROFILE_ENV = 'PHYSCALC_PROFILE_STARTUP'
+EXIT_ENV = 'PHYSCALC_PROFILE_EXIT'
+DEFAULT_REPORT = 'startup_profile.json'
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def _resolve(name, package, level):
+    base = (package or '').rsplit('.', level - 1)[0]
+    return f"{base}.{name}" if name else base
+
+
+class StartupProfiler:
+    """Collects named sections and per-module import times"""
+
+    def __init__(self, path=None, start=None):
+        self.path = path
+        self.enabled = path is not None
+        self.start = _START if start is None else start
+        self.sections = []
+        self.marks = {}
+        self.imports = {}
+        self._real_import = None
+        self._lap_start = None
+
+    @classmethod
+    def from_environ(cls):
+        value = os.environ.get(PROFILE_ENV)
+        if not value:
+            return cls()
+        return cls(DEFAULT_REPORT if value == '1' else value)
+
+    @property
+    def exit_when_done(self):
+        return self.enabled and os.environ.get(EXIT_ENV) == '1'
+
+    def elapsed_ms(self):
+        """Milliseconds since this module was imported"""
+        return _ms(time.perf_counter() - self.start)
+
+    @contextlib.contextmanager
+    def section(self, name):
+        """Time the enclosed block under ``name``"""
+        if not self.enabled:
+            yield
+            return
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.sections.append({
+                'name': name,
+                'start_ms': _ms(begin - self.start),
+                'duration_ms': _ms(end - begin),
+            })
+
+    def start_laps(self):
+        """Begin a run of consecutive sections closed by lap()"""
+        if self.enabled:
+            self._lap_start = time.perf_counter()
+
+    def lap(self, name):
+        """Close the section running since the previous lap and start the next"""
+        if not self.enabled or self._lap_start is None:
+            return
+        now = time.perf_counter()
+        self.sections.append({
+            'name': name,
+            'start_ms': _ms(self._lap_start - self.start),
+            'duration_ms': _ms(now - self._lap_start),
+        })
+        self._lap_start = now
+
+    def mark(self, name):
+        """Record a point in time, e.g. 'first_frame'"""
+        if self.enabled:
+            self.marks[name] = self.elapsed_ms()
+
+    # ============ Import tracking ============
+    def track_imports(self):
+        """Record inclusive time for each module imported from now on"""
+        if not self.enabled or self._real_import is not None:
+            return
+        real_import = self._real_import = builtins.__import__
+        imports = self.imports
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            module = name
+            if level and globals:
+                module = _resolve(name, globals.get('__package__'), level)
+            if module in sys.modules:
+                return real_import(name, globals, locals, fromlist, level)
+            begin = time.perf_counter()
+            try:
+                return real_import(name, globals, locals, fromlist, level)
+            finally:
+                imports[module] = _ms(time.perf_counter() - begin)
+
+        builtins.__import__ = timed_import
+
+    def stop_tracking_imports(self):
+        if self._real_import is not None:
+            builtins.__import__ = self._real_import
+            self._real_import = None
+
+    # ============ Report ============
+    def report(self):
+        return {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'marks_ms': dict(self.marks),
+            'sections': list(self.sections),
+            'imports_ms': dict(sorted(self.imports.items(), key=lambda item: -item[1])),
+        }
+
+    def write(self):
+        """Write the JSON report; returns the path or None when disabled"""
+        if not self.enabled:
+            return None
+        self.stop_tracking_imports()
+        with open(self.path, 'w', encoding='utf-8') as handle:
+            json.dump(self.report(), handle, indent=2, ensure_ascii=False)
+        return self.path
+
+
+PROFILER = StartupProfiler.from_environ()
@@ -0,0 +1,333 @@
+"""Single-pass statistics for STAT mode.
+
+Values typed on the keypad are pushed one at a time into accumulators that
+keep O(1) state: Welford's running mean and sum of squared deviations,
+plus min and max. Pairs also update running co-moments for a least-squares
+line. Every figure the summary shows is read straight from that state, so
+redrawing it never revisits the data.
+
+A pasted or loaded dataset takes the bulk path. ``dataset_moments`` parses
+it and reduces each column to the same moments in one vectorized pass
+(NumPy when available, builtins otherwise). The result is merged into the
+running accumulators with the pairwise update of Chan, Golub and LeVeque,
+which is exact for any split of the data. Parsing and reducing 10^6 points
+is meant to run on a worker thread; the merge is O(1) and happens on the
+main thread.
+"""
+import collections
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Reduced form of a column, and of a pair of columns
+Moments = collections.namedtuple('Moments', 'count mean m2 min max')
+CoMoments = collections.namedtuple('CoMoments', 'count mean_x mean_y sxx syy sxy')
+Dataset = collections.namedtuple('Dataset', 'x y fit')
+
+# Commas, semicolons and tabs separate values like spaces do
+_SEPARATORS = str.maketrans(',;\t', '   ')
+
+
+class RunningStats:
+    """Count, mean, variance, min and max of a stream of values"""
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        # Sum of squared deviations from the mean
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def push(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, moments):
+        """Add a Moments summary of other values"""
+        if not moments.count:
+            return
+        count = self.count + moments.count
+        delta = moments.mean - self.mean
+        self.mean += delta * moments.count / count
+        self.m2 += moments.m2 + delta * delta * self.count * moments.count / count
+        self.count = count
+        self.min = min(self.min, moments.min)
+        self.max = max(self.max, moments.max)
+
+    @property
+    def variance(self):
+        """Sample variance (n − 1), or None below two values"""
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    @property
+    def population_variance(self):
+        return self.m2 / self.count if self.count else None
+
+    @property
+    def std(self):
+        variance = self.variance
+        return None if variance is None else math.sqrt(variance)
+
+    @property
+    def population_std(self):
+        variance = self.population_variance
+        return None if variance is None else math.sqrt(variance)
+
+    @property
+    def standard_error(self):
+        std = self.std
+        return None if std is None else std / math.sqrt(self.count)
+
+
+class RunningRegression:
+    """Least-squares line y = a + b·x and correlation of a stream of pairs"""
+    __slots__ = ('count', 'mean_x', 'mean_y', 'sxx', 'syy', 'sxy')
+
+    def __init__(self):
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        # Co-moments: sums of products of deviations from the means
+        self.sxx = 0.0
+        self.syy = 0.0
+        self.sxy = 0.0
+
+    def push(self, x, y):
+        self.count += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.count
+        self.mean_y += dy / self.count
+        self.sxx += dx * (x - self.mean_x)
+        self.syy += dy * (y - self.mean_y)
+        self.sxy += dx * (y - self.mean_y)
+
+    def merge(self, co):
+        """Add a CoMoments summary of other pairs"""
+        if not co.count:
+            return
+        count = self.count + co.count
+        dx = co.mean_x - self.mean_x
+        dy = co.mean_y - self.mean_y
+        weight = self.count * co.count / count
+        self.mean_x += dx * co.count / count
+        self.mean_y += dy * co.count / count
+        self.sxx += co.sxx + dx * dx * weight
+        self.syy += co.syy + dy * dy * weight
+        self.sxy += co.sxy + dx * dy * weight
+        self.count = count
+
+    @property
+    def slope(self):
+        """b, or None while x has no spread"""
+        return self.sxy / self.sxx if self.count > 1 and self.sxx > 0 else None
+
+    @property
+    def intercept(self):
+        slope = self.slope
+        return None if slope is None else self.mean_y - slope * self.mean_x
+
+    @property
+    def correlation(self):
+        """Pearson r, or None while x or y has no spread"""
+        if self.count < 2 or self.sxx <= 0 or self.syy <= 0:
+            return None
+        return self.sxy / math.sqrt(self.sxx * self.syy)
+
+
+# ============ Bulk path ============
+def moments(values):
+    """Moments of a sequence or array of floats, in one vectorized pass"""
+    count = len(values)
+    if not count:
+        return Moments(0, 0.0, 0.0, math.inf, -math.inf)
+    if numpy is not None:
+        array = numpy.asarray(values, dtype=float)
+        with numpy.errstate(over='ignore', invalid='ignore'):
+            mean = float(array.mean())
+            deviations = array - mean
+            return Moments(count, mean, float(deviations @ deviations), float(array.min()), float(array.max()))
+    mean = math.fsum(values) / count
+    deviations = [value - mean for value in values]
+    m2 = math.fsum([d * d for d in deviations])
+    return Moments(count, mean, m2, min(values), max(values))
+
+
+def co_moments(xs, ys):
+    """CoMoments of two equal-length columns"""
+    count = len(xs)
+    if not count:
+        return CoMoments(0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    if numpy is not None:
+        x = numpy.asarray(xs, dtype=float)
+        y = numpy.asarray(ys, dtype=float)
+        with numpy.errstate(over='ignore', invalid='ignore'):
+            dx = x - x.mean()
+            dy = y - y.mean()
+            return CoMoments(count, float(x.mean()), float(y.mean()),
+                             float(dx @ dx), float(dy @ dy), float(dx @ dy))
+    mean_x = math.fsum(xs) / count
+    mean_y = math.fsum(ys) / count
+    dx = [x - mean_x for x in xs]
+    dy = [y - mean_y for y in ys]
+    return CoMoments(count, mean_x, mean_y,
+                     math.fsum([d * d for d in dx]), math.fsum([d * d for d in dy]),
+                     math.fsum([a * b for a, b in zip(dx, dy)]))
+
+
+def parse_dataset(text):
+    """(xs, ys) from pasted text; ys is None unless every line holds a pair.
+
+    Values are separated by commas, semicolons, tabs, spaces or newlines.
+    Every non-blank line must hold the same number of values: two per line
+    on several lines gives pairs, anything else a single column.
+    """
+    text = text.translate(_SEPARATORS)
+    tokens = text.split()
+    if not tokens:
+        raise ValueError('no values found')
+    try:
+        values = list(map(float, tokens))
+    except ValueError as e:
+        raise ValueError(f"not a number: {str(e).rsplit(': ', 1)[-1]}") from None
+
+    lines = text.split('\n')
+    widths = set(map(len, map(str.split, lines)))
+    widths.discard(0)
+    if len(widths) > 1:
+        _check_rows(lines)
+    if widths == {2} and len(values) > 2:
+        return values[0::2], values[1::2]
+    return values, None
+
+
+def _check_rows(lines):
+    """Raise ValueError naming the first line whose value count differs from the first"""
+    expected = None
+    for number, line in enumerate(lines, 1):
+        count = len(line.split())
+        if not count:
+            continue
+        if expected is None:
+            expected = count
+        elif count != expected:
+            raise ValueError(f"line {number} has {count} values, not {expected}")
+
+
+def dataset_moments(text):
+    """Parse and reduce a dataset; the Dataset is merged with StatsSession.merge"""
+    xs, ys = parse_dataset(text)
+    if numpy is not None:
+        xs = numpy.asarray(xs, dtype=float)
+        ys = None if ys is None else numpy.asarray(ys, dtype=float)
+    try:
+        if ys is None:
+            dataset = Dataset(moments(xs), None, None)
+        else:
+            dataset = Dataset(moments(xs), moments(ys), co_moments(xs, ys))
+        # One nan or inf anywhere makes the sums non-finite
+        finite = all(math.isfinite(column.mean) and math.isfinite(column.m2)
+                     for column in (dataset.x, dataset.y) if column is not None)
+    except (OverflowError, ValueError):
+        finite = False
+    if not finite:
+        raise ValueError('values are not finite or too large')
+    return dataset
+
+
+def load_dataset(path):
+    """dataset_moments of a text file"""
+    with open(path, encoding='utf-8') as handle:
+        return dataset_moments(handle.read())
+
+
+# ============ Session ============
+class StatsSession:
+    """The accumulators behind STAT mode.
+
+    Single values go into ``x``. In pair mode, entries alternate x then y;
+    each completed pair updates ``x``, ``y`` and the regression ``fit``.
+    """
+
+    def __init__(self):
+        self.pairs = False
+        self.clear()
+
+    def clear(self):
+        self.x = RunningStats()
+        self.y = RunningStats()
+        self.fit = RunningRegression()
+        # x of a pair whose y has not been entered yet
+        self.pending_x = None
+
+    def set_pairs(self, pairs):
+        self.pairs = pairs
+        self.pending_x = None
+
+    def enter(self, value):
+        """Push a keypad value; returns False while a pair is half entered"""
+        if not self.pairs:
+            self.x.push(value)
+            return True
+        if self.pending_x is None:
+            self.pending_x = value
+            return False
+        x, self.pending_x = self.pending_x, None
+        self.x.push(x)
+        self.y.push(value)
+        self.fit.push(x, value)
+        return True
+
+    def merge(self, dataset):
+        """Add the result of dataset_moments.
+
+        An empty session takes the dataset's shape (values or pairs); adding
+        values to pairs, or pairs to values, raises ValueError.
+        """
+        paired = dataset.fit is not None
+        if paired != self.pairs:
+            if self.count or self.pending_x is not None:
+                have, got = ('pairs', 'values') if self.pairs else ('values', 'pairs')
+                raise ValueError(f"the data holds {have}; clear it to add {got}")
+            self.pairs = paired
+        self.x.merge(dataset.x)
+        if dataset.fit is not None:
+            self.y.merge(dataset.y)
+            self.fit.merge(dataset.fit)
+
+    @property
+    def count(self):
+        return self.x.count
+
+    def results(self):
+        """Label -> value (None where undefined), for the summary and recall keys"""
+        x, y, fit = self.x, self.y, self.fit
+        results = {
+            'n': x.count,
+            'x̄': x.mean if x.count else None,
+            'sx': x.std,
+            'σx': x.population_std,
+            'SE': x.standard_error,
+            'min': x.min if x.count else None,
+            'max': x.max if x.count else None,
+        }
+        if fit.count:
+            results.update({
+                'ȳ': y.mean,
+                'sy': y.std,
+                'a': fit.intercept,
+                'b': fit.slope,
+                'r': fit.correlation,
+            })
+        return results
@@ -0,0 +1,209 @@
+"""Trigonometric functions with DEG / RAD / GRAD angle modes.
+
+Angles are reduced exactly by their period before anything else. Multiples
+of 15° (and their RAD/GRAD equivalents) are then served from a table of
+exact values, so sin(180) is 0 and tan(90) is an error rather than
+1.6e16. Every other angle falls back to libm. Inverse results in DEG and
+GRAD are snapped to whole numbers when they land within rounding error of
+one (asin(0.5) is 30, not 30.000000000000004).
+
+``evaluate_many`` applies a function to a whole sequence, with NumPy when
+it is installed.
+"""
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ANGLE_MODES = ('DEG', 'RAD', 'GRAD')
+
+# Degrees per unit of each mode
+_TO_DEGREES = {'DEG': 1.0, 'RAD': 180 / math.pi, 'GRAD': 0.9}
+
+_RAD_STEP = math.pi / 12
+_SNAP = 1e-9
+
+# sin of 0°, 15°, ... 90° and tan of 0°, 15°, ... 90°
+_SQRT2 = math.sqrt(2)
+_SQRT3 = math.sqrt(3)
+_SQRT6 = math.sqrt(6)
+_SIN_QUARTER = (0.0, (_SQRT6 - _SQRT2) / 4, 0.5, _SQRT2 / 2, _SQRT3 / 2, (_SQRT6 + _SQRT2) / 4, 1.0)
+_TAN_QUARTER = (0.0, 2 - _SQRT3, _SQRT3 / 3, 1.0, _SQRT3, 2 + _SQRT3, None)
+
+
+def _sin_sector(k):
+    quadrant, m = divmod(k, 6)
+    value = _SIN_QUARTER[m] if quadrant % 2 == 0 else _SIN_QUARTER[6 - m]
+    return value if quadrant < 2 else -value + 0.0
+
+
+def _tan_sector(k):
+    m = k % 12
+    if m <= 6:
+        return _TAN_QUARTER[m]
+    return -_TAN_QUARTER[12 - m]
+
+
+# Exact values for each 15° sector of the circle; None marks a pole of tan
+SIN_TABLE = tuple(_sin_sector(k) for k in range(24))
+COS_TABLE = tuple(SIN_TABLE[(k + 6) % 24] for k in range(24))
+TAN_TABLE = tuple(_tan_sector(k) for k in range(24))
+
+
+def _sector(x, mode):
+    """Return (sector, radians): the 15° sector index if x is exactly on one"""
+    if mode == 'RAD':
+        k = round(x / _RAD_STEP)
+        if x == 0 or (k and abs(x - k * _RAD_STEP) <= 1e-15 * abs(x)):
+            return k % 24, None
+        return None, x
+    degrees = x % 360.0 if mode == 'DEG' else (x % 400.0) * 0.9
+    if degrees % 15 == 0:
+        return int(degrees // 15) % 24, None
+    return None, math.radians(degrees)
+
+
+def sin(x, mode='DEG'):
+    k, radians = _sector(x, mode)
+    return SIN_TABLE[k] if k is not None else math.sin(radians)
+
+
+def cos(x, mode='DEG'):
+    k, radians = _sector(x, mode)
+    return COS_TABLE[k] if k is not None else math.cos(radians)
+
+
+def tan(x, mode='DEG'):
+    k, radians = _sector(x, mode)
+    if k is None:
+        return math.tan(radians)
+    value = TAN_TABLE[k]
+    if value is None:
+        raise ValueError('tan is undefined here')
+    return value
+
+
+def _from_radians(radians, mode):
+    if mode == 'RAD':
+        return radians
+    value = math.degrees(radians) / _TO_DEGREES[mode]
+    nearest = round(value)
+    return float(nearest) if abs(value - nearest) < _SNAP else value
+
+
+def asin(x, mode='DEG'):
+    return _from_radians(math.asin(x), mode)
+
+
+def acos(x, mode='DEG'):
+    return _from_radians(math.acos(x), mode)
+
+
+def atan(x, mode='DEG'):
+    return _from_radians(math.atan(x), mode)
+
+
+def sinh(x, mode=None):
+    return math.sinh(x)
+
+
+def cosh(x, mode=None):
+    return math.cosh(x)
+
+
+def tanh(x, mode=None):
+    return math.tanh(x)
+
+
+def asinh(x, mode=None):
+    return math.asinh(x)
+
+
+def acosh(x, mode=None):
+    return math.acosh(x)
+
+
+def atanh(x, mode=None):
+    return math.atanh(x)
+
+
+# Expression names; keypad labels map onto these in engine.py
+FUNCTIONS = {
+    'sin': sin,
+    'cos': cos,
+    'tan': tan,
+    'asin': asin,
+    'acos': acos,
+    'atan': atan,
+    'sinh': sinh,
+    'cosh': cosh,
+    'tanh': tanh,
+    'asinh': asinh,
+    'acosh': acosh,
+    'atanh': atanh,
+}
+
+
+def bind_mode(mode):
+    """Single-argument versions of every function for one angle mode"""
+    return {name: (lambda x, f=func: f(x, mode)) for name, func in FUNCTIONS.items()}
+
+
+MODE_FUNCTIONS = {mode: bind_mode(mode) for mode in ANGLE_MODES}
+
+
+def next_mode(mode):
+    """DEG -> RAD -> GRAD -> DEG"""
+    return ANGLE_MODES[(ANGLE_MODES.index(mode) + 1) % len(ANGLE_MODES)]
+
+
+# ============ Vectorized ============
+_NUMPY_INVERSE = {'asin': 'arcsin', 'acos': 'arccos', 'atan': 'arctan',
+                  'asinh': 'arcsinh', 'acosh': 'arccosh', 'atanh': 'arctanh'}
+
+
+def evaluate_many(name, values, mode='DEG'):
+    """Apply function ``name`` to every value; undefined points become nan.
+
+    Returns a NumPy array when NumPy is installed, otherwise a list.
+    """
+    if numpy is None:
+        func = FUNCTIONS[name]
+        results = []
+        for value in values:
+            try:
+                results.append(func(value, mode))
+            except (ValueError, OverflowError):
+                results.append(math.nan)
+        return results
+
+    values = numpy.asarray(values, dtype=float)
+    with numpy.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        if name in ('sin', 'cos', 'tan'):
+            return _numpy_forward(name, values, mode)
+        result = getattr(numpy, _NUMPY_INVERSE.get(name, name))(values)
+        if name in ('asin', 'acos', 'atan') and mode != 'RAD':
+            result = numpy.degrees(result) / _TO_DEGREES[mode]
+            nearest = numpy.round(result)
+            snap = numpy.abs(result - nearest) < _SNAP
+            result[snap] = nearest[snap]
+        return result
+
+
+def _numpy_forward(name, values, mode):
+    table = {'sin': SIN_TABLE, 'cos': COS_TABLE, 'tan': TAN_TABLE}[name]
+    table = numpy.array([math.nan if v is None else v for v in table])
+    if mode == 'RAD':
+        radians = values
+        k = numpy.round(values / _RAD_STEP)
+        exact = (values == 0) | ((k != 0) & (numpy.abs(values - k * _RAD_STEP) <= 1e-15 * numpy.abs(values)))
+    else:
+        degrees = numpy.mod(values, 360.0) if mode == 'DEG' else numpy.mod(values, 400.0) * 0.9
+        radians = numpy.radians(degrees)
+        k = degrees // 15
+        exact = numpy.mod(degrees, 15) == 0
+    result = getattr(numpy, name)(radians)
+    result[exact] = table[k[exact].astype(int) % 24]
+    return result
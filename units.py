@@ -0,0 +1,247 @@
+"""Unit categories for the converter, on top of the dimensions unit engine.
+
+Each category lists display names and the unit string behind each one;
+dimensions.py knows what the strings mean. Kept free of Kivy so conversions
+can run headless. Each category is compiled on first use into a
+ConversionTable: a dense from x to matrix of (scale, offset) plans indexed
+by unit position, so a conversion is one lookup and one multiply-add.
+``convert_many`` converts a whole column in one pass, using NumPy when it
+is installed and a plain Python loop otherwise.
+
+The factors are exact definitions. Against the rounded literals the tables
+held before, converted values changed by these relative amounts:
+
+    Year               +6.9e-4   (Julian year, 365.25 d, instead of 365 d)
+    Light Year         -2.9e-5
+    Astronomical Unit  -1.4e-5
+    BTU                -3.9e-6
+    Torr               +2.8e-6
+    Acre               -8.8e-7
+    Knot               +8.6e-7
+    Ounce              +8.2e-7
+    Kilometer/Hour     -8.0e-7
+    Stone              +5.0e-7
+    Gallon             +4.7e-7
+    PSI                -3.9e-7
+    Pound-force        +3.6e-7
+    Horsepower         -1.7e-7
+    Quart              -5.7e-8
+
+Every other unit, and every temperature conversion, gives the same result
+as before.
+"""
+import functools
+from array import array
+
+from dimensions import conversion_plan
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# ============ Unit Categories ============
+UNIT_CATEGORIES = ['Length', 'Mass', 'Time', 'Energy', 'Temperature', 'Area', 'Volume', 'Speed', 'Pressure', 'Force', 'Power']
+
+# Display name -> unit string understood by dimensions.parse_unit
+UNIT_CONVERSIONS = {
+    'Length': {
+        'Meter': 'm',
+        'Kilometer': 'km',
+        'Centimeter': 'cm',
+        'Millimeter': 'mm',
+        'Micrometer': 'µm',
+        'Nanometer': 'nm',
+        'Inch': 'in',
+        'Foot': 'ft',
+        'Yard': 'yd',
+        'Mile': 'mi',
+        'Nautical Mile': 'nmi',
+        'Light Year': 'ly',
+        'Astronomical Unit': 'au',
+    },
+    'Mass': {
+        'Kilogram': 'kg',
+        'Gram': 'g',
+        'Milligram': 'mg',
+        'Microgram': 'µg',
+        'Ton': 't',
+        'Pound': 'lb',
+        'Ounce': 'oz',
+        'Stone': 'st',
+        'Solar Mass': 'M☉',
+    },
+    'Time': {
+        'Second': 's',
+        'Millisecond': 'ms',
+        'Microsecond': 'µs',
+        'Nanosecond': 'ns',
+        'Minute': 'min',
+        'Hour': 'h',
+        'Day': 'day',
+        'Week': 'week',
+        'Year': 'yr',
+    },
+    'Energy': {
+        'Joule': 'J',
+        'Kilojoule': 'kJ',
+        'Calorie': 'cal',
+        'Kilocalorie': 'kcal',
+        'Electron Volt': 'eV',
+        'Watt Hour': 'Wh',
+        'BTU': 'BTU',
+        'Erg': 'erg',
+    },
+    'Temperature': {
+        'Kelvin': 'K',
+        'Celsius': '°C',
+        'Fahrenheit': '°F',
+    },
+    'Area': {
+        'Square Meter': 'm²',
+        'Square Kilometer': 'km²',
+        'Square Centimeter': 'cm²',
+        'Square Millimeter': 'mm²',
+        'Hectare': 'ha',
+        'Acre': 'acre',
+    },
+    'Volume': {
+        'Cubic Meter': 'm³',
+        'Liter': 'L',
+        'Milliliter': 'mL',
+        'Gallon': 'gal',
+        'Quart': 'qt',
+    },
+    'Speed': {
+        'Meter/Second': 'm/s',
+        'Kilometer/Hour': 'km/h',
+        'Mile/Hour': 'mph',
+        'Knot': 'kn',
+        'Speed of Light': 'c',
+    },
+    'Pressure': {
+        'Pascal': 'Pa',
+        'Kilopascal': 'kPa',
+        'Bar': 'bar',
+        'PSI': 'psi',
+        'Atmosphere': 'atm',
+        'Torr': 'Torr',
+    },
+    'Force': {
+        'Newton': 'N',
+        'Kilonewton': 'kN',
+        'Dyne': 'dyn',
+        'Pound-force': 'lbf',
+    },
+    'Power': {
+        'Watt': 'W',
+        'Kilowatt': 'kW',
+        'Megawatt': 'MW',
+        'Horsepower': 'hp',
+    }
+}
+
+
+def convert_temperature(value, from_unit, to_unit):
+    """Convert temperature"""
+    if from_unit == 'Kelvin':
+        celsius = value - 273.15
+    elif from_unit == 'Celsius':
+        celsius = value
+    elif from_unit == 'Fahrenheit':
+        celsius = (value - 32) * 5/9
+    else:
+        celsius = value
+    
+    if to_unit == 'Kelvin':
+        return celsius + 273.15
+    elif to_unit == 'Celsius':
+        return celsius
+    elif to_unit == 'Fahrenheit':
+        return celsius * 9/5 + 32
+    else:
+        return celsius
+
+
+def affine_factors(category, from_unit, to_unit):
+    """Return (scale, offset) so that result = value * scale + offset"""
+    units = UNIT_CONVERSIONS[category]
+    return conversion_plan(units[from_unit], units[to_unit])
+
+
+class ConversionTable:
+    """Every (from, to) conversion of one category, precomputed"""
+    __slots__ = ('category', 'units', 'index', 'plans')
+
+    def __init__(self, category):
+        self.category = category
+        self.units = list(UNIT_CONVERSIONS[category])
+        self.index = {unit: i for i, unit in enumerate(self.units)}
+        self.plans = [
+            [affine_factors(category, from_unit, to_unit) for to_unit in self.units]
+            for from_unit in self.units
+        ]
+
+    def plan(self, from_unit, to_unit):
+        """(scale, offset) for a pair of unit names"""
+        return self.plans[self.index[from_unit]][self.index[to_unit]]
+
+    def convert(self, value, from_index, to_index):
+        """Convert between units given by position"""
+        scale, offset = self.plans[from_index][to_index]
+        return value * scale + offset
+
+    def convert_all(self, value, from_index):
+        """``value`` expressed in every unit of the category, in table order"""
+        return [value * scale + offset for scale, offset in self.plans[from_index]]
+
+
+@functools.lru_cache(maxsize=None)
+def conversion_table(category):
+    """Compiled table for ``category``, built on first use"""
+    return ConversionTable(category)
+
+
+def convert(value, category, from_unit, to_unit):
+    """Convert a single value"""
+    scale, offset = conversion_table(category).plan(from_unit, to_unit)
+    return value * scale + offset
+
+
+def convert_all(value, category, from_unit):
+    """List of (unit, converted value) for every unit of ``category``"""
+    table = conversion_table(category)
+    return list(zip(table.units, table.convert_all(value, table.index[from_unit])))
+
+
+def convert_many(values, category, from_unit, to_unit):
+    """Convert a whole sequence of values from one unit to another.
+
+    ``values`` may be any iterable of numbers, an ``array.array`` or a NumPy
+    array; the result has the same kind (list, ``array('d')`` or ndarray).
+    Raises KeyError for an unknown category or unit.
+    """
+    scale, offset = conversion_table(category).plan(from_unit, to_unit)
+
+    if numpy is not None:
+        if isinstance(values, numpy.ndarray):
+            return _affine_numpy(values, scale, offset)
+        if isinstance(values, array):
+            source = numpy.frombuffer(values, dtype=values.typecode) if values else numpy.empty(0)
+            return array('d', _affine_numpy(source, scale, offset).tobytes())
+        return _affine_numpy(numpy.fromiter(values, dtype=float), scale, offset).tolist()
+
+    if offset:
+        converted = [value * scale + offset for value in values]
+    else:
+        converted = [value * scale for value in values]
+    if isinstance(values, array):
+        return array('d', converted)
+    return converted
+
+
+def _affine_numpy(values, scale, offset):
+    result = numpy.multiply(values, scale, dtype=float)
+    if offset:
+        result += offset
+    return result
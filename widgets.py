@@ -0,0 +1,470 @@
+"""Custom Kivy widgets used by PhysicsCalculatorApp"""
+from kivy.clock import Clock
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, Mesh, Rectangle
+from kivy.metrics import dp
+from kivy.properties import (
+    BooleanProperty, ColorProperty, ListProperty, NumericProperty, ObjectProperty, StringProperty)
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+from kivy.uix.widget import Widget
+
+
+class PressFader:
+    """Fades pressed buttons with one Clock trigger shared by all of them.
+
+    A press or release only records the button's target opacity, so a new
+    tap retargets the fade already in flight instead of starting a second
+    tween, and nothing is allocated per tap. While any button is still
+    fading, a single interval trigger steps all of them once per frame.
+    """
+
+    def __init__(self, pressed_opacity=0.7, released_opacity=1.0, duration=0.05):
+        self.pressed_opacity = pressed_opacity
+        self.released_opacity = released_opacity
+        self.rate = (released_opacity - pressed_opacity) / duration
+        self.targets = {}
+        self._trigger = Clock.create_trigger(self._step, 0, interval=True)
+
+    def press(self, widget):
+        self.targets[widget] = self.pressed_opacity
+        self._trigger()
+
+    def release(self, widget):
+        self.targets[widget] = self.released_opacity
+        self._trigger()
+
+    def cancel(self, widget):
+        """Stop fading ``widget`` and leave it at its released opacity"""
+        if self.targets.pop(widget, None) is not None:
+            widget.opacity = self.released_opacity
+
+    def _step(self, dt):
+        step = self.rate * dt
+        targets = self.targets
+        for widget in tuple(targets):
+            target = targets[widget]
+            opacity = widget.opacity
+            if opacity > target + step:
+                widget.opacity = opacity - step
+            elif opacity < target - step:
+                widget.opacity = opacity + step
+            else:
+                widget.opacity = target
+                del targets[widget]
+        # Returning False stops the interval trigger until the next tap
+        return bool(targets)
+
+
+PRESS_FADER = PressFader()
+
+
+class CalculatorButton(Button):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.background_normal = ''
+        self.background_down = ''
+        self.border = (0, 0, 0, 0)
+        self.font_size = dp(18)
+        self.bold = True
+        
+    def on_press(self):
+        PRESS_FADER.press(self)
+        
+    def on_release(self):
+        PRESS_FADER.release(self)
+
+
+class DisplayModel:
+    """Pending display text, pushed to the widget at most once per frame.
+
+    Handlers can assign ``text`` as often as they like (on_field_change, for
+    example, writes once itself and again through on_constant_change); only
+    the last value is rendered, just before the next frame.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.pending = None
+        self._flush = Clock.create_trigger(self.flush, -1)
+
+    @property
+    def text(self):
+        return self.widget.text if self.pending is None else self.pending
+
+    @text.setter
+    def text(self, value):
+        self.pending = value
+        self._flush()
+
+    def flush(self, *args):
+        """Copy the pending text to the widget now"""
+        if self.pending is not None:
+            if self.widget.text != self.pending:
+                self.widget.text = self.pending
+            self.pending = None
+
+
+class GlyphDisplay(Widget):
+    """Right-aligned single-line readout drawn from cached glyph textures.
+
+    Each character is rendered once per (font size, weight) and kept in a
+    class-wide cache; a text change only re-points a pool of Rectangle
+    instructions at cached textures, instead of laying out and rasterizing
+    the whole string like TextInput does. Text wider than the widget is
+    scaled down to fit.
+    """
+    text = StringProperty('0')
+    font_size = NumericProperty('48dp')
+    bold = BooleanProperty(False)
+    color = ColorProperty([1, 1, 1, 1])
+    background_color = ColorProperty([0, 0, 0, 1])
+    padding = ListProperty([dp(15), dp(20)])
+
+    _glyph_cache = {}
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._rects = []
+        with self.canvas.before:
+            self._background_color = Color(rgba=self.background_color)
+            self._background = Rectangle(pos=self.pos, size=self.size)
+        with self.canvas:
+            self._text_color = Color(rgba=self.color)
+
+        self._trigger_layout = Clock.create_trigger(self._layout, -1)
+        self.bind(text=self._trigger_layout, font_size=self._trigger_layout,
+                  bold=self._trigger_layout, padding=self._trigger_layout,
+                  pos=self._trigger_layout, size=self._trigger_layout)
+        self.bind(color=self._on_color, background_color=self._on_color)
+        self._trigger_layout()
+
+    def _on_color(self, instance, value):
+        self._text_color.rgba = self.color
+        self._background_color.rgba = self.background_color
+
+    def _glyph(self, char):
+        key = (char, self.font_size, self.bold)
+        texture = self._glyph_cache.get(key)
+        if texture is None:
+            label = CoreLabel(text=char, font_size=self.font_size, bold=self.bold)
+            label.refresh()
+            texture = self._glyph_cache[key] = label.texture
+        return texture
+
+    def _layout(self, *args):
+        self._background.pos = self.pos
+        self._background.size = self.size
+
+        glyphs = [self._glyph(char) for char in self.text]
+        total = sum(texture.width for texture in glyphs)
+        available = self.width - 2 * self.padding[0]
+        scale = min(1.0, available / total) if total and available > 0 else 1.0
+        height = max((texture.height for texture in glyphs), default=0) * scale
+        x = self.right - self.padding[0] - total * scale
+        y = self.center_y - height / 2
+
+        rects = self._rects
+        while len(rects) < len(glyphs):
+            with self.canvas:
+                rects.append(Rectangle(size=(0, 0)))
+        for rect, texture in zip(rects, glyphs):
+            width = texture.width * scale
+            rect.texture = texture
+            rect.pos = (x, y)
+            rect.size = (width, texture.height * scale)
+            x += width
+        # Spare rectangles stay in the pool, hidden
+        for rect in rects[len(glyphs):]:
+            rect.size = (0, 0)
+
+
+class PerfOverlay(Label):
+    """Latency percentiles from a LatencyMonitor, drawn over the app.
+
+    Hidden by default; while shown it re-reads the monitor twice a second.
+    """
+
+    def __init__(self, monitor, **kwargs):
+        kwargs.setdefault('font_name', 'RobotoMono-Regular')
+        kwargs.setdefault('font_size', dp(11))
+        kwargs.setdefault('color', (0.7, 1, 0.8, 1))
+        super().__init__(size_hint=(None, None), halign='left', valign='top', **kwargs)
+        self.monitor = monitor
+        self.opacity = 0
+        self._event = None
+        with self.canvas.before:
+            Color(0, 0, 0, 0.75)
+            self._background = Rectangle(pos=self.pos, size=self.size)
+        self.bind(texture_size=self._resize, pos=self._redraw, size=self._redraw)
+
+    def _resize(self, instance, texture_size):
+        self.size = (texture_size[0] + dp(10), texture_size[1] + dp(10))
+        if self.parent is not None:
+            self.pos = (dp(5), self.parent.height - self.height - dp(5))
+
+    def _redraw(self, *args):
+        self._background.pos = self.pos
+        self._background.size = self.size
+
+    @property
+    def shown(self):
+        return self._event is not None
+
+    def toggle(self):
+        if self._event is None:
+            self.refresh()
+            self._event = Clock.schedule_interval(self.refresh, 0.5)
+            self.opacity = 1
+        else:
+            self._event.cancel()
+            self._event = None
+            self.opacity = 0
+
+    def refresh(self, *args):
+        self.text = self.monitor.summary_text()
+
+
+class PlotView(Widget):
+    """A curve from a plotting.PlotSampler, drawn as one Mesh of line segments.
+
+    Drag to pan, scroll or pinch to zoom. A view change only asks the
+    sampler for the new range, and the sampler reuses the points it
+    already has. Redraws are coalesced to one per frame.
+    """
+    x_min = NumericProperty(-10.0)
+    x_max = NumericProperty(10.0)
+    range_text = StringProperty('')
+    background_color = ColorProperty([0.06, 0.1, 0.14, 1])
+    axis_color = ColorProperty([0.35, 0.45, 0.55, 1])
+    curve_color = ColorProperty([0.67, 1, 0.87, 1])
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sampler = None
+        self._touches = []
+        self._pinch = None
+        with self.canvas:
+            Color(rgba=self.background_color)
+            self._background = Rectangle(pos=self.pos, size=self.size)
+            Color(rgba=self.axis_color)
+            self._axes = Mesh(mode='lines')
+            Color(rgba=self.curve_color)
+            self._curve = Mesh(mode='lines')
+        self._trigger_redraw = Clock.create_trigger(self.redraw, -1)
+        self.bind(pos=self._trigger_redraw, size=self._trigger_redraw,
+                  x_min=self._trigger_redraw, x_max=self._trigger_redraw)
+
+    def plot(self, sampler, x_min, x_max):
+        self.sampler = sampler
+        self.x_min, self.x_max = x_min, x_max
+        self._trigger_redraw()
+
+    def redraw(self, *args):
+        self._background.pos = self.pos
+        self._background.size = self.size
+        if self.sampler is None or self.width < 2 or self.height < 2:
+            return
+        from plotting import y_range
+        xs, ys = self.sampler.view(self.x_min, self.x_max, self.width)
+        y_min, y_max = y_range(ys)
+        sx = self.width / (self.x_max - self.x_min)
+        sy = self.height / (y_max - y_min)
+        left, bottom, top = self.x, self.y, self.top
+
+        vertices = []
+        indices = []
+        previous = None
+        for x, y in zip(xs, ys):
+            if y != y:
+                previous = None
+                continue
+            # Clamp far-off points so poles stay drawable
+            py = min(max(bottom + (y - y_min) * sy, bottom - self.height), top + self.height)
+            point = (left + (x - self.x_min) * sx, py)
+            if previous is not None and abs(point[1] - previous[1]) < 2 * self.height:
+                n = len(vertices) // 4
+                vertices.extend((previous[0], previous[1], 0, 0, point[0], point[1], 0, 0))
+                indices.extend((n, n + 1))
+            previous = point
+        self._curve.vertices = vertices
+        self._curve.indices = indices
+
+        axes = []
+        if self.x_min <= 0 <= self.x_max:
+            ax = left - self.x_min * sx
+            axes.extend((ax, bottom, 0, 0, ax, top, 0, 0))
+        if y_min <= 0 <= y_max:
+            ay = bottom - y_min * sy
+            axes.extend((left, ay, 0, 0, self.right, ay, 0, 0))
+        self._axes.vertices = axes
+        self._axes.indices = list(range(len(axes) // 4))
+        self.range_text = f"x {self.x_min:.4g} … {self.x_max:.4g}    y {y_min:.4g} … {y_max:.4g}"
+
+    # ============ Pan / zoom ============
+    def zoom(self, factor, around_x):
+        """Scale the x range by ``factor`` keeping the point at pixel ``around_x`` fixed"""
+        center = self.x_min + (around_x - self.x) / self.width * (self.x_max - self.x_min)
+        self.x_min = center - (center - self.x_min) * factor
+        self.x_max = center + (self.x_max - center) * factor
+
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return False
+        if touch.is_mouse_scrolling:
+            self.zoom(1 / 1.2 if touch.button == 'scrolldown' else 1.2, touch.x)
+            return True
+        touch.grab(self)
+        self._touches.append(touch)
+        self._pinch = None
+        return True
+
+    def on_touch_move(self, touch):
+        if touch.grab_current is not self:
+            return False
+        if len(self._touches) >= 2:
+            a, b = self._touches[:2]
+            distance = abs(a.x - b.x) or 1.0
+            if self._pinch is not None:
+                self.zoom(self._pinch / distance, (a.x + b.x) / 2)
+            self._pinch = distance
+        else:
+            shift = touch.dx / self.width * (self.x_max - self.x_min)
+            self.x_min -= shift
+            self.x_max -= shift
+        return True
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return False
+        touch.ungrab(self)
+        if touch in self._touches:
+            self._touches.remove(touch)
+        self._pinch = None
+        return True
+
+
+class PickerRow(Button):
+    """One recycled row of the picker list"""
+    panel = ObjectProperty(None, allownone=True)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.background_normal = ''
+        self.background_down = ''
+        self.font_size = dp(14)
+        self.halign = 'center'
+        self.shorten = True
+        self.bind(width=self._wrap)
+
+    def _wrap(self, instance, width):
+        self.text_size = (width - dp(10), None)
+
+    def on_release(self):
+        if self.panel is not None:
+            self.panel.choose(self.text)
+
+
+class PickerPanel:
+    """The filter box and list shared by every Picker.
+
+    Only one picker is open at a time, so a single ModalView and
+    RecycleView serve all of them. The RecycleView creates only the rows
+    that fit on screen and re-points them at other values while scrolling,
+    so opening a list of a few hundred entries costs the same as a short one.
+    """
+    row_color = (0.16, 0.29, 0.42, 1)
+    current_color = (0.23, 0.42, 0.35, 1)
+
+    def __init__(self):
+        self.picker = None
+        self.view = None
+        self._values = []
+
+    def _build(self):
+        from kivy.uix.boxlayout import BoxLayout
+        from kivy.uix.modalview import ModalView
+        from kivy.uix.recycleboxlayout import RecycleBoxLayout
+        from kivy.uix.recycleview import RecycleView
+        from kivy.uix.textinput import TextInput
+
+        self.filter_input = TextInput(
+            hint_text='Filter',
+            font_size=dp(14),
+            multiline=False,
+            size_hint=(1, None),
+            height=dp(40),
+            background_color=(0.06, 0.1, 0.14, 1),
+            foreground_color=(1, 1, 1, 1),
+            cursor_color=(0.53, 0.67, 1, 1)
+        )
+        self.filter_input.bind(text=self._on_filter)
+
+        self.list = RecycleView()
+        rows = RecycleBoxLayout(
+            viewclass=PickerRow,
+            orientation='vertical',
+            spacing=dp(1),
+            default_size=(None, dp(40)),
+            default_size_hint=(1, None),
+            size_hint=(1, None)
+        )
+        rows.bind(minimum_height=rows.setter('height'))
+        self.list.add_widget(rows)
+
+        content = BoxLayout(orientation='vertical', spacing=dp(5), padding=dp(5))
+        content.add_widget(self.filter_input)
+        content.add_widget(self.list)
+        self.view = ModalView(size_hint=(0.9, 0.8))
+        self.view.add_widget(content)
+
+    def open(self, picker):
+        if self.view is None:
+            self._build()
+        self.picker = picker
+        self._values = list(picker.values)
+        if self.filter_input.text:
+            self.filter_input.text = ''
+        else:
+            self._show(self._values)
+        if picker.text in self._values:
+            # Scroll so the current value is in view
+            position = self._values.index(picker.text) / max(1, len(self._values) - 1)
+            self.list.scroll_y = 1 - position
+        else:
+            self.list.scroll_y = 1
+        self.view.open()
+
+    def _on_filter(self, instance, text):
+        query = text.strip().lower()
+        self._show([value for value in self._values if query in value.lower()] if query else self._values)
+
+    def _show(self, values):
+        current = self.picker.text
+        self.list.data = [
+            {'text': value, 'panel': self,
+             'background_color': self.current_color if value == current else self.row_color}
+            for value in values
+        ]
+
+    def choose(self, value):
+        picker, self.picker = self.picker, None
+        self.view.dismiss()
+        if picker is not None:
+            picker.text = value
+
+
+PICKER_PANEL = PickerPanel()
+
+
+class Picker(Button):
+    """A Spinner replacement that opens the shared, filterable PickerPanel.
+
+    Setting ``values`` only stores the list; no row widgets exist until the
+    panel opens, and then only the visible ones. Choosing a row sets
+    ``text``, so code bound to a Spinner's ``text`` works unchanged.
+    """
+    values = ListProperty()
+
+    def on_release(self):
+        PICKER_PANEL.open(self)